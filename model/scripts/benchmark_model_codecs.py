@@ -0,0 +1,90 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from model.src.model_codecs import MODEL_CODECS, compress_model, decompress_model
+from model.src.util import initialize_logging
+
+logger = logging.getLogger(__name__)
+
+app = typer.Typer()
+
+
+@dataclass(frozen=True)
+class CodecBenchmark:
+    """What one codec costs and saves over a set of models, all added up."""
+
+    compressed_bytes: int
+    # The fastest of the repeated passes over every model.
+    compress_seconds: float
+    decompress_seconds: float
+
+
+@app.command()
+def main(
+    model_json: Annotated[
+        list[Path],
+        typer.Option(
+            "--model-json",
+            help="Path to one consolidated <id>.json; repeat it for each keyboard",
+        ),
+    ],
+    repeat: Annotated[int, typer.Option(min=1, help="Passes to time per codec")] = 5,
+) -> None:
+    """Report each codec's size and compress and decompress time on real models."""
+    initialize_logging()
+    try:
+        models = [path.read_bytes() for path in model_json]
+        original = sum(len(data) for data in models)
+        print(
+            f"{'codec':<8}{'bytes':>10}{'ratio':>8}"
+            f"{'compress ms':>14}{'decompress ms':>16}"
+        )
+        print(f"{'none':<8}{original:>10}{1:>8.3f}{0:>14.3f}{0:>16.3f}")
+        for codec, result in benchmark_model_codecs(models, repeat).items():
+            print(
+                f"{codec:<8}{result.compressed_bytes:>10}"
+                f"{result.compressed_bytes / original:>8.3f}"
+                f"{result.compress_seconds * 1000:>14.3f}"
+                f"{result.decompress_seconds * 1000:>16.3f}"
+            )
+    except Exception:
+        logger.exception("Failed to benchmark the model codecs")
+        raise typer.Exit(code=1) from None
+
+
+def benchmark_model_codecs(
+    models: list[bytes], repeat: int
+) -> dict[str, CodecBenchmark]:
+    """Compress and decompress every model with each codec, timing both."""
+    results: dict[str, CodecBenchmark] = {}
+    for codec in MODEL_CODECS:
+        compressed = [compress_model(data, codec) for data in models]
+        if [decompress_model(data) for data in compressed] != models:
+            raise AssertionError(f"{codec} does not reproduce the models")
+        results[codec] = CodecBenchmark(
+            sum(len(data) for data in compressed),
+            _fastest(lambda: [compress_model(data, codec) for data in models], repeat),
+            _fastest(lambda: [decompress_model(data) for data in compressed], repeat),
+        )
+    return results
+
+
+def _fastest(run: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    app()
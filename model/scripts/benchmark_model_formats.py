@@ -0,0 +1,226 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import json
+import logging
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from model.scripts.generate_overlay_asset import KEYCODE_LABELS
+from model.src.overlay_binary import BinaryOverlayModel, binary_model_bytes
+from model.src.util import initialize_logging
+
+logger = logging.getLogger(__name__)
+
+app = typer.Typer()
+
+
+@dataclass(frozen=True)
+class FormatBenchmark:
+    """What showing one layer of a keyboard's model costs in one format."""
+
+    file_bytes: int
+    # The fastest of the repeated loads, from opening the file to the layer.
+    load_seconds: float
+    # How far one load raises a fresh interpreter's peak resident set once
+    # the reader is imported, or None off Linux. Mapped file pages count only
+    # once a decode touches them.
+    resident_bytes: int | None
+
+
+@app.command()
+def main(
+    models: Annotated[
+        list[Path] | None,
+        typer.Argument(
+            help="Rendered JSON models, such as build/1/assets/linux/1.json; "
+            "a synthetic keyboard when none are given"
+        ),
+    ] = None,
+    layers: Annotated[
+        int, typer.Option(min=1, max=254, help="Layers of the synthetic model")
+    ] = 32,
+    keys: Annotated[int, typer.Option(min=1, help="Keys per synthetic layer")] = 70,
+    encoders: Annotated[
+        int, typer.Option(min=0, help="Encoders per synthetic layer")
+    ] = 2,
+    repeat: Annotated[int, typer.Option(min=1, help="Loads to time per format")] = 50,
+) -> None:
+    """Compare showing the last layer of a JSON model and of a binary one."""
+    initialize_logging()
+    try:
+        sources = {
+            str(path): json.loads(path.read_bytes())["layers"] for path in models or []
+        } or {"synthetic": synthetic_layers(layers, keys, encoders)}
+        print(f"{'model':<40}{'format':<8}{'bytes':>10}{'load ms':>10}{'RSS KiB':>10}")
+        for source, source_layers in sources.items():
+            with tempfile.TemporaryDirectory() as directory:
+                results = benchmark_model_formats(
+                    Path(directory), source_layers, repeat
+                )
+            for name, result in results.items():
+                resident = (
+                    "-"
+                    if result.resident_bytes is None
+                    else f"{result.resident_bytes / 1024:.1f}"
+                )
+                print(
+                    f"{source:<40}{name:<8}{result.file_bytes:>10}"
+                    f"{result.load_seconds * 1000:>10.3f}{resident:>10}"
+                )
+    except Exception:
+        logger.exception("Failed to benchmark the model formats")
+        raise typer.Exit(code=1) from None
+
+
+def benchmark_model_formats(
+    directory: Path, layers: dict[str, dict], repeat: int
+) -> dict[str, FormatBenchmark]:
+    """Write one keyboard's layers in both formats and time loading the last."""
+    shown = max(int(layer) for layer in layers)
+    json_path = directory / "1.json"
+    json_path.write_bytes(
+        json.dumps(
+            {"keyboard_id": 1, "layers": layers},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+    )
+    binary_path = directory / "1.bin"
+    binary_path.write_bytes(binary_model_bytes(1, layers))
+
+    if load_json_layer(json_path, shown) != load_binary_layer(binary_path, shown):
+        raise AssertionError("The formats decode to different layers")
+    return {
+        name: FormatBenchmark(
+            path.stat().st_size,
+            _fastest_load(partial(LOADERS[name], path, shown), repeat),
+            _peak_resident_bytes(name, path, shown),
+        )
+        for name, path in (("json", json_path), ("binary", binary_path))
+    }
+
+
+def load_json_layer(path: Path, layer: int) -> dict:
+    """Show a layer as the runtimes do today: parse the whole model."""
+    return json.loads(path.read_bytes())["layers"][str(layer)]
+
+
+def load_binary_layer(path: Path, layer: int) -> dict:
+    """Show a layer by mapping a binary model and decoding only that layer."""
+    with BinaryOverlayModel(path) as model:
+        return model.layer(layer)
+
+
+LOADERS: dict[str, Callable[[Path, int], dict]] = {
+    "json": load_json_layer,
+    "binary": load_binary_layer,
+}
+
+# Run in a fresh interpreter, so that nothing the parent holds counts. Writing
+# 5 to clear_refs restarts the peak (VmHWM) after the imports, which would
+# otherwise hide a load of a few megabytes.
+_LOAD_IN_CHILD = """
+import sys
+from pathlib import Path
+from model.scripts.benchmark_model_formats import LOADERS, status_kib
+name, path, layer = sys.argv[1], Path(sys.argv[2]), int(sys.argv[3])
+before = status_kib("VmRSS")
+Path("/proc/self/clear_refs").write_text("5")
+LOADERS[name](path, layer)
+print(status_kib("VmHWM") - before)
+"""
+
+
+def status_kib(field: str) -> int:
+    """Return one KiB figure of this process's /proc status, such as VmRSS."""
+    status = Path("/proc/self/status").read_text(encoding="utf-8")
+    return int(status.split(f"{field}:", 1)[1].split()[0])
+
+
+def synthetic_layers(layers: int, keys: int, encoders: int) -> dict[str, dict]:
+    """Return version 2 layer models of one made-up keyboard, keyed by layer."""
+    # Seeded, so that every run measures the same files.
+    chooser = random.Random(0)
+    presses = [*KEYCODE_LABELS.values(), ""]
+    labels = [[press] if press else [] for press in presses] + [["Ctrl", "Esc"]]
+    geometry = [
+        (10 + 64 * (index % 16), 40 + 64 * (index // 16)) for index in range(keys)
+    ]
+    return {
+        str(layer): {
+            "version": 2,
+            "layer": layer,
+            "width": 1044,
+            "height": 60 + 64 * (keys // 16 + 2),
+            "header_font_size": 14,
+            "key_font_size": 10,
+            "encoder_font_size": 10,
+            "keys": [
+                {
+                    "x": x,
+                    "y": y,
+                    "width": 58,
+                    "height": 58,
+                    "label": chooser.choice(labels),
+                    "held": False,
+                    "transparent": layer > 0 and chooser.random() < 0.6,
+                    "momentary_layer": None,
+                }
+                for x, y in geometry
+            ],
+            "encoders": [
+                {
+                    "x": 10 + 64 * index,
+                    "y": 40 + 64 * (keys // 16 + 1),
+                    "size": 58,
+                    "counter_clockwise": chooser.choice(labels),
+                    "clockwise": chooser.choice(labels),
+                    "press": chooser.choice(presses),
+                    "held": False,
+                    "counter_clockwise_transparent": False,
+                    "clockwise_transparent": False,
+                    "press_transparent": False,
+                    "momentary_layer": None,
+                }
+                for index in range(encoders)
+            ],
+        }
+        for layer in range(layers)
+    }
+
+
+def _fastest_load(load: Callable[[], dict], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _peak_resident_bytes(name: str, path: Path, layer: int) -> int | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    result = subprocess.run(
+        [sys.executable, "-c", _LOAD_IN_CHILD, name, str(path), str(layer)],
+        capture_output=True,
+        check=True,
+        text=True,
+        # The repository root, where the child's imports resolve.
+        cwd=Path(__file__).resolve().parents[2],
+    )
+    return int(result.stdout) * 1024
+
+
+if __name__ == "__main__":
+    app()
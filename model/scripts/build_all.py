@@ -0,0 +1,315 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import logging
+import sys
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from model.scripts.generate_overlay_asset import (
+    OVERLAY_PLATFORMS,
+    ExportOptions,
+    OverlayPlatform,
+    PlatformOption,
+    check_export_options,
+    load_overlay_sources,
+    render_overlay_models,
+    write_scaled_models,
+)
+from model.src.layer_cache import LayerCache
+from model.src.model_bundle import write_model_bundle
+from model.src.model_codecs import ModelCodec
+from model.src.util import initialize_logging
+
+logger = logging.getLogger(__name__)
+
+app = typer.Typer()
+
+
+@dataclass(frozen=True)
+class KeyboardRenderJob:
+    """One keyboard's source-rendered inputs and the models they produce."""
+
+    keyboard_id: int
+    qmk_keymap_json: Path
+    keyboard_json: Path
+    keyboard_config: Path
+    custom_keycodes_json: Path
+    keymap_c: Path
+    layout_name: str
+    # The first scale is written as <id>.json, any others as <id>@<n>.json.
+    scales: tuple[int, ...]
+    platforms: tuple[OverlayPlatform, ...]
+    # Each platform's model goes to <asset_dir>/<platform>/<keyboard_id>.json.
+    asset_dir: Path
+    layer_cache: Path
+    export: ExportOptions = ExportOptions()
+    label_packs: tuple[Path, ...] = ()
+    label_table_cache: Path | None = None
+    glyph_widths_json: Path | None = None
+    # Render only the layers a layer key can reach from layer 0.
+    skip_unreachable_layers: bool = False
+
+
+@app.command()
+def main(
+    keyboards_dir: Annotated[
+        Path, typer.Option(help="Directory holding one <keyboard>/config.json each")
+    ] = Path("firmware/examples"),
+    build_dir: Annotated[
+        Path, typer.Option(help="Directory holding each keyboard's build inputs")
+    ] = Path("build"),
+    platform: Annotated[
+        PlatformOption | None,
+        typer.Option(help="Target overlay platform, or all; defaults to this host"),
+    ] = None,
+    layout_name: Annotated[str, typer.Option(help="Layout to render")] = "LAYOUT",
+    pixels_per_unit: Annotated[
+        list[int],
+        typer.Option(
+            min=32,
+            max=256,
+            help="Pixels per QMK layout unit; repeat it to also write each"
+            " further scale to <id>@<pixels>.json",
+        ),
+    ] = [64],
+    precompose_budget: Annotated[
+        int | None,
+        typer.Option(
+            min=1, help="Also store up to this many composed held-layer combinations"
+        ),
+    ] = None,
+    deduplicate_layers: Annotated[
+        bool,
+        typer.Option(help="Store a layer identical to an earlier one as a reference"),
+    ] = False,
+    change_masks: Annotated[
+        bool,
+        typer.Option(help="Store key IDs and each layer's change masks"),
+    ] = False,
+    delta_layers: Annotated[
+        bool,
+        typer.Option(help="Store each layer but 0 as its differences from layer 0"),
+    ] = False,
+    shared_tables: Annotated[
+        bool,
+        typer.Option(help="Store key geometry and label strings once, in tables"),
+    ] = False,
+    binary_model: Annotated[
+        bool,
+        typer.Option(help="Also write each model as a memory-mappable <id>.bin"),
+    ] = False,
+    compression: Annotated[
+        ModelCodec | None,
+        typer.Option(help="Also write each model compressed with this codec"),
+    ] = None,
+    label_pack: Annotated[
+        list[Path] | None,
+        typer.Option(help="Label pack JSON; repeat it to layer several in order"),
+    ] = None,
+    glyph_widths_json: Annotated[
+        Path | None,
+        typer.Option(help="Label-font advance widths in columns, by character"),
+    ] = None,
+    skip_unreachable_layers: Annotated[
+        bool,
+        typer.Option(
+            "--skip-unreachable-layers/--keep-unreachable-layers",
+            help="Render only layers a layer key can reach from layer 0; keep"
+            " them all for firmware that switches layers from its own code",
+        ),
+    ] = False,
+    bundle: Annotated[
+        bool,
+        typer.Option(
+            help="Also pack every keyboard's model into one bundle per platform,"
+            " under <build-dir>/bundles"
+        ),
+    ] = False,
+    jobs: Annotated[
+        int | None,
+        typer.Option(min=1, help="Worker processes; defaults to the available cores"),
+    ] = None,
+) -> None:
+    """Render every configured keyboard's consolidated models in parallel."""
+    initialize_logging()
+    try:
+        export = ExportOptions(
+            precompose_budget,
+            deduplicate_layers,
+            change_masks,
+            delta_layers,
+            shared_tables,
+            binary_model,
+            compression,
+        )
+        check_export_options(export)
+        render_jobs = discover_render_jobs(
+            keyboards_dir,
+            build_dir,
+            list(OVERLAY_PLATFORMS)
+            if platform == "all"
+            else [platform or host_platform()],
+            layout_name,
+            tuple(pixels_per_unit),
+            export,
+            tuple(label_pack or ()),
+            skip_unreachable_layers,
+            glyph_widths_json,
+        )
+        outputs = build_all(render_jobs, jobs)
+        if bundle:
+            outputs.extend(bundle_platform_models(render_jobs, build_dir / "bundles"))
+        logger.info("Rendered %d keyboard models", len(outputs))
+    except Exception:
+        logger.exception("Failed to render keyboards under %s", keyboards_dir)
+        raise typer.Exit(code=1) from None
+
+
+def host_platform() -> OverlayPlatform:
+    """Return the overlay platform this process runs on, as the Makefile does."""
+    if sys.platform == "darwin":
+        return "macos"
+    if sys.platform == "win32":
+        return "windows"
+    return "linux"
+
+
+def discover_render_jobs(
+    keyboards_dir: Path,
+    build_dir: Path,
+    platforms: list[OverlayPlatform],
+    layout_name: str = "LAYOUT",
+    scales: tuple[int, ...] = (64,),
+    export: ExportOptions = ExportOptions(),
+    label_packs: tuple[Path, ...] = (),
+    skip_unreachable_layers: bool = False,
+    glyph_widths_json: Path | None = None,
+) -> list[KeyboardRenderJob]:
+    """Plan one render per configured keyboard, covering every platform."""
+    # Keyed on config.json, exactly like the Makefile's ALL_KEYBOARD_IDS.
+    render_jobs: list[KeyboardRenderJob] = []
+    for config in sorted(keyboards_dir.glob("*/config.json")):
+        keyboard_id = _keyboard_id(config.parent.name)
+        keyboard_build_dir = build_dir / str(keyboard_id)
+        qmk_keymap_json = keyboard_build_dir / "qmk-keymap.json"
+        custom_keycodes_json = keyboard_build_dir / "custom-keycodes.json"
+        for path in (qmk_keymap_json, custom_keycodes_json):
+            if not path.is_file():
+                raise ValueError(
+                    f"{path} is missing; build it with "
+                    f"make {path} VIAL=false KEYBOARD_ID={keyboard_id}"
+                )
+        render_jobs.append(
+            KeyboardRenderJob(
+                keyboard_id=keyboard_id,
+                qmk_keymap_json=qmk_keymap_json,
+                keyboard_json=config.parent / "keyboard.json",
+                keyboard_config=config,
+                custom_keycodes_json=custom_keycodes_json,
+                keymap_c=config.parent / "keymap" / "keymap.c",
+                layout_name=layout_name,
+                scales=scales,
+                platforms=tuple(platforms),
+                asset_dir=keyboard_build_dir / "assets",
+                layer_cache=keyboard_build_dir / "layer-cache.json",
+                export=export,
+                label_packs=label_packs,
+                label_table_cache=keyboard_build_dir / "label-tables",
+                skip_unreachable_layers=skip_unreachable_layers,
+                glyph_widths_json=glyph_widths_json,
+            )
+        )
+    return render_jobs
+
+
+def build_all(
+    render_jobs: list[KeyboardRenderJob], max_workers: int | None = None
+) -> list[Path]:
+    """Render every job on a process pool, stopping at the first failure."""
+    # A job is one keyboard rather than one layer or platform: its layers and
+    # platforms share a single parse and layout pass, which smaller jobs would
+    # each repeat.
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(render_keyboard, job) for job in render_jobs]
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            if (error := future.exception()) is not None:
+                executor.shutdown(cancel_futures=True)
+                raise error
+        return [output for future in futures for output in future.result()]
+
+
+def bundle_platform_models(
+    render_jobs: list[KeyboardRenderJob], bundle_dir: Path
+) -> list[Path]:
+    """Pack the rendered jobs' first-scale models into <platform>.bundle files."""
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    outputs: list[Path] = []
+    for platform in dict.fromkeys(p for job in render_jobs for p in job.platforms):
+        output = bundle_dir / f"{platform}.bundle"
+        write_model_bundle(
+            output,
+            {
+                job.keyboard_id: (
+                    job.asset_dir / platform / f"{job.keyboard_id}.json"
+                ).read_bytes()
+                for job in render_jobs
+                if platform in job.platforms
+            },
+        )
+        outputs.append(output)
+    return outputs
+
+
+def render_keyboard(job: KeyboardRenderJob) -> list[Path]:
+    """Render one keyboard's consolidated models and replace their files."""
+    layer_cache = LayerCache(job.layer_cache)
+    sources = load_overlay_sources(
+        job.qmk_keymap_json,
+        job.keyboard_json,
+        job.keyboard_config,
+        job.custom_keycodes_json,
+        job.layout_name,
+        keymap_c=job.keymap_c,
+        glyph_widths_json=job.glyph_widths_json,
+        label_packs=list(job.label_packs),
+        label_table_cache=job.label_table_cache,
+    )
+    models = render_overlay_models(
+        sources,
+        list(job.scales),
+        platforms=list(job.platforms),
+        layer_cache=layer_cache,
+        skip_unreachable_layers=job.skip_unreachable_layers,
+    )
+    # Change masks need each key's layout index, which the parse already has.
+    outputs = write_scaled_models(
+        job.keyboard_id,
+        models,
+        job.asset_dir,
+        job.export,
+        sources.geometry.key_indices,
+    )
+    layer_cache.save()
+    logger.info(
+        "Rendered keyboard %d to %s (%d layers cached, %d rendered)",
+        job.keyboard_id,
+        job.asset_dir,
+        layer_cache.hits,
+        layer_cache.misses,
+    )
+    return outputs
+
+
+def _keyboard_id(name: str) -> int:
+    if not name.isdigit() or int(name) > 255:
+        raise ValueError(f"Keyboard directory {name} is not an ID between 0 and 255")
+    return int(name)
+
+
+if __name__ == "__main__":
+    app()
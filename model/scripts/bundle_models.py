@@ -0,0 +1,65 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import logging
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from model.src.model_bundle import replace_bundle_model, write_model_bundle
+from model.src.util import initialize_logging
+
+logger = logging.getLogger(__name__)
+
+app = typer.Typer()
+
+
+@app.command()
+def main(
+    output: Annotated[Path, typer.Option(help="Bundle file to write")],
+    model_json: Annotated[
+        list[Path],
+        typer.Option(
+            "--model-json", help="Path to one keyboard's consolidated <id>.json"
+        ),
+    ],
+    replace: Annotated[
+        bool,
+        typer.Option(
+            help="Replace only these keyboards' models in the existing bundle"
+        ),
+    ] = False,
+) -> None:
+    """Pack keyboards' consolidated models into one indexed bundle file."""
+    initialize_logging()
+    try:
+        bundle_models(output, model_json, replace)
+        logger.info("Bundled %d keyboard models into %s", len(model_json), output)
+    except Exception:
+        logger.exception("Failed to bundle keyboard models into %s", output)
+        raise typer.Exit(code=1) from None
+
+
+def bundle_models(output: Path, model_json_paths: list[Path], replace: bool) -> None:
+    """Write the models to output, each under the keyboard ID its file names."""
+    models: dict[int, bytes] = {}
+    for path in model_json_paths:
+        keyboard_id = _keyboard_id(path)
+        if keyboard_id in models:
+            raise ValueError(f"Keyboard {keyboard_id} is given more than once")
+        models[keyboard_id] = path.read_bytes()
+    if not replace:
+        write_model_bundle(output, models)
+        return
+    for keyboard_id, data in models.items():
+        replace_bundle_model(output, keyboard_id, data)
+
+
+def _keyboard_id(path: Path) -> int:
+    if not path.stem.isdigit() or int(path.stem) > 255:
+        raise ValueError(f"{path} is not named for a keyboard ID between 0 and 255")
+    return int(path.stem)
+
+
+if __name__ == "__main__":
+    app()
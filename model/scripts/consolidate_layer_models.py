@@ -9,6 +9,7 @@ from typing import Annotated
 import typer
 from pydantic import BaseModel, ConfigDict, StrictInt
 
+from model.src.model_codecs import ModelCodec, compress_model
 from model.src.util import initialize_logging, write_stdout_bytes
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,15 @@ logger = logging.getLogger(__name__)
 app = typer.Typer()
 
 
+# A JSON string, or one of the brackets that nest values.
+_JSON_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]]')
+_KEY_COLON = re.compile(rb"\s*:")
+# The JSON scalar a "layer" member may hold; nested values never match.
+_SCALAR_VALUE = re.compile(
+    rb'\s*(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null|"(?:[^"\\]|\\.)*")'
+)
+
+
 class LayerModelEnvelope(BaseModel):
     """Validate a rendered model's layer identity while preserving its fields."""
 
@@ -32,20 +42,36 @@ def main(
         list[Path],
         typer.Option("--layer-json", help="Path to one rendered layer's JSON model"),
     ],
+    stream: Annotated[
+        bool,
+        typer.Option(
+            help="Copy each layer's JSON bytes into the output as they are,"
+            " decoding only its layer number"
+        ),
+    ] = False,
+    compression: Annotated[
+        ModelCodec | None,
+        typer.Option(
+            help="Compress the output with this codec; its stream header marks"
+            " the content type"
+        ),
+    ] = None,
 ) -> None:
     """Combine one keyboard's rendered layer models into a single installable file."""
     initialize_logging()
     try:
-        combined = consolidate_layer_models(keyboard_id, layer_json)
-        write_stdout_bytes(
-            (
+        if stream:
+            data = stream_layer_models(keyboard_id, layer_json) + b"\n"
+        else:
+            combined = consolidate_layer_models(keyboard_id, layer_json)
+            data = (
                 json.dumps(combined, ensure_ascii=False, separators=(",", ":")) + "\n"
             ).encode()
+        write_stdout_bytes(
+            data if compression is None else compress_model(data, compression)
         )
         logger.info(
-            "Consolidated %d layers for keyboard %d",
-            len(combined["layers"]),
-            keyboard_id,
+            "Consolidated %d layers for keyboard %d", len(layer_json), keyboard_id
         )
     except Exception:
         logger.exception("Failed to consolidate layers for keyboard %d", keyboard_id)
@@ -54,30 +80,91 @@ def main(
 
 def consolidate_layer_models(keyboard_id: int, layer_json_paths: list[Path]) -> dict:
     """Combine a keyboard's rendered layer files into one object."""
+    layers: dict[str, object] = {}
+    for path, filename_layer in _layer_paths(keyboard_id, layer_json_paths):
+        model = LayerModelEnvelope.model_validate_json(path.read_text(encoding="utf-8"))
+        _add_layer(
+            layers, path, filename_layer, model.layer, model.model_dump(mode="json")
+        )
+    return {"keyboard_id": keyboard_id, "layers": layers}
+
+
+def stream_layer_models(keyboard_id: int, layer_json_paths: list[Path]) -> bytes:
+    """Combine a keyboard's rendered layer files into one JSON document's bytes.
+
+    Each file's top-level "layer" is the only value decoded; the rest of its
+    bytes are copied into the output unparsed, so the cost follows the files'
+    size rather than their object graphs. The checks are those of
+    consolidate_layer_models, but the copied bytes are trusted to be the
+    renderer's own valid JSON.
+    """
+    layers: dict[str, bytes] = {}
+    for path, filename_layer in _layer_paths(keyboard_id, layer_json_paths):
+        data = path.read_bytes().strip()
+        _add_layer(layers, path, filename_layer, _layer_number(path, data), data)
+    members = b",".join(
+        b'"%s":%s' % (key.encode(), data) for key, data in layers.items()
+    )
+    return b'{"keyboard_id":%d,"layers":{%s}}' % (keyboard_id, members)
+
+
+def _layer_paths(
+    keyboard_id: int, layer_json_paths: list[Path]
+) -> list[tuple[Path, int]]:
     # Take the exact paths Make considers current rather than globbing, so a
     # stale leftover from a shrunk layer count never sneaks in.
+    if not layer_json_paths:
+        raise ValueError(f"No layer models given for keyboard {keyboard_id}")
     layer_pattern = re.compile(rf"^{keyboard_id}_L(\d+)$")
-    layers: dict[str, object] = {}
+    layer_paths: list[tuple[Path, int]] = []
     for path in layer_json_paths:
         match = layer_pattern.fullmatch(path.stem)
         if match is None:
             raise ValueError(
                 f"{path} is not a rendered layer for keyboard {keyboard_id}"
             )
-        filename_layer = int(match.group(1))
-        model = LayerModelEnvelope.model_validate_json(path.read_text(encoding="utf-8"))
-        model_layer = model.layer
-        if model_layer != filename_layer:
-            raise ValueError(f"Layer in {path} does not match its filename")
-        key = str(model_layer)
-        if key in layers:
-            raise ValueError(
-                f"Layer {model_layer} is defined more than once (duplicate {path})"
-            )
-        layers[key] = model.model_dump(mode="json")
-    if not layers:
-        raise ValueError(f"No layer models given for keyboard {keyboard_id}")
-    return {"keyboard_id": keyboard_id, "layers": layers}
+        layer_paths.append((path, int(match.group(1))))
+    return layer_paths
+
+
+def _add_layer(
+    layers: dict, path: Path, filename_layer: int, model_layer: int, model: object
+) -> None:
+    if model_layer != filename_layer:
+        raise ValueError(f"Layer in {path} does not match its filename")
+    key = str(model_layer)
+    if key in layers:
+        raise ValueError(
+            f"Layer {model_layer} is defined more than once (duplicate {path})"
+        )
+    layers[key] = model
+
+
+def _layer_number(path: Path, data: bytes) -> int:
+    """Decode a model's top-level "layer" without parsing its other members."""
+    if not (data.startswith(b"{") and data.endswith(b"}")):
+        raise ValueError(f"{path} does not hold a JSON object")
+    depth = 0
+    for token in _JSON_TOKEN.finditer(data):
+        text = token.group()
+        if text in (b"{", b"["):
+            depth += 1
+        elif text in (b"}", b"]"):
+            depth -= 1
+        elif depth == 1 and (colon := _KEY_COLON.match(data, token.end())):
+            # A string followed by a colon at depth 1 is a top-level key;
+            # nested objects' keys, at greater depths, are skipped.
+            if json.loads(text) == "layer":
+                return _integer_layer(path, _SCALAR_VALUE.match(data, colon.end()))
+    raise ValueError(f"{path} has no layer")
+
+
+def _integer_layer(path: Path, value: re.Match[bytes] | None) -> int:
+    layer = json.loads(value.group(1)) if value else None
+    # StrictInt, as LayerModelEnvelope has it: no bools, floats or strings.
+    if type(layer) is not int:
+        raise ValueError(f"The layer in {path} is not an integer")
+    return layer
 
 
 if __name__ == "__main__":
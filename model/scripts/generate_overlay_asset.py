@@ -1,21 +1,35 @@
 # Copyright 2026 sunaemon
 # SPDX-License-Identifier: MIT
+import functools
 import json
 import logging
-import re
-from dataclasses import asdict, dataclass
+import math
+from array import array
+from collections import Counter, deque
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, fields, is_dataclass, replace
+from json.encoder import encode_basestring
 from pathlib import Path
-from textwrap import wrap
-from typing import Annotated, Literal
+from typing import Annotated, Any, Literal
 
 import typer
 
 from model.scripts.encoder_map import parse_encoder_map
+from model.src import keycodes, text_width
+from model.src.keycodes import parse_keycode
+from model.src.label_tables import LabelTableCache
+from model.src.layer_cache import LayerCache, content_digest
+from model.src.layer_graph import reachable_layers
+from model.src.model_codecs import ModelCodec, compress_model, compressed_suffix
+from model.src.overlay_binary import binary_model_bytes
+from model.src.text_width import TextWidths
 from model.src.types import (
     EncoderPlacement,
+    GlyphWidthsJson,
     KeyboardConfig,
     KeyboardJson,
     KeycodesJson,
+    LabelPackJson,
     LayoutKey,
     QmkKeymapJson,
     VialJson,
@@ -27,6 +41,7 @@ from model.src.util import (
     parse_custom_keycode_short_names,
     parse_keycode_value,
     parse_qk_kb_keycode,
+    write_bytes_atomically,
     write_stdout_bytes,
 )
 
@@ -34,10 +49,14 @@ logger = logging.getLogger(__name__)
 
 app = typer.Typer()
 OverlayPlatform = Literal["macos", "linux", "windows"]
+PlatformOption = Literal["macos", "linux", "windows", "all"]
+OVERLAY_PLATFORMS: tuple[OverlayPlatform, ...] = ("macos", "linux", "windows")
 
 PADDING = 20
 HEADER_HEIGHT = 38
 KEY_INSET = 3
+ENCODER_INSET = 2
+UNIT_MODEL_VERSION = 3
 TRANSPARENT_KEYS = {"KC_TRNS", "KC_TRANSPARENT", "_______"}
 
 KEYCODE_LABELS = {
@@ -126,7 +145,7 @@ PLATFORM_KEYCODE_LABELS: dict[OverlayPlatform, dict[str, str]] = {
 }
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DisplayKey:
     x: int
     y: int
@@ -138,7 +157,7 @@ class DisplayKey:
     momentary_layer: int | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DisplayEncoder:
     x: int
     y: int
@@ -153,7 +172,7 @@ class DisplayEncoder:
     momentary_layer: int | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class OverlayModel:
     version: int
     layer: int
@@ -166,6 +185,197 @@ class OverlayModel:
     encoders: list[DisplayEncoder]
 
 
+@dataclass(frozen=True, slots=True)
+class FontScale:
+    """A font size of one unit over divisor, but never below minimum pixels."""
+
+    divisor: int
+    minimum: int
+
+    def size(self, pixels_per_unit: int) -> int:
+        """Return the font size in pixels at this scale."""
+        return max(self.minimum, pixels_per_unit // self.divisor)
+
+
+HEADER_FONT = FontScale(divisor=4, minimum=14)
+KEY_FONT = FontScale(divisor=5, minimum=10)
+ENCODER_FONT = FontScale(divisor=6, minimum=10)
+
+
+@dataclass(frozen=True, slots=True)
+class UnitKey:
+    """A key's box in QMK layout units from the layout's top-left corner.
+
+    A rotated key's box is upright around its centre; rotation gives the
+    degrees to turn it clockwise about that centre.
+    """
+
+    x: float
+    y: float
+    width: float
+    height: float
+    rotation: float
+    label: list[str]
+    held: bool
+    transparent: bool
+    momentary_layer: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class UnitEncoder:
+    """An encoder's key box in layout units; renderers draw the inset square."""
+
+    x: float
+    y: float
+    width: float
+    height: float
+    counter_clockwise: list[str]
+    clockwise: list[str]
+    press: str
+    held: bool
+    counter_clockwise_transparent: bool
+    clockwise_transparent: bool
+    press_transparent: bool
+    momentary_layer: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class UnitOverlayModel:
+    """A resolution-independent model, which pixel_overlay_model scales.
+
+    Geometry is in layout units. Padding, the header and insets stay in
+    pixels at any scale, as in the pixel model.
+    """
+
+    version: int
+    layer: int
+    width: float
+    height: float
+    padding: int
+    header_height: int
+    key_inset: int
+    encoder_inset: int
+    header_font: FontScale
+    key_font: FontScale
+    encoder_font: FontScale
+    keys: list[UnitKey]
+    encoders: list[UnitEncoder]
+
+
+LayerModel = OverlayModel | UnitOverlayModel
+
+
+@dataclass(frozen=True, slots=True)
+class BoxColumns:
+    """Boxes in layout units, one array of doubles per coordinate."""
+
+    x: array[float]
+    y: array[float]
+    width: array[float]
+    height: array[float]
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class LayoutGeometry:
+    """A layout's drawn boxes, measured from the top-left of everything drawn.
+
+    Every layer of a layout shares one, so its pixel boxes are computed once
+    per scale rather than once per layer. It hashes by identity.
+    """
+
+    width: float
+    height: float
+    # The layout positions drawn as keys: every one but the encoder keys.
+    key_indices: tuple[int, ...]
+    keys: BoxColumns
+    # Degrees each key turns clockwise about its box's centre.
+    key_rotations: array[float]
+    encoders: BoxColumns
+
+
+@dataclass(frozen=True)
+class ExportOptions:
+    """Optional extras in a consolidated model, all of them off by default."""
+
+    # Store up to this many composed held-layer combinations.
+    precompose_budget: int | None = None
+    # Store a layer identical to an earlier one as a reference to it. The
+    # runtime must understand "layer_references" before this is installed.
+    deduplicate_layers: bool = False
+    # Store each key's layout index and each layer's change masks.
+    change_masks: bool = False
+    # Store layers other than 0 as their differences from it. The runtime must
+    # understand "layer_deltas" before this is installed.
+    delta_layers: bool = False
+    # Store the key geometry and label strings once, in shared tables. The
+    # runtime must understand "geometry" and "strings" before this is installed.
+    shared_tables: bool = False
+    # Also write each consolidated pixel model as a memory-mappable <id>.bin.
+    binary_model: bool = False
+    # Also write each consolidated model compressed with this codec, as
+    # <id>.json followed by the codec's suffix.
+    compression: ModelCodec | None = None
+
+
+@dataclass(frozen=True)
+class OverlaySources:
+    """Every parsed input a layer render reads, shared by all of its layers.
+
+    Build it with overlay_sources from inputs already in memory, or with
+    load_overlay_sources from their files; either way it can be rendered from
+    any number of times without reading or validating anything again.
+    """
+
+    keymap: QmkKeymapJson
+    layout: list[LayoutKey]
+    placements: list[tuple[int | None, float, float, float, float]]
+    encoder_layers: list[list[list[str]]]
+    custom_keycodes: KeycodesJson
+    # Each platform's flat keycode -> label table, label packs and keyboard-owned
+    # labels included.
+    label_tables: dict[OverlayPlatform, dict[str, str]]
+    glyph_widths: dict[str, int]
+    geometry: LayoutGeometry
+
+
+class LabelEngine:
+    """Formats and wraps keycode labels for one set of display labels.
+
+    The same keycodes recur on every layer and keyboard, so each distinct
+    keycode and wrap size is formatted once, in a bounded LRU cache. Labels
+    wrap to a number of columns of the label font, as measured by widths.
+    """
+
+    def __init__(
+        self,
+        display_labels: dict[str, str],
+        maxsize: int = 4096,
+        widths: TextWidths | None = None,
+    ) -> None:
+        self.display_labels = display_labels
+        self.widths = widths or TextWidths()
+        self.text = functools.lru_cache(maxsize=maxsize)(self._text)
+        self.wrapped = functools.lru_cache(maxsize=maxsize)(self._wrapped)
+
+    @property
+    def hits(self) -> int:
+        """Labels served from the cache, formatted or wrapped."""
+        return self.text.cache_info().hits + self.wrapped.cache_info().hits
+
+    @property
+    def misses(self) -> int:
+        """Labels that had to be formatted."""
+        return self.text.cache_info().misses
+
+    def _text(self, keycode: str) -> str:
+        return _format_keycode(keycode, self.display_labels)
+
+    def _wrapped(
+        self, keycode: str, max_lines: int, max_columns: int
+    ) -> tuple[str, ...]:
+        return self.widths.wrap(self.text(keycode), max_lines, max_columns)
+
+
 @app.command()
 def main(
     qmk_keymap_json: Annotated[Path, typer.Option(help="Raw QMK keymap JSON")],
@@ -175,10 +385,114 @@ def main(
         Path, typer.Option(help="Generated custom keycode mapping")
     ],
     layout_name: Annotated[str, typer.Option(help="Layout to render")],
-    layer: Annotated[int, typer.Option(help="Zero-based layer to render")],
+    layer: Annotated[
+        int | None, typer.Option(help="Zero-based layer to render")
+    ] = None,
+    all_layers: Annotated[
+        bool, typer.Option(help="Render every layer from one parse of the inputs")
+    ] = False,
+    keyboard_id: Annotated[
+        int | None,
+        typer.Option(
+            min=0,
+            max=255,
+            help="With --all-layers, print the keyboard's consolidated model",
+        ),
+    ] = None,
+    output_prefix: Annotated[
+        Path | None,
+        typer.Option(
+            help="With --all-layers, also write each layer to <prefix>L<n>.json"
+        ),
+    ] = None,
+    asset_dir: Annotated[
+        Path | None,
+        typer.Option(
+            help="With --keyboard-id, write <asset-dir>/<platform>/<id>.json instead"
+        ),
+    ] = None,
+    cache: Annotated[
+        Path | None,
+        typer.Option(
+            help="With --all-layers, reuse layers whose inputs are unchanged"
+            " from this manifest, and update it"
+        ),
+    ] = None,
+    skip_unreachable_layers: Annotated[
+        bool,
+        typer.Option(
+            "--skip-unreachable-layers/--keep-unreachable-layers",
+            help="With --all-layers, render only layers a layer key can reach"
+            " from layer 0; firmware that switches layers from its own code"
+            " needs them all",
+        ),
+    ] = False,
+    precompose_budget: Annotated[
+        int | None,
+        typer.Option(
+            min=1,
+            help="With --keyboard-id, also store up to this many composed models"
+            " for the reachable combinations of held MO() layers",
+        ),
+    ] = None,
+    deduplicate_layers: Annotated[
+        bool,
+        typer.Option(
+            help="With --keyboard-id, store a layer identical to an earlier one"
+            " as a reference to it"
+        ),
+    ] = False,
+    change_masks: Annotated[
+        bool,
+        typer.Option(
+            help="With --keyboard-id, store key IDs and, per layer, masks of the"
+            " keys that differ from layer 0 and of the transparent ones"
+        ),
+    ] = False,
+    delta_layers: Annotated[
+        bool,
+        typer.Option(
+            help="With --keyboard-id, store each layer but 0 as only the keys"
+            " and encoders that differ from layer 0's"
+        ),
+    ] = False,
+    shared_tables: Annotated[
+        bool,
+        typer.Option(
+            help="With --keyboard-id, store the key geometry and label strings"
+            " once, in tables the layers index into"
+        ),
+    ] = False,
+    binary_model: Annotated[
+        bool,
+        typer.Option(
+            help="With --asset-dir, also write each model's layers as a"
+            " memory-mappable <id>.bin"
+        ),
+    ] = False,
+    compression: Annotated[
+        ModelCodec | None,
+        typer.Option(
+            help="With --asset-dir, also write each model compressed with this"
+            " codec, as <id>.json.gz, .xz or .zz"
+        ),
+    ] = None,
     pixels_per_unit: Annotated[
-        int, typer.Option(min=32, max=256, help="Pixels per QMK layout unit")
-    ] = 64,
+        list[int],
+        typer.Option(
+            min=32,
+            max=256,
+            help="Pixels per QMK layout unit; with --asset-dir, repeat it to"
+            " also write each further scale to <id>@<pixels>.json",
+        ),
+    ] = [64],
+    unit_space: Annotated[
+        bool,
+        typer.Option(
+            help="Write version 3 models in layout units, for renderers to"
+            " scale, instead of pixels"
+        ),
+    ] = False,
     keymap_c: Annotated[
         Path | None, typer.Option(help="keymap.c containing encoder_map")
     ] = None,
@@ -189,38 +503,147 @@ def main(
         Path | None,
         typer.Option(help="Device-fetched Vial definition containing customKeycodes"),
     ] = None,
+    glyph_widths_json: Annotated[
+        Path | None,
+        typer.Option(
+            help="Label-font advance widths in columns, by character, for glyphs"
+            " that are not one column, or two when East Asian wide"
+        ),
+    ] = None,
+    label_pack: Annotated[
+        list[Path] | None,
+        typer.Option(
+            help="Label pack JSON of keycode labels, shared and per platform;"
+            " repeat it to layer several, later packs winning"
+        ),
+    ] = None,
+    label_table_cache: Annotated[
+        Path | None,
+        typer.Option(
+            help="Directory of compiled label tables to reuse, keyed by the"
+            " digest of their sources, and to add to"
+        ),
+    ] = None,
     platform: Annotated[
-        OverlayPlatform, typer.Option(help="Target overlay platform")
+        PlatformOption,
+        typer.Option(help="Target overlay platform, or all of them in one pass"),
     ] = "macos",
 ) -> None:
-    """Build one platform-neutral keymap display model."""
+    """Build one platform-neutral keymap display model, or every layer's."""
     initialize_logging()
     try:
-        model = build_overlay_model(
+        platforms = list(OVERLAY_PLATFORMS) if platform == "all" else [platform]
+        export = ExportOptions(
+            precompose_budget,
+            deduplicate_layers,
+            change_masks,
+            delta_layers,
+            shared_tables,
+            binary_model,
+            compression,
+        )
+        scales: list[int | None] = [None] if unit_space else [*pixels_per_unit]
+        _check_render_options(
+            layer,
+            all_layers,
+            platforms,
+            keyboard_id,
+            output_prefix,
+            asset_dir,
+            cache,
+            export,
+        )
+        if len(scales) > 1 and (layer is not None or asset_dir is None):
+            raise ValueError("Several --pixels-per-unit values need --asset-dir")
+        if binary_model and (asset_dir is None or unit_space):
+            raise ValueError("--binary-model writes pixel models to --asset-dir")
+        if compression is not None and asset_dir is None:
+            raise ValueError("--compression writes its models to --asset-dir")
+        sources = load_overlay_sources(
             qmk_keymap_json,
             keyboard_json,
             keyboard_config,
             custom_keycodes_json,
             layout_name,
-            layer,
-            pixels_per_unit,
             keymap_c=keymap_c,
             vitaly_json=vitaly_json,
             vial_definition_json=vial_definition_json,
-            platform=platform,
+            glyph_widths_json=glyph_widths_json,
+            label_packs=label_pack or [],
+            label_table_cache=label_table_cache,
+        )
+        if layer is not None:
+            model = render_overlay_model(
+                sources, layer, scales[0], platform=platforms[0]
+            )
+            write_stdout_bytes(overlay_json_bytes(model))
+            logger.info("Rendered layer %d from %s", layer, qmk_keymap_json)
+            return
+        layer_cache = LayerCache(cache)
+        models = render_overlay_models(
+            sources,
+            scales,
+            platforms=platforms,
+            layer_cache=layer_cache,
+            skip_unreachable_layers=skip_unreachable_layers,
         )
-        write_stdout_bytes(
-            (
-                json.dumps(asdict(model), ensure_ascii=False, separators=(",", ":"))
-                + "\n"
-            ).encode()
+        _write_all_layers(
+            models,
+            keyboard_id,
+            output_prefix,
+            asset_dir,
+            export,
+            sources.geometry.key_indices,
+        )
+        layer_cache.save()
+        logger.info(
+            "Rendered %d layers for %s from %s (%d cached, %d rendered)",
+            len(next(iter(models[scales[0]].values()))),
+            ", ".join(platforms),
+            qmk_keymap_json,
+            layer_cache.hits,
+            layer_cache.misses,
         )
-        logger.info("Rendered layer %d from %s", layer, qmk_keymap_json)
     except Exception:
-        logger.exception("Failed to render layer %d", layer)
+        logger.exception("Failed to render layers from %s", qmk_keymap_json)
         raise typer.Exit(code=1) from None
 
 
+def _check_render_options(
+    layer: int | None,
+    all_layers: bool,
+    platforms: list[OverlayPlatform],
+    keyboard_id: int | None,
+    output_prefix: Path | None,
+    asset_dir: Path | None,
+    cache: Path | None,
+    export: ExportOptions,
+) -> None:
+    if not all_layers:
+        if layer is None or len(platforms) != 1:
+            raise ValueError("Provide --layer for one platform, or --all-layers")
+        if cache is not None or export != ExportOptions():
+            raise ValueError("--cache and export options apply to --all-layers")
+        return
+    if layer is not None:
+        raise ValueError("--all-layers renders every layer; drop --layer")
+    if asset_dir is not None and keyboard_id is None:
+        raise ValueError("--asset-dir needs --keyboard-id")
+    if len(platforms) > 1 and (asset_dir is None or output_prefix is not None):
+        raise ValueError("--platform all writes to --asset-dir, not --output-prefix")
+    if keyboard_id is None and output_prefix is None:
+        raise ValueError("--all-layers needs --keyboard-id or --output-prefix")
+    if keyboard_id is None and export != ExportOptions():
+        raise ValueError("Export options need --keyboard-id")
+    check_export_options(export)
+
+
+def check_export_options(export: ExportOptions) -> None:
+    """Reject export options that cannot be combined, before anything renders."""
+    if export.delta_layers and export.shared_tables:
+        raise ValueError("--delta-layers cannot be combined with --shared-tables")
+
+
 def build_overlay_model(
     qmk_keymap_json: Path,
     keyboard_json: Path,
@@ -233,9 +656,274 @@ def build_overlay_model(
     keymap_c: Path | None = None,
     vitaly_json: Path | None = None,
     vial_definition_json: Path | None = None,
+    glyph_widths_json: Path | None = None,
+    label_packs: list[Path] | None = None,
+    label_table_cache: Path | None = None,
     platform: OverlayPlatform = "macos",
 ) -> OverlayModel:
     """Build one JSON-serializable display model from QMK sources."""
+    sources = load_overlay_sources(
+        qmk_keymap_json,
+        keyboard_json,
+        keyboard_config,
+        custom_keycodes_json,
+        layout_name,
+        keymap_c=keymap_c,
+        vitaly_json=vitaly_json,
+        vial_definition_json=vial_definition_json,
+        glyph_widths_json=glyph_widths_json,
+        label_packs=label_packs,
+        label_table_cache=label_table_cache,
+    )
+    model = render_overlay_model(
+        sources, layer_index, pixels_per_unit, platform=platform
+    )
+    assert isinstance(model, OverlayModel)
+    return model
+
+
+def build_overlay_models(
+    qmk_keymap_json: Path,
+    keyboard_json: Path,
+    keyboard_config: Path,
+    custom_keycodes_json: Path,
+    layout_name: str,
+    pixels_per_unit: int | None = 64,
+    *,
+    keymap_c: Path | None = None,
+    vitaly_json: Path | None = None,
+    vial_definition_json: Path | None = None,
+    glyph_widths_json: Path | None = None,
+    label_packs: list[Path] | None = None,
+    label_table_cache: Path | None = None,
+    platform: OverlayPlatform = "macos",
+) -> list[LayerModel]:
+    """Build every layer's display model from one parse of the QMK sources.
+
+    Without pixels_per_unit, the models are unit-space UnitOverlayModels.
+    """
+    return build_platform_overlay_models(
+        qmk_keymap_json,
+        keyboard_json,
+        keyboard_config,
+        custom_keycodes_json,
+        layout_name,
+        pixels_per_unit,
+        keymap_c=keymap_c,
+        vitaly_json=vitaly_json,
+        vial_definition_json=vial_definition_json,
+        glyph_widths_json=glyph_widths_json,
+        label_packs=label_packs,
+        label_table_cache=label_table_cache,
+        platforms=[platform],
+    )[platform]
+
+
+def build_platform_overlay_models(
+    qmk_keymap_json: Path,
+    keyboard_json: Path,
+    keyboard_config: Path,
+    custom_keycodes_json: Path,
+    layout_name: str,
+    pixels_per_unit: int | None = 64,
+    *,
+    keymap_c: Path | None = None,
+    vitaly_json: Path | None = None,
+    vial_definition_json: Path | None = None,
+    glyph_widths_json: Path | None = None,
+    label_packs: list[Path] | None = None,
+    label_table_cache: Path | None = None,
+    platforms: list[OverlayPlatform],
+    layer_cache: LayerCache | None = None,
+    skip_unreachable_layers: bool = False,
+) -> dict[OverlayPlatform, list[LayerModel]]:
+    """Build every layer for each platform, sharing everything but the labels.
+
+    Given a layer cache, a layer whose inputs hash the same as in the previous
+    build is reused rather than rendered again. Layers no layer key can reach
+    from layer 0 can be skipped.
+    """
+    return build_scaled_overlay_models(
+        qmk_keymap_json,
+        keyboard_json,
+        keyboard_config,
+        custom_keycodes_json,
+        layout_name,
+        [pixels_per_unit],
+        keymap_c=keymap_c,
+        vitaly_json=vitaly_json,
+        vial_definition_json=vial_definition_json,
+        glyph_widths_json=glyph_widths_json,
+        label_packs=label_packs,
+        label_table_cache=label_table_cache,
+        platforms=platforms,
+        layer_cache=layer_cache,
+        skip_unreachable_layers=skip_unreachable_layers,
+    )[pixels_per_unit]
+
+
+def build_scaled_overlay_models(
+    qmk_keymap_json: Path,
+    keyboard_json: Path,
+    keyboard_config: Path,
+    custom_keycodes_json: Path,
+    layout_name: str,
+    scales: list[int | None],
+    *,
+    keymap_c: Path | None = None,
+    vitaly_json: Path | None = None,
+    vial_definition_json: Path | None = None,
+    glyph_widths_json: Path | None = None,
+    label_packs: list[Path] | None = None,
+    label_table_cache: Path | None = None,
+    platforms: list[OverlayPlatform],
+    layer_cache: LayerCache | None = None,
+    skip_unreachable_layers: bool = False,
+) -> dict[int | None, dict[OverlayPlatform, list[LayerModel]]]:
+    """Build every layer for each platform at each pixels-per-unit scale.
+
+    One pass lays out and labels the layers in layout units; each scale only
+    converts that geometry to pixels. A None scale keeps the unit-space models.
+    """
+    sources = load_overlay_sources(
+        qmk_keymap_json,
+        keyboard_json,
+        keyboard_config,
+        custom_keycodes_json,
+        layout_name,
+        keymap_c=keymap_c,
+        vitaly_json=vitaly_json,
+        vial_definition_json=vial_definition_json,
+        glyph_widths_json=glyph_widths_json,
+        label_packs=label_packs,
+        label_table_cache=label_table_cache,
+    )
+    return render_overlay_models(
+        sources,
+        scales,
+        platforms=platforms,
+        layer_cache=layer_cache,
+        skip_unreachable_layers=skip_unreachable_layers,
+    )
+
+
+def overlay_sources(
+    keymap: QmkKeymapJson,
+    keyboard: KeyboardJson,
+    keyboard_config: KeyboardConfig,
+    custom_keycodes: KeycodesJson,
+    layout_name: str,
+    *,
+    encoder_layers: list[list[list[str]]] | None = None,
+    custom_labels: dict[str, str] | None = None,
+    glyph_widths: dict[str, int] | None = None,
+    label_packs: list[LabelPackJson] | None = None,
+) -> OverlaySources:
+    """Gather already-parsed inputs into the sources every render reads.
+
+    encoder_layers holds each layer's encoder actions, as parse_encoder_map
+    returns them, and custom_labels the keyboard's own keycode names.
+    """
+    return _overlay_sources(
+        keymap,
+        keyboard,
+        keyboard_config,
+        custom_keycodes,
+        layout_name,
+        encoder_layers=encoder_layers or [],
+        label_tables={
+            platform: compile_label_table(platform, label_packs or [], custom_labels)
+            for platform in OVERLAY_PLATFORMS
+        },
+        glyph_widths=glyph_widths or {},
+    )
+
+
+def render_overlay_model(
+    sources: OverlaySources,
+    layer_index: int,
+    pixels_per_unit: int | None = 64,
+    *,
+    platform: OverlayPlatform = "macos",
+) -> LayerModel:
+    """Render one layer's display model; without pixels_per_unit, in units."""
+    model = _label_layer(
+        _plan_layer(sources, layer_index), _label_engine(sources, platform)
+    )
+    return _scale_models([model], pixels_per_unit, sources.geometry)[0]
+
+
+def render_overlay_models(
+    sources: OverlaySources,
+    scales: list[int | None],
+    *,
+    platforms: list[OverlayPlatform],
+    layer_cache: LayerCache | None = None,
+    skip_unreachable_layers: bool = False,
+) -> dict[int | None, dict[OverlayPlatform, list[LayerModel]]]:
+    """Render every layer for each platform at each scale from in-memory sources.
+
+    This is build_scaled_overlay_models without the loading: given a layer
+    cache, layers whose inputs are unchanged are reused.
+    """
+    return _build_scaled_models(
+        sources,
+        platforms,
+        scales,
+        layer_cache or LayerCache(None),
+        _layers_to_render(sources, skip_unreachable_layers),
+    )
+
+
+@dataclass(frozen=True)
+class _KeyPlan:
+    """A key's keycode and state, which every platform shares."""
+
+    keycode: str
+    held: bool
+    transparent: bool
+    momentary_layer: int | None
+
+
+@dataclass(frozen=True)
+class _EncoderPlan:
+    """An encoder's state and keycodes, which every platform shares."""
+
+    counter_clockwise: str
+    clockwise: str
+    press: str
+    held: bool
+    counter_clockwise_transparent: bool
+    clockwise_transparent: bool
+    press_transparent: bool
+    momentary_layer: int | None
+
+
+@dataclass(frozen=True)
+class _LayerPlan:
+    """Everything in one layer's model except its platform-specific labels."""
+
+    layer: int
+    geometry: LayoutGeometry
+    keys: list[_KeyPlan]
+    encoders: list[_EncoderPlan]
+
+
+def load_overlay_sources(
+    qmk_keymap_json: Path,
+    keyboard_json: Path,
+    keyboard_config: Path,
+    custom_keycodes_json: Path,
+    layout_name: str,
+    *,
+    keymap_c: Path | None = None,
+    vitaly_json: Path | None = None,
+    vial_definition_json: Path | None = None,
+    glyph_widths_json: Path | None = None,
+    label_packs: list[Path] | None = None,
+    label_table_cache: Path | None = None,
+) -> OverlaySources:
+    """Parse the QMK sources once into the sources every render reads."""
     if keymap_c is None and vitaly_json is None:
         raise ValueError("Provide keymap_c or vitaly_json")
 
@@ -243,8 +931,7 @@ def build_overlay_model(
     keyboard = parse_json(KeyboardJson, keyboard_json)
     config = parse_json(KeyboardConfig, keyboard_config)
     custom_keycodes = parse_json(KeycodesJson, custom_keycodes_json)
-    display_labels = {
-        **PLATFORM_KEYCODE_LABELS.get(platform, {}),
+    custom_labels = {
         **(parse_custom_keycode_short_names(keymap_c) if keymap_c else {}),
         **(
             _vial_custom_keycode_labels(vial_definition_json)
@@ -252,33 +939,1023 @@ def build_overlay_model(
             else {}
         ),
     }
-    layout = keyboard.layout_keys(layout_name)
-    _validate_layer(keymap, layout, layer_index)
+    return _overlay_sources(
+        keymap,
+        keyboard,
+        config,
+        custom_keycodes,
+        layout_name,
+        encoder_layers=_load_encoder_layers(keymap_c, vitaly_json),
+        label_tables=_label_tables(
+            custom_labels, label_packs or [], LabelTableCache(label_table_cache)
+        ),
+        glyph_widths=(
+            parse_json(GlyphWidthsJson, glyph_widths_json).root
+            if glyph_widths_json
+            else {}
+        ),
+    )
+
 
+def _overlay_sources(
+    keymap: QmkKeymapJson,
+    keyboard: KeyboardJson,
+    config: KeyboardConfig,
+    custom_keycodes: KeycodesJson,
+    layout_name: str,
+    *,
+    encoder_layers: list[list[list[str]]],
+    label_tables: dict[OverlayPlatform, dict[str, str]],
+    glyph_widths: dict[str, int],
+) -> OverlaySources:
+    layout = keyboard.layout_keys(layout_name)
     placements = _resolve_encoder_placements(keyboard, config, layout)
-    encoder_layers = _load_encoder_layers(keymap_c, vitaly_json)
+    return OverlaySources(
+        keymap=keymap,
+        layout=layout,
+        placements=placements,
+        encoder_layers=encoder_layers,
+        custom_keycodes=custom_keycodes,
+        label_tables=label_tables,
+        glyph_widths=glyph_widths,
+        geometry=layout_geometry(layout, placements),
+    )
+
+
+def compile_label_table(
+    platform: OverlayPlatform,
+    label_packs: list[LabelPackJson],
+    custom_labels: dict[str, str] | None = None,
+) -> dict[str, str]:
+    """Flatten every label source for a platform into one keycode -> label dict.
+
+    Later sources win: the built-in labels, the platform's, each label pack's
+    shared and then platform labels in order, and the keyboard's own names.
+    """
+    table = {
+        **KEYCODE_LABELS,
+        **dict.fromkeys(TRANSPARENT_KEYS, ""),
+        **PLATFORM_KEYCODE_LABELS.get(platform, {}),
+    }
+    for pack in label_packs:
+        table.update(pack.labels)
+        table.update(pack.platforms.get(platform, {}))
+    table.update(custom_labels or {})
+    return table
+
+
+def _label_tables(
+    custom_labels: dict[str, str], label_packs: list[Path], cache: LabelTableCache
+) -> dict[OverlayPlatform, dict[str, str]]:
+    # The digest covers the packs' text, so a cached table skips validating
+    # them; they are only parsed for a platform whose table must be compiled.
+    inputs = [
+        _generator_fingerprint(),
+        [path.read_text(encoding="utf-8") for path in label_packs],
+        custom_labels,
+    ]
+    packs = functools.cache(
+        lambda: [parse_json(LabelPackJson, path) for path in label_packs]
+    )
+    tables: dict[OverlayPlatform, dict[str, str]] = {
+        platform: cache.table(
+            content_digest([*inputs, platform]),
+            lambda platform=platform: compile_label_table(
+                platform, packs(), custom_labels
+            ),
+        )
+        for platform in OVERLAY_PLATFORMS
+    }
+    cache.prune()
+    return tables
+
+
+def _label_engine(sources: OverlaySources, platform: OverlayPlatform) -> LabelEngine:
+    return _shared_label_engine(
+        tuple(sources.label_tables[platform].items()),
+        _shared_text_widths(tuple(sources.glyph_widths.items())),
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _shared_label_engine(
+    display_labels: tuple[tuple[str, str], ...], widths: TextWidths
+) -> LabelEngine:
+    # Keyboards rendered in one process mostly share a platform's labels, so
+    # they share its engine and its warm cache too.
+    return LabelEngine(dict(display_labels), widths=widths)
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_text_widths(advances: tuple[tuple[str, int], ...]) -> TextWidths:
+    return TextWidths(dict(advances))
+
+
+def _build_scaled_models(
+    sources: OverlaySources,
+    platforms: list[OverlayPlatform],
+    scales: list[int | None],
+    layer_cache: LayerCache,
+    layer_indices: list[int],
+) -> dict[int | None, dict[OverlayPlatform, list[LayerModel]]]:
+    models = _build_platform_models(sources, platforms, layer_cache, layer_indices)
+    return {
+        scale: {
+            platform: _scale_models(platform_models, scale, sources.geometry)
+            for platform, platform_models in models.items()
+        }
+        for scale in scales
+    }
+
+
+def _build_platform_models(
+    sources: OverlaySources,
+    platforms: list[OverlayPlatform],
+    layer_cache: LayerCache,
+    layer_indices: list[int],
+) -> dict[OverlayPlatform, list[UnitOverlayModel]]:
+    # The cache holds unit-space models, so one entry serves every scale.
+    layout_digest = _layout_digest(sources)
+    engines = {platform: _label_engine(sources, platform) for platform in platforms}
+    labels_digests = {
+        platform: content_digest([engine.display_labels, engine.widths.advances])
+        for platform, engine in engines.items()
+    }
+    models: dict[OverlayPlatform, list[UnitOverlayModel]] = {
+        platform: [] for platform in platforms
+    }
+    # Layers identical but for their number, such as a keymap's all-KC_TRNS
+    # padding, are rendered once and renumbered.
+    rendered: dict[str, UnitOverlayModel] = {}
+    for layer_index in layer_indices:
+        layer_digest = _layer_digest(sources, layer_index, layout_digest)
+        plan: _LayerPlan | None = None
+        for platform in platforms:
+            digest = content_digest([layer_digest, labels_digests[platform]])
+            cached = layer_cache.get(platform, layer_index, digest)
+            if cached is not None:
+                model = _overlay_model_from_dict(cached)
+            elif digest in rendered:
+                model = replace(rendered[digest], layer=layer_index)
+                layer_cache.put(platform, layer_index, digest, asdict(model))
+            else:
+                plan = plan or _plan_layer(sources, layer_index)
+                model = _label_layer(plan, engines[platform])
+                layer_cache.put(platform, layer_index, digest, asdict(model))
+            rendered.setdefault(digest, model)
+            models[platform].append(model)
+    for platform, engine in engines.items():
+        logger.debug(
+            "Labels for %s: %d cached, %d formatted",
+            platform,
+            engine.hits,
+            engine.misses,
+        )
+    return models
+
+
+def _layers_to_render(
+    sources: OverlaySources, skip_unreachable_layers: bool
+) -> list[int]:
+    all_layers = list(range(len(sources.keymap.layers)))
+    if not skip_unreachable_layers:
+        return all_layers
+    layers = reachable_layers(sources.keymap.layers, sources.encoder_layers)
+    if skipped := sorted(set(all_layers) - set(layers)):
+        logger.info(
+            "Skipping layers no layer key reaches: %s", ", ".join(map(str, skipped))
+        )
+    return layers
+
+
+@functools.cache
+def _generator_fingerprint() -> str:
+    # Hashing the renderer's own source re-renders every layer after a code
+    # change, but not after a touch that leaves the file unchanged, which is
+    # all Make's mtimes can see.
+    return content_digest(
+        [
+            Path(source).read_text(encoding="utf-8")
+            for source in (__file__, keycodes.__file__, text_width.__file__)
+        ]
+    )
+
+
+def _layout_digest(sources: OverlaySources) -> str:
+    return content_digest(
+        [
+            _generator_fingerprint(),
+            [key.model_dump(mode="json") for key in sources.layout],
+            sources.placements,
+        ]
+    )
+
+
+def _layer_digest(sources: OverlaySources, layer_index: int, layout_digest: str) -> str:
+    """Hash exactly what one layer's model is rendered from."""
+    # The resolved layer carries the base keys a transparent key falls through
+    # to, so a base edit invalidates only the layers that show it.
+    # The layer number itself only decides which keys show as held, so two
+    # layers with the same keys and held keys hash the same.
+    _validate_layer(sources.keymap, sources.layout, layer_index)
+    encoder_count = len(sources.placements)
+    resolved = _resolve_layer(sources.keymap, layer_index, sources.custom_keycodes)
+    return content_digest(
+        [
+            layout_digest,
+            [
+                parse_keycode(keycode).momentary_layer == layer_index
+                for keycode in resolved
+            ],
+            sources.keymap.layers[layer_index],
+            resolved,
+            _padded_encoder_pairs(sources.encoder_layers, encoder_count, layer_index),
+            _encoder_pairs_for_layer(
+                sources.encoder_layers,
+                encoder_count,
+                layer_index,
+                sources.custom_keycodes,
+            ),
+        ]
+    )
+
+
+def _overlay_model_from_dict(model: dict) -> UnitOverlayModel:
+    return UnitOverlayModel(
+        **{
+            **model,
+            "header_font": FontScale(**model["header_font"]),
+            "key_font": FontScale(**model["key_font"]),
+            "encoder_font": FontScale(**model["encoder_font"]),
+            "keys": [UnitKey(**key) for key in model["keys"]],
+            "encoders": [UnitEncoder(**encoder) for encoder in model["encoders"]],
+        }
+    )
+
+
+def _plan_layer(sources: OverlaySources, layer_index: int) -> _LayerPlan:
+    _validate_layer(sources.keymap, sources.layout, layer_index)
     encoder_pairs = _encoder_pairs_for_layer(
-        encoder_layers,
-        len(placements),
+        sources.encoder_layers,
+        len(sources.placements),
         layer_index,
-        custom_keycodes,
+        sources.custom_keycodes,
     )
     raw_encoder_pairs = _padded_encoder_pairs(
-        encoder_layers,
-        len(placements),
+        sources.encoder_layers,
+        len(sources.placements),
         layer_index,
     )
-    layer = _resolve_layer(keymap, layer_index, custom_keycodes)
-    return _build_layer_model(
-        layout,
+    layer = _resolve_layer(sources.keymap, layer_index, sources.custom_keycodes)
+    return _build_layer_plan(
+        sources.geometry,
         layer,
-        keymap.layers[layer_index],
-        placements,
+        sources.keymap.layers[layer_index],
+        sources.placements,
         encoder_pairs,
         raw_encoder_pairs,
-        display_labels,
         layer_index,
-        pixels_per_unit,
+    )
+
+
+def consolidate_overlay_models(
+    keyboard_id: int,
+    models: list[LayerModel],
+    combinations: dict[str, LayerModel] | None = None,
+    deduplicate_layers: bool = False,
+    key_ids: tuple[int, ...] | None = None,
+    delta_layers: bool = False,
+    shared_tables: bool = False,
+) -> dict:
+    """Combine a keyboard's rendered layer models into one installable object.
+
+    Precomposed combinations, when given, are stored under "combinations",
+    keyed by their held layers in ascending order joined with "+". With
+    deduplicate_layers, a layer identical to an earlier one but for its number
+    is stored under "layer_references" as that layer's number instead. Given
+    the keys' layout indices, those are stored as "key_ids", and each layer's
+    layer_change_masks under "change_masks". With delta_layers, every other
+    layer of layer 0's shape is stored under "layer_deltas" as its layer_delta.
+    With shared_tables, layers and combinations are stored as described for
+    expand_shared_tables.
+    """
+    # The in-memory counterpart to consolidate_layer_models: the dataclasses
+    # are already the validated shape, so no layer file is read back.
+    document = _consolidated_records(
+        keyboard_id,
+        models,
+        combinations,
+        deduplicate_layers,
+        key_ids,
+        delta_layers,
+        shared_tables,
+    )
+    for section in ("layers", "combinations"):
+        if section in document:
+            document[section] = {
+                key: asdict(model) if is_dataclass(model) else model
+                for key, model in document[section].items()
+            }
+    for delta in document.get("layer_deltas", {}).values():
+        for items in ("keys", "encoders"):
+            delta[items] = {index: asdict(item) for index, item in delta[items].items()}
+    return document
+
+
+def _consolidated_records(
+    keyboard_id: int,
+    models: list[LayerModel],
+    combinations: dict[str, LayerModel] | None,
+    deduplicate_layers: bool,
+    key_ids: tuple[int, ...] | None,
+    delta_layers: bool = False,
+    shared_tables: bool = False,
+) -> dict:
+    # Like consolidate_overlay_models, but the models stay records, which
+    # overlay_json_bytes writes without copying them into dicts first.
+    if delta_layers and shared_tables:
+        raise ValueError("Delta layers cannot use shared tables")
+    layers, references = _distinct_layers(models, deduplicate_layers)
+    if not layers:
+        raise ValueError(f"No layer models given for keyboard {keyboard_id}")
+    document: dict = {"keyboard_id": keyboard_id, "layers": layers}
+    if references:
+        document["layer_references"] = references
+    if delta_layers:
+        document["layer_deltas"] = _delta_encode(layers)
+    if combinations is not None:
+        document["combinations"] = dict(combinations)
+    if key_ids is not None:
+        document.update(_change_mask_sections(models, key_ids))
+    if shared_tables:
+        document = _table_encode(document)
+    return document
+
+
+def _distinct_layers(
+    models: list[LayerModel], deduplicate_layers: bool
+) -> tuple[dict[str, LayerModel], dict[str, int]]:
+    layers: dict[str, LayerModel] = {}
+    references: dict[str, int] = {}
+    distinct: list[LayerModel] = []
+    for model in models:
+        key = str(model.layer)
+        if key in layers or key in references:
+            raise ValueError(f"Layer {model.layer} is defined more than once")
+        original = _identical_layer(model, distinct) if deduplicate_layers else None
+        if original is not None:
+            references[key] = original.layer
+            continue
+        distinct.append(model)
+        layers[key] = model
+    return layers, references
+
+
+# The fields of each item record that come from the layout alone, which every
+# layer of a keyboard shares.
+_GEOMETRY_FIELDS: dict[type, tuple[str, ...]] = {
+    DisplayKey: ("x", "y", "width", "height"),
+    DisplayEncoder: ("x", "y", "size"),
+    UnitKey: ("x", "y", "width", "height", "rotation"),
+    UnitEncoder: ("x", "y", "width", "height"),
+}
+_ITEM_TYPES: dict[type, tuple[type, type]] = {
+    OverlayModel: (DisplayKey, DisplayEncoder),
+    UnitOverlayModel: (UnitKey, UnitEncoder),
+}
+# Item fields of label text, stored as indices into the string table.
+_LABEL_FIELDS = frozenset({"label", "counter_clockwise", "clockwise"})
+_STRING_FIELDS = frozenset({"press"})
+
+
+def _table_encode(document: dict) -> dict:
+    models = [
+        model
+        for section in ("layers", "combinations")
+        for model in document.get(section, {}).values()
+    ]
+    geometry = _geometry_table(models[0])
+    for model in models[1:]:
+        if _geometry_table(model) != geometry:
+            raise ValueError(f"Layer {model.layer} does not share the geometry")
+    counts = Counter(
+        text
+        for model in models
+        for item in (*model.keys, *model.encoders)
+        for text in _label_texts(item)
+    )
+    # The commonest strings get the shortest indices.
+    strings = [text for text, _ in counts.most_common()]
+    indices = {text: index for index, text in enumerate(strings)}
+    tabled = {
+        "keyboard_id": document["keyboard_id"],
+        "geometry": geometry,
+        "strings": strings,
+    }
+    for key, value in document.items():
+        if key in ("layers", "combinations"):
+            value = {
+                name: _tabled_model(model, indices) for name, model in value.items()
+            }
+        tabled.setdefault(key, value)
+    return tabled
+
+
+def _geometry_table(model: LayerModel) -> dict:
+    key_type, encoder_type = _ITEM_TYPES[type(model)]
+    return {
+        "keys": _geometry_columns(model.keys, key_type),
+        "encoders": _geometry_columns(model.encoders, encoder_type),
+    }
+
+
+def _geometry_columns(items: list, item_type: type) -> dict[str, list]:
+    return {
+        name: [getattr(item, name) for item in items]
+        for name in _GEOMETRY_FIELDS[item_type]
+    }
+
+
+def _label_texts(item: object) -> list[str]:
+    # In field order, so that equally common strings keep a stable order.
+    texts: list[str] = []
+    for field in fields(item):
+        if field.name in _LABEL_FIELDS:
+            texts.extend(getattr(item, field.name))
+        elif field.name in _STRING_FIELDS:
+            texts.append(getattr(item, field.name))
+    return texts
+
+
+def _tabled_model(model: LayerModel, indices: dict[str, int]) -> dict:
+    key_type, encoder_type = _ITEM_TYPES[type(model)]
+    tabled: dict = {}
+    for field in fields(model):
+        value = getattr(model, field.name)
+        if field.name not in ("keys", "encoders"):
+            tabled[field.name] = asdict(value) if is_dataclass(value) else value
+    tabled["keys"] = _tabled_items(model.keys, key_type, indices)
+    tabled["encoders"] = _tabled_items(model.encoders, encoder_type, indices)
+    return tabled
+
+
+def _tabled_items(items: list, item_type: type, indices: dict[str, int]) -> dict:
+    columns: dict[str, object] = {}
+    for field in fields(item_type):
+        if field.name in _GEOMETRY_FIELDS[item_type]:
+            continue
+        values = [getattr(item, field.name) for item in items]
+        if field.name in _LABEL_FIELDS:
+            columns[field.name] = [
+                [indices[text] for text in value] for value in values
+            ]
+        elif field.name in _STRING_FIELDS:
+            columns[field.name] = [indices[value] for value in values]
+        elif field.type is bool:
+            mask = sum(1 << index for index, value in enumerate(values) if value)
+            columns[field.name] = f"{mask:x}"
+        else:
+            columns[field.name] = values
+    return columns
+
+
+def expand_shared_tables(document: dict) -> dict:
+    """Return a consolidated model with its layers' shared tables expanded.
+
+    In the shared-table format, "geometry" holds the keys' and encoders'
+    layout fields, such as x, as one column per field, and "strings" every
+    distinct label text. Each layer and combination stores its keys and
+    encoders as columns of their other fields: label text as indices into
+    "strings", and flags as hex masks with bit i for the i-th item.
+    """
+    geometry = document["geometry"]
+    strings = document["strings"]
+    expanded = {
+        key: value
+        for key, value in document.items()
+        if key not in ("geometry", "strings")
+    }
+    for section in ("layers", "combinations"):
+        if section in document:
+            expanded[section] = {
+                name: {
+                    **model,
+                    "keys": _expanded_items(model["keys"], geometry["keys"], strings),
+                    "encoders": _expanded_items(
+                        model["encoders"], geometry["encoders"], strings
+                    ),
+                }
+                for name, model in document[section].items()
+            }
+    return expanded
+
+
+def _expanded_items(columns: dict, geometry: dict, strings: list[str]) -> list[dict]:
+    count = len(next(iter(geometry.values())))
+    decoded: dict[str, list] = dict(geometry)
+    for name, column in columns.items():
+        if name in _LABEL_FIELDS:
+            decoded[name] = [[strings[index] for index in value] for value in column]
+        elif name in _STRING_FIELDS:
+            decoded[name] = [strings[index] for index in column]
+        elif isinstance(column, str):
+            mask = int(column, 16)
+            decoded[name] = [bool(mask >> index & 1) for index in range(count)]
+        else:
+            decoded[name] = column
+    return [
+        {name: values[index] for name, values in decoded.items()}
+        for index in range(count)
+    ]
+
+
+def _delta_encode(layers: dict[str, LayerModel]) -> dict[str, dict]:
+    # Replaces each delta-encoded layer in layers with nothing but its delta.
+    base = layers.get("0")
+    if base is None:
+        raise ValueError("Delta layers need layer 0")
+    deltas: dict[str, dict] = {}
+    for key, model in list(layers.items()):
+        delta = None if model is base else layer_delta(base, model)
+        if delta is not None:
+            deltas[key] = delta
+            del layers[key]
+    return deltas
+
+
+def layer_delta(base: LayerModel, model: LayerModel) -> dict | None:
+    """Return how model differs from base, or None if their shapes differ.
+
+    The delta holds each top-level field whose value differs, such as "layer",
+    and under "keys" and "encoders" each item that differs, by its index. A
+    transparent key usually shows its base key unchanged, so keys are compared
+    without their transparent flag, which "transparent" holds instead as a hex
+    mask with bit i for the i-th key.
+    """
+    if (
+        type(model) is not type(base)
+        or len(model.keys) != len(base.keys)
+        or len(model.encoders) != len(base.encoders)
+    ):
+        return None
+    delta: dict = {
+        field.name: getattr(model, field.name)
+        for field in fields(model)
+        if field.name not in ("keys", "encoders")
+        and getattr(model, field.name) != getattr(base, field.name)
+    }
+    delta["keys"] = {
+        str(index): key
+        for index, (key, base_key) in enumerate(zip(model.keys, base.keys))
+        if replace(key, transparent=base_key.transparent) != base_key
+    }
+    transparent = sum(
+        1 << index for index, key in enumerate(model.keys) if key.transparent
+    )
+    delta["transparent"] = f"{transparent:x}"
+    delta["encoders"] = {
+        str(index): encoder
+        for index, (encoder, base_encoder) in enumerate(
+            zip(model.encoders, base.encoders)
+        )
+        if encoder != base_encoder
+    }
+    return delta
+
+
+def expand_layer_deltas(document: dict) -> dict:
+    """Return a consolidated model with every delta-encoded layer stored in full.
+
+    Deltas are expanded against layer 0, before any layer references, which
+    may name a delta-encoded layer.
+    """
+    deltas = document.get("layer_deltas", {})
+    layers = dict(document["layers"])
+    if deltas and "0" not in layers:
+        raise ValueError("Layer deltas need layer 0")
+    for key, delta in deltas.items():
+        base = layers["0"]
+        transparent = int(delta["transparent"], 16)
+        layer = {**base, **delta}
+        del layer["transparent"]
+        layer["keys"] = [
+            delta["keys"].get(str(index))
+            or {**base_key, "transparent": bool(transparent >> index & 1)}
+            for index, base_key in enumerate(base["keys"])
+        ]
+        layer["encoders"] = [
+            delta["encoders"].get(str(index), base_encoder)
+            for index, base_encoder in enumerate(base["encoders"])
+        ]
+        layers[key] = layer
+    expanded = {
+        **document,
+        "layers": dict(sorted(layers.items(), key=lambda item: int(item[0]))),
+    }
+    expanded.pop("layer_deltas", None)
+    return expanded
+
+
+def layer_change_masks(base: LayerModel, model: LayerModel) -> dict[str, str]:
+    """Return hex masks of the keys that differ from base and that are transparent.
+
+    Bit i stands for the layer's i-th key, and the bits after its keys for
+    its encoders in order. An encoder is transparent when all its actions are.
+    Transparency alone is not a change: a key falling through to base shows
+    what base shows, though it switches no layer of its own.
+    """
+    if len(model.keys) != len(base.keys) or len(model.encoders) != len(base.encoders):
+        raise ValueError(f"Layer {model.layer} does not match the base layer's shape")
+    changed = 0
+    for bit, (key, base_key) in enumerate(zip(model.keys, base.keys, strict=True)):
+        shown = replace(
+            key,
+            transparent=base_key.transparent,
+            momentary_layer=(
+                base_key.momentary_layer if key.transparent else key.momentary_layer
+            ),
+        )
+        if shown != base_key:
+            changed |= 1 << bit
+    for bit, (encoder, base_encoder) in enumerate(
+        zip(model.encoders, base.encoders, strict=True), start=len(model.keys)
+    ):
+        shown = replace(
+            encoder,
+            counter_clockwise_transparent=base_encoder.counter_clockwise_transparent,
+            clockwise_transparent=base_encoder.clockwise_transparent,
+            press_transparent=base_encoder.press_transparent,
+            momentary_layer=(
+                base_encoder.momentary_layer
+                if encoder.press_transparent
+                else encoder.momentary_layer
+            ),
+        )
+        if shown != base_encoder:
+            changed |= 1 << bit
+    transparent = sum(
+        1 << bit
+        for bit, item in enumerate([*model.keys, *model.encoders])
+        if _transparent(item)
+    )
+    return {"changed": f"{changed:x}", "transparent": f"{transparent:x}"}
+
+
+def _transparent(item: DisplayKey | DisplayEncoder | UnitKey | UnitEncoder) -> bool:
+    if isinstance(item, DisplayKey | UnitKey):
+        return item.transparent
+    return (
+        item.counter_clockwise_transparent
+        and item.clockwise_transparent
+        and item.press_transparent
+    )
+
+
+def _change_mask_sections(models: list[LayerModel], key_ids: tuple[int, ...]) -> dict:
+    base = next((model for model in models if model.layer == 0), None)
+    if base is None:
+        raise ValueError("Change masks need layer 0")
+    if len(key_ids) != len(base.keys):
+        raise ValueError(f"{len(key_ids)} key IDs given for {len(base.keys)} keys")
+    return {
+        "key_ids": list(key_ids),
+        "encoder_ids": list(range(len(base.encoders))),
+        "change_masks": {
+            str(model.layer): layer_change_masks(base, model) for model in models
+        },
+    }
+
+
+def expand_layer_references(document: dict) -> dict:
+    """Return a consolidated model with every referenced layer stored in full."""
+    layers = dict(document["layers"])
+    for key, original in document.get("layer_references", {}).items():
+        if str(original) not in layers:
+            raise ValueError(f"Layer {key} refers to missing layer {original}")
+        layers[key] = {**layers[str(original)], "layer": int(key)}
+    expanded = {**document, "layers": layers}
+    expanded.pop("layer_references", None)
+    return expanded
+
+
+def _identical_layer(
+    model: LayerModel, distinct: list[LayerModel]
+) -> LayerModel | None:
+    return next(
+        (
+            original
+            for original in distinct
+            if replace(model, layer=original.layer) == original
+        ),
+        None,
+    )
+
+
+def compose_overlay_model(
+    models: list[LayerModel], held_layers: list[int]
+) -> LayerModel:
+    """Compose held layers over layer 0 exactly as the runtime does."""
+    # Mirrors compose_model in keymap-overlay-runtime: ascending layer order
+    # is QMK's precedence, and a transparent position keeps what lies below.
+    by_layer = {model.layer: model for model in models}
+    model = by_layer[0]
+    keys = list(model.keys)
+    encoders = list(model.encoders)
+    for layer in sorted(held_layers):
+        overlay = by_layer[layer]
+        if type(overlay) is not type(model):
+            raise ValueError(
+                f"Layer {layer} and the base layer mix unit-space and pixel models"
+            )
+        if len(overlay.keys) != len(keys) or len(overlay.encoders) != len(encoders):
+            raise ValueError(f"Layer {layer} does not match the base layer's shape")
+        keys = [
+            key if overlay_key.transparent else overlay_key
+            for key, overlay_key in zip(keys, overlay.keys, strict=True)
+        ]
+        encoders = [
+            _overlay_encoder(encoder, overlay_encoder)
+            for encoder, overlay_encoder in zip(encoders, overlay.encoders, strict=True)
+        ]
+        model = replace(model, layer=layer)
+    # Unlike the runtime, which promotes the version 1 files it reads, keep the
+    # version: these models are already 2, or 3 in unit space.
+    return replace(
+        model,
+        keys=[replace(key, held=key.momentary_layer in held_layers) for key in keys],
+        encoders=[
+            replace(encoder, held=encoder.momentary_layer in held_layers)
+            for encoder in encoders
+        ],
+    )
+
+
+def _overlay_encoder(
+    encoder: DisplayEncoder | UnitEncoder, overlay: DisplayEncoder | UnitEncoder
+) -> DisplayEncoder | UnitEncoder:
+    # Each action falls through on its own; the position and size never change.
+    if not overlay.counter_clockwise_transparent:
+        encoder = replace(encoder, counter_clockwise=overlay.counter_clockwise)
+    if not overlay.clockwise_transparent:
+        encoder = replace(encoder, clockwise=overlay.clockwise)
+    if not overlay.press_transparent:
+        encoder = replace(
+            encoder, press=overlay.press, momentary_layer=overlay.momentary_layer
+        )
+    return encoder
+
+
+def precompose_layer_combinations(
+    models: list[LayerModel], budget: int
+) -> dict[str, LayerModel]:
+    """Compose every reachable combination of held layers, up to a budget.
+
+    Combinations nearest the base layer come first; past the budget the rest
+    are left for the runtime to compose, and the overflow is reported.
+    """
+    combinations = _reachable_layer_combinations(models, budget + 1)
+    if len(combinations) > budget:
+        logger.warning(
+            "More than %d held-layer combinations are reachable; precomposed the"
+            " first %d and left the rest to the runtime",
+            budget,
+            budget,
+        )
+    return {
+        "+".join(map(str, held)): compose_overlay_model(models, list(held))
+        for held in combinations[:budget]
+    }
+
+
+def _reachable_layer_combinations(
+    models: list[LayerModel], limit: int
+) -> list[tuple[int, ...]]:
+    # Breadth-first from nothing held, so smaller combinations come first.
+    layers = {model.layer for model in models}
+    found: list[tuple[int, ...]] = []
+    seen: set[tuple[int, ...]] = {()}
+    queue: deque[tuple[int, ...]] = deque([()])
+    while queue and len(found) < limit:
+        for combination in _next_combinations(models, layers, queue.popleft()):
+            if combination not in seen:
+                seen.add(combination)
+                found.append(combination)
+                queue.append(combination)
+    return found[:limit]
+
+
+def _next_combinations(
+    models: list[LayerModel], layers: set[int], held: tuple[int, ...]
+) -> list[tuple[int, ...]]:
+    # Pressing a momentary key the composed model shows adds its layer.
+    # Releasing any held key removes one, which QMK allows even once the layer
+    # that key sits on is no longer held.
+    composed = compose_overlay_model(models, list(held))
+    shown = {key.momentary_layer for key in composed.keys} | {
+        encoder.momentary_layer for encoder in composed.encoders
+    }
+    presses = [
+        tuple(sorted((*held, layer))) for layer in sorted(layers & shown - set(held))
+    ]
+    releases = [tuple(other for other in held if other != layer) for layer in held]
+    return presses + releases
+
+
+def write_scaled_models(
+    keyboard_id: int,
+    models: dict[int | None, dict[OverlayPlatform, list[LayerModel]]],
+    asset_dir: Path,
+    export: ExportOptions = ExportOptions(),
+    key_ids: tuple[int, ...] | None = None,
+) -> list[Path]:
+    """Write each scale's models, the first as <id>.json, others as <id>@<n>.json."""
+    outputs: list[Path] = []
+    for index, (scale, scaled_models) in enumerate(models.items()):
+        suffix = "" if index == 0 else f"@{scale}"
+        outputs.extend(
+            write_platform_models(
+                keyboard_id, scaled_models, asset_dir, export, suffix, key_ids
+            )
+        )
+    return outputs
+
+
+def write_platform_models(
+    keyboard_id: int,
+    models: dict[OverlayPlatform, list[LayerModel]],
+    asset_dir: Path,
+    export: ExportOptions = ExportOptions(),
+    suffix: str = "",
+    key_ids: tuple[int, ...] | None = None,
+) -> list[Path]:
+    """Write each platform's consolidated model to <asset_dir>/<platform>/.
+
+    Change masks, when the export asks for them, need the keys' layout indices.
+    A binary model, when asked for, is written beside each as <id>.bin, and a
+    compressed one as <id>.json plus the codec's suffix.
+    """
+    outputs: list[Path] = []
+    for platform, platform_models in models.items():
+        output = asset_dir / platform / f"{keyboard_id}{suffix}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        data = overlay_json_bytes(
+            _consolidate(keyboard_id, platform_models, export, key_ids)
+        )
+        write_bytes_atomically(output, data)
+        outputs.append(output)
+        if export.compression is not None:
+            compressed = output.with_name(
+                output.name + compressed_suffix(export.compression)
+            )
+            write_bytes_atomically(compressed, compress_model(data, export.compression))
+            outputs.append(compressed)
+        if export.binary_model:
+            binary = output.with_suffix(".bin")
+            write_bytes_atomically(
+                binary,
+                binary_model_bytes(
+                    keyboard_id,
+                    {str(model.layer): asdict(model) for model in platform_models},
+                ),
+            )
+            outputs.append(binary)
+    return outputs
+
+
+def _write_all_layers(
+    scaled_models: dict[int | None, dict[OverlayPlatform, list[LayerModel]]],
+    keyboard_id: int | None,
+    output_prefix: Path | None,
+    asset_dir: Path | None,
+    export: ExportOptions,
+    key_ids: tuple[int, ...],
+) -> None:
+    # Per-layer files are a debugging aid once the consolidated model can be
+    # written directly, so they are only written when a prefix asks for them.
+    models = next(iter(scaled_models.values()))
+    if output_prefix is not None:
+        for model in next(iter(models.values())):
+            write_bytes_atomically(
+                output_prefix.with_name(f"{output_prefix.name}L{model.layer}.json"),
+                overlay_json_bytes(model),
+            )
+    if keyboard_id is None:
+        return
+    if asset_dir is not None:
+        write_scaled_models(keyboard_id, scaled_models, asset_dir, export, key_ids)
+        return
+    write_stdout_bytes(
+        overlay_json_bytes(
+            _consolidate(keyboard_id, next(iter(models.values())), export, key_ids)
+        )
+    )
+
+
+def _consolidate(
+    keyboard_id: int,
+    models: list[LayerModel],
+    export: ExportOptions,
+    key_ids: tuple[int, ...] | None,
+) -> dict:
+    combinations = (
+        None
+        if export.precompose_budget is None
+        else precompose_layer_combinations(models, export.precompose_budget)
+    )
+    if export.change_masks and key_ids is None:
+        raise ValueError("Change masks need the keys' layout indices")
+    return _consolidated_records(
+        keyboard_id,
+        models,
+        combinations,
+        export.deduplicate_layers,
+        key_ids if export.change_masks else None,
+        export.delta_layers,
+        export.shared_tables,
+    )
+
+
+def overlay_json_bytes(value: object) -> bytes:
+    """Serialize a model the compact, UTF-8 way every installed file uses.
+
+    Display records are written field by field straight into the output, with
+    the same bytes json.dumps would give their dataclasses.asdict.
+    """
+    # asdict deep-copies every label list into a dict tree that json.dumps
+    # then walks again; across a fleet's layers that copy dominates the write.
+    out: list[str] = []
+    _write_json(value, out)
+    out.append("\n")
+    return "".join(out).encode()
+
+
+def _float_json(value: float) -> str:
+    return repr(value) if math.isfinite(value) else json.dumps(value)
+
+
+_JSON_SCALARS: dict[type, Callable[[Any], str]] = {
+    str: encode_basestring,
+    int: int.__repr__,
+    bool: lambda value: "true" if value else "false",
+    float: _float_json,
+    type(None): lambda _: "null",
+}
+
+
+def _write_json(value: object, out: list[str]) -> None:
+    scalar = _JSON_SCALARS.get(type(value))
+    if scalar is not None:
+        out.append(scalar(value))
+    elif isinstance(value, dict):
+        _write_object(value, out)
+    elif isinstance(value, list | tuple):
+        _write_array(value, out)
+    else:
+        _write_record(value, out)
+
+
+def _write_array(values: list | tuple, out: list[str]) -> None:
+    out.append("[")
+    for index, item in enumerate(values):
+        if index:
+            out.append(",")
+        _write_json(item, out)
+    out.append("]")
+
+
+def _write_object(value: dict, out: list[str]) -> None:
+    out.append("{")
+    for index, (key, item) in enumerate(value.items()):
+        if index:
+            out.append(",")
+        # json.dumps writes a non-string key such as an int as its JSON text.
+        out.append(encode_basestring(key if isinstance(key, str) else json.dumps(key)))
+        out.append(":")
+        _write_json(item, out)
+    out.append("}")
+
+
+def _write_record(value: object, out: list[str]) -> None:
+    prefixes = _record_prefixes(type(value))
+    if prefixes is None:
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+    for name, prefix in prefixes:
+        out.append(prefix)
+        _write_json(getattr(value, name), out)
+    out.append("}")
+
+
+@functools.cache
+def _record_prefixes(record_type: type) -> tuple[tuple[str, str], ...] | None:
+    # Each field's opening text, such as '{"x":' or ',"y":', is encoded once
+    # per record type rather than once per record.
+    try:
+        names = [field.name for field in fields(record_type)]
+    except TypeError:
+        return None
+    return tuple(
+        (name, ("{" if index == 0 else ",") + encode_basestring(name) + ":")
+        for index, name in enumerate(names)
     )
 
 
@@ -309,8 +1986,6 @@ def _validate_layer(
         raise ValueError(
             f"Layer {layer_index} has {len(keymap.layers[layer_index])} keys, layout has {len(layout)}"
         )
-    if any(key.r != 0 for key in layout):
-        raise ValueError("Rotated QMK layouts are not supported yet")
 
 
 def _resolve_encoder_placements(
@@ -347,7 +2022,8 @@ def _resolve_encoder_placement(
             )
         key_index = matrix_to_index[placement.matrix]
         key = layout[key_index]
-        return key_index, key.x, key.y, key.w, key.h
+        box, _ = _turned_key(key.x, key.y, key.w, key.h, key.r, key.rx, key.ry)
+        return key_index, *box
     assert placement.x is not None and placement.y is not None
     return None, placement.x, placement.y, 1.0, 1.0
 
@@ -412,90 +2088,128 @@ def _padded_encoder_pairs(
     return output
 
 
-def _build_layer_model(
+def layout_geometry(
     layout: list[LayoutKey],
-    layer: list[str],
-    raw_layer: list[str],
     placements: list[tuple[int | None, float, float, float, float]],
-    encoder_pairs: list[list[str]],
-    raw_encoder_pairs: list[list[str]],
-    display_labels: dict[str, str],
-    layer_index: int,
-    pixels_per_unit: int,
-) -> OverlayModel:
-    bounds = [(key.x, key.y, key.w, key.h) for key in layout]
-    bounds.extend((x, y, width, height) for _, x, y, width, height in placements)
-    min_x = min(x for x, _, _, _ in bounds)
-    min_y = min(y for _, y, _, _ in bounds)
-    max_x = max(x + width for x, _, width, _ in bounds)
-    max_y = max(y + height for _, y, _, height in bounds)
-    width, height = _canvas_size(min_x, min_y, max_x, max_y, pixels_per_unit, 1)
-    keys: list[DisplayKey] = []
-    encoders: list[DisplayEncoder] = []
+) -> LayoutGeometry:
+    """Measure a layout and its encoder placements once, for all its layers.
 
+    A rotated key is drawn as an upright box around the point its centre
+    turns to; the canvas also covers its turned corners.
+    """
     encoder_key_indices = {
         key_index for key_index, *_ in placements if key_index is not None
     }
-    for key_index, key in enumerate(layout):
-        if key_index in encoder_key_indices:
-            continue
-        box = _inset_box(
-            _pixel_box(
-                key.x,
-                key.y,
-                key.w,
-                key.h,
-                min_x,
-                min_y,
-                pixels_per_unit,
-                1,
-            ),
-            KEY_INSET,
-        )
-        left, top, right, bottom = box
-        keycode = layer[key_index]
-        raw_keycode = raw_layer[key_index]
-        keys.append(
-            DisplayKey(
-                x=left,
-                y=top,
-                width=right - left,
-                height=bottom - top,
-                label=_wrap_label(_format_keycode(keycode, display_labels), 3, 10),
-                held=_momentary_layer(keycode) == layer_index,
-                transparent=raw_keycode in TRANSPARENT_KEYS,
-                momentary_layer=_momentary_layer(raw_keycode),
-            )
-        )
+    key_indices = tuple(
+        key_index
+        for key_index in range(len(layout))
+        if key_index not in encoder_key_indices
+    )
+    turned = [
+        _turned_key(key.x, key.y, key.w, key.h, key.r, key.rx, key.ry) for key in layout
+    ]
+    boxes = [box for box, _ in turned]
+    boxes.extend((x, y, width, height) for _, x, y, width, height in placements)
+    extents = [(x, y, x + width, y + height) for x, y, width, height in boxes]
+    extents.extend(extent for _, extent in turned)
+    min_x = min(left for left, _, _, _ in extents)
+    min_y = min(top for _, top, _, _ in extents)
+    max_x = max(right for _, _, right, _ in extents)
+    max_y = max(bottom for _, _, _, bottom in extents)
+    return LayoutGeometry(
+        width=max_x - min_x,
+        height=max_y - min_y,
+        key_indices=key_indices,
+        keys=_box_columns([boxes[index] for index in key_indices], min_x, min_y),
+        key_rotations=array("d", (layout[index].r for index in key_indices)),
+        encoders=_box_columns(boxes[len(layout) :], min_x, min_y),
+    )
+
+
+@functools.cache
+def _turned_key(
+    x: float,
+    y: float,
+    width: float,
+    height: float,
+    rotation: float,
+    origin_x: float | None,
+    origin_y: float | None,
+) -> tuple[tuple[float, float, float, float], tuple[float, float, float, float]]:
+    """Return a key's upright box and the extent of its turned corners.
+
+    QMK turns a key clockwise by rotation degrees about (rx, ry), which
+    default to the layout origin as in KLE. Keys repeat across keyboards and
+    renders, so each distinct key is turned once.
+    """
+    if rotation == 0:
+        return (x, y, width, height), (x, y, x + width, y + height)
+    angle = math.radians(rotation)
+    cos, sin = math.cos(angle), math.sin(angle)
+    origin_x = origin_x or 0.0
+    origin_y = origin_y or 0.0
+
+    def turn(point_x: float, point_y: float) -> tuple[float, float]:
+        dx, dy = point_x - origin_x, point_y - origin_y
+        return origin_x + dx * cos - dy * sin, origin_y + dx * sin + dy * cos
+
+    center_x, center_y = turn(x + width / 2, y + height / 2)
+    corners = [
+        turn(corner_x, corner_y)
+        for corner_x in (x, x + width)
+        for corner_y in (y, y + height)
+    ]
+    return (
+        (center_x - width / 2, center_y - height / 2, width, height),
+        (
+            min(corner_x for corner_x, _ in corners),
+            min(corner_y for _, corner_y in corners),
+            max(corner_x for corner_x, _ in corners),
+            max(corner_y for _, corner_y in corners),
+        ),
+    )
+
+
+def _box_columns(
+    boxes: list[tuple[float, float, float, float]], min_x: float, min_y: float
+) -> BoxColumns:
+    return BoxColumns(
+        x=array("d", (x - min_x for x, _, _, _ in boxes)),
+        y=array("d", (y - min_y for _, y, _, _ in boxes)),
+        width=array("d", (width for _, _, width, _ in boxes)),
+        height=array("d", (height for _, _, _, height in boxes)),
+    )
+
 
-    for encoder_index, placement in enumerate(placements):
-        key_index, x, y, key_width, key_height = placement
-        box = _pixel_box(
-            x,
-            y,
-            key_width,
-            key_height,
-            min_x,
-            min_y,
-            pixels_per_unit,
-            1,
+def _build_layer_plan(
+    geometry: LayoutGeometry,
+    layer: list[str],
+    raw_layer: list[str],
+    placements: list[tuple[int | None, float, float, float, float]],
+    encoder_pairs: list[list[str]],
+    raw_encoder_pairs: list[list[str]],
+    layer_index: int,
+) -> _LayerPlan:
+    keys = [
+        _KeyPlan(
+            keycode=layer[key_index],
+            held=parse_keycode(layer[key_index]).momentary_layer == layer_index,
+            transparent=raw_layer[key_index] in TRANSPARENT_KEYS,
+            momentary_layer=parse_keycode(raw_layer[key_index]).momentary_layer,
         )
+        for key_index in geometry.key_indices
+    ]
+    encoders: list[_EncoderPlan] = []
+    for encoder_index, (key_index, *_) in enumerate(placements):
         press = layer[key_index] if key_index is not None else "KC_NO"
         raw_press = raw_layer[key_index] if key_index is not None else "KC_NO"
-        left, top, right, bottom = _inset_box(_square_box(box), 2)
-        directions = [
-            _format_keycode(code, display_labels)
-            for code in encoder_pairs[encoder_index]
-        ]
+        counter_clockwise, clockwise = encoder_pairs[encoder_index]
         encoders.append(
-            DisplayEncoder(
-                x=left,
-                y=top,
-                size=min(right - left, bottom - top),
-                counter_clockwise=_wrap_label(directions[0], 2, 5),
-                clockwise=_wrap_label(directions[1], 2, 5),
-                press=_format_keycode(press, display_labels),
-                held=_momentary_layer(press) == layer_index,
+            _EncoderPlan(
+                counter_clockwise=counter_clockwise,
+                clockwise=clockwise,
+                press=press,
+                held=parse_keycode(press).momentary_layer == layer_index,
                 counter_clockwise_transparent=(
                     raw_encoder_pairs[encoder_index][0] in TRANSPARENT_KEYS
                 ),
@@ -503,36 +2217,224 @@ def _build_layer_model(
                     raw_encoder_pairs[encoder_index][1] in TRANSPARENT_KEYS
                 ),
                 press_transparent=raw_press in TRANSPARENT_KEYS,
-                momentary_layer=_momentary_layer(raw_press),
+                momentary_layer=parse_keycode(raw_press).momentary_layer,
             )
         )
+    return _LayerPlan(
+        layer=layer_index, geometry=geometry, keys=keys, encoders=encoders
+    )
+
+
+def _label_layer(plan: _LayerPlan, labels: LabelEngine) -> UnitOverlayModel:
+    """Format one platform's labels onto a shared layer plan."""
+    key_boxes = plan.geometry.keys
+    encoder_boxes = plan.geometry.encoders
+    return UnitOverlayModel(
+        version=UNIT_MODEL_VERSION,
+        layer=plan.layer,
+        width=plan.geometry.width,
+        height=plan.geometry.height,
+        padding=PADDING,
+        header_height=HEADER_HEIGHT,
+        key_inset=KEY_INSET,
+        encoder_inset=ENCODER_INSET,
+        header_font=HEADER_FONT,
+        key_font=KEY_FONT,
+        encoder_font=ENCODER_FONT,
+        keys=[
+            UnitKey(
+                x=key_boxes.x[index],
+                y=key_boxes.y[index],
+                width=key_boxes.width[index],
+                height=key_boxes.height[index],
+                rotation=plan.geometry.key_rotations[index],
+                label=list(labels.wrapped(key.keycode, 3, 10)),
+                held=key.held,
+                transparent=key.transparent,
+                momentary_layer=key.momentary_layer,
+            )
+            for index, key in enumerate(plan.keys)
+        ],
+        encoders=[
+            UnitEncoder(
+                x=encoder_boxes.x[index],
+                y=encoder_boxes.y[index],
+                width=encoder_boxes.width[index],
+                height=encoder_boxes.height[index],
+                counter_clockwise=list(labels.wrapped(encoder.counter_clockwise, 2, 5)),
+                clockwise=list(labels.wrapped(encoder.clockwise, 2, 5)),
+                press=labels.text(encoder.press),
+                held=encoder.held,
+                counter_clockwise_transparent=encoder.counter_clockwise_transparent,
+                clockwise_transparent=encoder.clockwise_transparent,
+                press_transparent=encoder.press_transparent,
+                momentary_layer=encoder.momentary_layer,
+            )
+            for index, encoder in enumerate(plan.encoders)
+        ],
+    )
+
+
+def pixel_overlay_model(
+    model: UnitOverlayModel,
+    pixels_per_unit: int,
+    geometry: LayoutGeometry | None = None,
+) -> OverlayModel:
+    """Scale a unit-space model to the pixel model the runtime installs.
+
+    Given the geometry the model was planned on, its pixel boxes are reused
+    from any earlier model of that layout at this scale.
+    """
+    pixels = _pixel_geometry(
+        geometry or _model_geometry(model),
+        pixels_per_unit,
+        model.padding,
+        model.header_height,
+        model.key_inset,
+        model.encoder_inset,
+    )
     return OverlayModel(
         version=2,
-        layer=layer_index,
+        layer=model.layer,
+        width=pixels.width,
+        height=pixels.height,
+        header_font_size=model.header_font.size(pixels_per_unit),
+        key_font_size=model.key_font.size(pixels_per_unit),
+        encoder_font_size=model.encoder_font.size(pixels_per_unit),
+        keys=[
+            _pixel_key(key, box)
+            for key, box in zip(model.keys, pixels.keys, strict=True)
+        ],
+        encoders=[
+            _pixel_encoder(encoder, box)
+            for encoder, box in zip(model.encoders, pixels.encoders, strict=True)
+        ],
+    )
+
+
+def _scale_models(
+    models: list[UnitOverlayModel],
+    pixels_per_unit: int | None,
+    geometry: LayoutGeometry,
+) -> list[LayerModel]:
+    if pixels_per_unit is None:
+        return list(models)
+    # A renumbered repeat of a layer shares its key list, so it is scaled once
+    # and keeps sharing its original's lists.
+    scaled: dict[int, OverlayModel] = {}
+    pixel_models: list[LayerModel] = []
+    for model in models:
+        original = scaled.get(id(model.keys))
+        if original is None:
+            original = scaled[id(model.keys)] = pixel_overlay_model(
+                model, pixels_per_unit, geometry
+            )
+        pixel_models.append(replace(original, layer=model.layer))
+    return pixel_models
+
+
+def _model_geometry(model: UnitOverlayModel) -> LayoutGeometry:
+    def columns(boxes: list[UnitKey] | list[UnitEncoder]) -> BoxColumns:
+        return BoxColumns(
+            x=array("d", (box.x for box in boxes)),
+            y=array("d", (box.y for box in boxes)),
+            width=array("d", (box.width for box in boxes)),
+            height=array("d", (box.height for box in boxes)),
+        )
+
+    return LayoutGeometry(
+        width=model.width,
+        height=model.height,
+        key_indices=tuple(range(len(model.keys))),
+        keys=columns(model.keys),
+        key_rotations=array("d", (key.rotation for key in model.keys)),
+        encoders=columns(model.encoders),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _PixelGeometry:
+    """A layout's canvas and inset boxes at one scale, as x, y and extent."""
+
+    width: int
+    height: int
+    keys: list[tuple[int, int, int, int]]
+    encoders: list[tuple[int, int, int]]
+
+
+@functools.lru_cache(maxsize=64)
+def _pixel_geometry(
+    geometry: LayoutGeometry,
+    pixels_per_unit: int,
+    padding: int,
+    header_height: int,
+    key_inset: int,
+    encoder_inset: int,
+) -> _PixelGeometry:
+    def boxes(columns: BoxColumns) -> list[tuple[int, int, int, int]]:
+        return [
+            _pixel_box(x, y, width, height, pixels_per_unit, padding, header_height)
+            for x, y, width, height in zip(
+                columns.x, columns.y, columns.width, columns.height, strict=True
+            )
+        ]
+
+    width, height = _canvas_size(
+        geometry.width, geometry.height, pixels_per_unit, padding, header_height
+    )
+    keys = []
+    for box in boxes(geometry.keys):
+        left, top, right, bottom = _inset_box(box, key_inset)
+        keys.append((left, top, right - left, bottom - top))
+    encoders = []
+    for box in boxes(geometry.encoders):
+        left, top, right, bottom = _inset_box(_square_box(box), encoder_inset)
+        encoders.append((left, top, min(right - left, bottom - top)))
+    return _PixelGeometry(width=width, height=height, keys=keys, encoders=encoders)
+
+
+def _pixel_key(key: UnitKey, box: tuple[int, int, int, int]) -> DisplayKey:
+    x, y, width, height = box
+    return DisplayKey(
+        x=x,
+        y=y,
         width=width,
         height=height,
-        header_font_size=max(14, pixels_per_unit // 4),
-        key_font_size=max(10, pixels_per_unit // 5),
-        encoder_font_size=max(10, pixels_per_unit // 6),
-        keys=keys,
-        encoders=encoders,
+        label=key.label,
+        held=key.held,
+        transparent=key.transparent,
+        momentary_layer=key.momentary_layer,
+    )
+
+
+def _pixel_encoder(encoder: UnitEncoder, box: tuple[int, int, int]) -> DisplayEncoder:
+    x, y, size = box
+    return DisplayEncoder(
+        x=x,
+        y=y,
+        size=size,
+        counter_clockwise=encoder.counter_clockwise,
+        clockwise=encoder.clockwise,
+        press=encoder.press,
+        held=encoder.held,
+        counter_clockwise_transparent=encoder.counter_clockwise_transparent,
+        clockwise_transparent=encoder.clockwise_transparent,
+        press_transparent=encoder.press_transparent,
+        momentary_layer=encoder.momentary_layer,
     )
 
 
 def _canvas_size(
-    min_x: float,
-    min_y: float,
-    max_x: float,
-    max_y: float,
+    width: float,
+    height: float,
     pixels_per_unit: int,
-    render_scale: int,
+    padding: int,
+    header_height: int,
 ) -> tuple[int, int]:
-    width = round((max_x - min_x) * pixels_per_unit) + 2 * PADDING * render_scale
-    height = (
-        round((max_y - min_y) * pixels_per_unit)
-        + (2 * PADDING + HEADER_HEIGHT) * render_scale
+    return (
+        round(width * pixels_per_unit) + 2 * padding,
+        round(height * pixels_per_unit) + 2 * padding + header_height,
     )
-    return width, height
 
 
 def _pixel_box(
@@ -540,15 +2442,12 @@ def _pixel_box(
     y: float,
     width: float,
     height: float,
-    min_x: float,
-    min_y: float,
     pixels_per_unit: int,
-    render_scale: int,
+    padding: int,
+    header_height: int,
 ) -> tuple[int, int, int, int]:
-    left = round((x - min_x) * pixels_per_unit) + PADDING * render_scale
-    top = (
-        round((y - min_y) * pixels_per_unit) + (PADDING + HEADER_HEIGHT) * render_scale
-    )
+    left = round(x * pixels_per_unit) + padding
+    top = round(y * pixels_per_unit) + padding + header_height
     return (
         left,
         top,
@@ -557,15 +2456,6 @@ def _pixel_box(
     )
 
 
-def _wrap_label(label: str, max_lines: int, max_chars: int) -> list[str]:
-    if not label:
-        return []
-    lines = wrap(label, width=max_chars, break_long_words=True)
-    if len(lines) <= max_lines:
-        return lines
-    return [*lines[: max_lines - 1], lines[max_lines - 1][: max_chars - 3] + "..."]
-
-
 def _format_keycode(keycode: str, display_labels: dict[str, str]) -> str:
     keycode = keycode.strip()
     if keycode in display_labels:
@@ -574,9 +2464,9 @@ def _format_keycode(keycode: str, display_labels: dict[str, str]) -> str:
         return ""
     if keycode in KEYCODE_LABELS:
         return KEYCODE_LABELS[keycode]
-    layer = _momentary_layer(keycode)
-    if layer is not None:
-        return f"L{layer}"
+    parsed = parse_keycode(keycode)
+    if parsed.layer_action == "MO" and parsed.layer is not None:
+        return f"L{parsed.layer}"
     for prefix in ("KC_", "QK_"):
         if keycode.startswith(prefix):
             keycode = keycode[len(prefix) :]
@@ -594,11 +2484,6 @@ def _vial_custom_keycode_labels(vial_definition_json: Path) -> dict[str, str]:
     }
 
 
-def _momentary_layer(keycode: str) -> int | None:
-    match = re.fullmatch(r"MO\((\d+)\)", keycode.replace(" ", ""))
-    return int(match.group(1)) if match else None
-
-
 def _center(box: tuple[int, int, int, int]) -> tuple[int, int]:
     left, top, right, bottom = box
     return (left + right) // 2, (top + bottom) // 2
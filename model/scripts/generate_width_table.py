@@ -0,0 +1,92 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import logging
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from model.src.text_width import east_asian_columns
+from model.src.util import initialize_logging
+
+logger = logging.getLogger(__name__)
+
+app = typer.Typer()
+
+DEFAULT_OUTPUT = Path("overlay/keymap-overlay-generator/src/width_table.rs")
+
+
+class WidthTableDriftError(Exception):
+    """Raised when the checked-in width table is stale."""
+
+
+@app.command()
+def main(
+    check: Annotated[
+        bool, typer.Option(help="Check the table without changing it")
+    ] = False,
+    output: Annotated[
+        Path, typer.Option(help="Generated Rust width table")
+    ] = DEFAULT_OUTPUT,
+) -> None:
+    """Generate or check the Vial generator's copy of the label column widths."""
+    initialize_logging()
+    try:
+        table = generate_width_table()
+        if check:
+            if output.read_text(encoding="utf-8") != table:
+                raise WidthTableDriftError(
+                    f"{output} is stale; run make width-table to regenerate it"
+                )
+        else:
+            output.write_text(table, encoding="utf-8", newline="\n")
+            logger.info("Generated %s", output)
+    except (WidthTableDriftError, OSError):
+        logger.exception("Failed to %s %s", "check" if check else "generate", output)
+        raise typer.Exit(code=1) from None
+
+
+def generate_width_table() -> str:
+    """Render east_asian_columns as Rust ranges of code points not one column wide.
+
+    Both generators then measure labels from the same Unicode data: the Python
+    one through unicodedata, the Vial one through this table.
+    """
+    lines = [
+        "// Generated by model/scripts/generate_width_table.py from the Unicode",
+        f"// {unicodedata.unidata_version} data in model/src/text_width.py; run",
+        "// make width-table rather than editing it.",
+        "",
+        "/// Sorted, disjoint inclusive code point ranges and the columns each",
+        "/// character in them takes. Every other character takes one column.",
+        "pub const WIDTH_RANGES: &[(u32, u32, u8)] = &[",
+    ]
+    lines.extend(
+        f"    (0x{start:X}, 0x{end:X}, {columns}),"
+        for start, end, columns in width_ranges()
+    )
+    lines.append("];")
+    return "\n".join(lines) + "\n"
+
+
+def width_ranges() -> list[tuple[int, int, int]]:
+    """Return the code point ranges whose characters are not one column wide."""
+    ranges: list[tuple[int, int, int]] = []
+    for code_point in range(sys.maxunicode + 1):
+        # Surrogates are not characters, and a Rust char cannot hold one.
+        if 0xD800 <= code_point <= 0xDFFF:
+            continue
+        columns = east_asian_columns(chr(code_point))
+        if columns == 1:
+            continue
+        if ranges and ranges[-1][1] == code_point - 1 and ranges[-1][2] == columns:
+            ranges[-1] = (ranges[-1][0], code_point, columns)
+        else:
+            ranges.append((code_point, code_point, columns))
+    return ranges
+
+
+if __name__ == "__main__":
+    app()
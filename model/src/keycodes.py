@@ -0,0 +1,222 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import functools
+import re
+from dataclasses import dataclass
+from typing import Literal, get_args
+
+LayerAction = Literal["MO", "LT", "TG", "TT", "OSL", "LM", "TO", "DF"]
+KeycodeKind = Literal["basic", "layer", "mod_tap", "modified", "other"]
+
+LAYER_ACTIONS: frozenset[str] = frozenset(get_args(LayerAction))
+# Layer actions that switch the layer on only while the key is held down.
+MOMENTARY_LAYER_ACTIONS = frozenset({"MO", "LT", "TT", "OSL", "LM"})
+
+_HYPER = ("LCTL", "LSFT", "LALT", "LGUI")
+_MEH = ("LCTL", "LSFT", "LALT")
+
+# Modifier wrappers such as LCTL(kc), keyed by every QMK spelling.
+MODIFIER_WRAPPERS: dict[str, tuple[str, ...]] = {
+    "LCTL": ("LCTL",),
+    "C": ("LCTL",),
+    "LSFT": ("LSFT",),
+    "S": ("LSFT",),
+    "LALT": ("LALT",),
+    "A": ("LALT",),
+    "LOPT": ("LALT",),
+    "LGUI": ("LGUI",),
+    "G": ("LGUI",),
+    "LCMD": ("LGUI",),
+    "LWIN": ("LGUI",),
+    "RCTL": ("RCTL",),
+    "RSFT": ("RSFT",),
+    "RALT": ("RALT",),
+    "ROPT": ("RALT",),
+    "ALGR": ("RALT",),
+    "RGUI": ("RGUI",),
+    "RCMD": ("RGUI",),
+    "RWIN": ("RGUI",),
+    "LCS": ("LCTL", "LSFT"),
+    "LCA": ("LCTL", "LALT"),
+    "LCG": ("LCTL", "LGUI"),
+    "LSA": ("LSFT", "LALT"),
+    "LSG": ("LSFT", "LGUI"),
+    "SGUI": ("LSFT", "LGUI"),
+    "SCMD": ("LSFT", "LGUI"),
+    "SWIN": ("LSFT", "LGUI"),
+    "LAG": ("LALT", "LGUI"),
+    "LCAG": ("LCTL", "LALT", "LGUI"),
+    "LSAG": ("LSFT", "LALT", "LGUI"),
+    "RCS": ("RCTL", "RSFT"),
+    "RCA": ("RCTL", "RALT"),
+    "RCG": ("RCTL", "RGUI"),
+    "RSA": ("RSFT", "RALT"),
+    "SAGR": ("RSFT", "RALT"),
+    "RSG": ("RSFT", "RGUI"),
+    "RAG": ("RALT", "RGUI"),
+    "RCAG": ("RCTL", "RALT", "RGUI"),
+    "RSAG": ("RSFT", "RALT", "RGUI"),
+    "MEH": _MEH,
+    "HYPR": _HYPER,
+}
+
+# Mod-taps such as LCTL_T(kc): the modifiers when held, the key when tapped.
+MOD_TAPS: dict[str, tuple[str, ...]] = {
+    **{
+        f"{name}_T": modifiers
+        for name, modifiers in MODIFIER_WRAPPERS.items()
+        if len(name) > 1
+    },
+    "CTL_T": ("LCTL",),
+    "SFT_T": ("LSFT",),
+    "ALT_T": ("LALT",),
+    "OPT_T": ("LALT",),
+    "GUI_T": ("LGUI",),
+    "CMD_T": ("LGUI",),
+    "WIN_T": ("LGUI",),
+    "C_S_T": ("LCTL", "LSFT"),
+    "ALL_T": _HYPER,
+}
+
+MOD_MASKS: dict[str, tuple[str, ...]] = {
+    **{
+        f"MOD_{name}": modifiers
+        for name, modifiers in MODIFIER_WRAPPERS.items()
+        if len(modifiers) == 1 and name == modifiers[0]
+    },
+    "MOD_MEH": _MEH,
+    "MOD_HYPR": _HYPER,
+}
+
+_CALL = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\((.*)\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class Keycode:
+    """One keycode expression from a keymap, tokenized once."""
+
+    text: str
+    kind: KeycodeKind
+    # The keycode itself for a basic keycode, otherwise the function name.
+    name: str
+    arguments: tuple[str, ...] = ()
+    layer_action: LayerAction | None = None
+    layer: int | None = None
+    modifiers: tuple[str, ...] = ()
+    # The key a layer-tap or mod-tap sends when tapped, or a modifier wrapper's
+    # wrapped key.
+    tap: "Keycode | None" = None
+
+    @property
+    def momentary_layer(self) -> int | None:
+        """The layer this key turns on only while held, if any."""
+        if self.layer_action in MOMENTARY_LAYER_ACTIONS:
+            return self.layer
+        return None
+
+
+@functools.cache
+def parse_keycode(text: str) -> Keycode:
+    """Parse a keycode expression such as KC_A, LT(1, KC_SPC) or LCTL_T(KC_A).
+
+    Results are interned: parsing the same text again returns the same object.
+    """
+    compact = _WHITESPACE.sub("", text)
+    match = _CALL.fullmatch(compact)
+    if match is None:
+        return Keycode(text=compact, kind="basic", name=compact)
+    name = match.group(1)
+    arguments = tuple(_split_arguments(match.group(2)))
+    if name in LAYER_ACTIONS:
+        return _layer_keycode(compact, name, arguments)
+    if name in MOD_TAPS and len(arguments) == 1:
+        return Keycode(
+            text=compact,
+            kind="mod_tap",
+            name=name,
+            arguments=arguments,
+            modifiers=MOD_TAPS[name],
+            tap=parse_keycode(arguments[0]),
+        )
+    if name == "MT" and len(arguments) == 2:
+        return Keycode(
+            text=compact,
+            kind="mod_tap",
+            name=name,
+            arguments=arguments,
+            modifiers=_mod_mask(arguments[0]),
+            tap=parse_keycode(arguments[1]),
+        )
+    if name in MODIFIER_WRAPPERS and len(arguments) == 1:
+        wrapped = parse_keycode(arguments[0])
+        return Keycode(
+            text=compact,
+            kind="modified",
+            name=name,
+            arguments=arguments,
+            modifiers=_merge_modifiers(MODIFIER_WRAPPERS[name], wrapped.modifiers),
+            tap=wrapped.tap if wrapped.kind == "modified" else wrapped,
+        )
+    return Keycode(text=compact, kind="other", name=name, arguments=arguments)
+
+
+def _layer_keycode(text: str, name: str, arguments: tuple[str, ...]) -> Keycode:
+    expected = 2 if name in ("LT", "LM") else 1
+    if len(arguments) != expected:
+        return Keycode(text=text, kind="other", name=name, arguments=arguments)
+    return Keycode(
+        text=text,
+        kind="layer",
+        name=name,
+        arguments=arguments,
+        layer_action=name,
+        layer=_layer_number(arguments[0]),
+        modifiers=_mod_mask(arguments[1]) if name == "LM" else (),
+        tap=parse_keycode(arguments[1]) if name == "LT" else None,
+    )
+
+
+def _split_arguments(arguments: str) -> list[str]:
+    # Arguments may nest, as in LT(1, LCTL(KC_A)), so split on top-level commas.
+    if not arguments:
+        return []
+    parts: list[str] = []
+    depth = 0
+    start = 0
+    for index, character in enumerate(arguments):
+        if character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+        elif character == "," and depth == 0:
+            parts.append(arguments[start:index])
+            start = index + 1
+    parts.append(arguments[start:])
+    return parts
+
+
+def _layer_number(argument: str) -> int | None:
+    # Symbolic layers such as _FN are left to the caller, which knows the enum.
+    # Like C, a 0x prefix means hexadecimal, but a leading zero is decimal here
+    # rather than octal, as QMK keymaps write MO(01) for layer 1. As in the
+    # Rust generator, a layer is a u8, so anything outside 0-255 is unresolved.
+    hexadecimal = argument[:2] in ("0x", "0X")
+    try:
+        number = int(argument[2:], 16) if hexadecimal else int(argument)
+    except ValueError:
+        return None
+    return number if 0 <= number <= 255 else None
+
+
+def _mod_mask(argument: str) -> tuple[str, ...]:
+    modifiers: tuple[str, ...] = ()
+    for mask in argument.strip("()").split("|"):
+        modifiers = _merge_modifiers(modifiers, MOD_MASKS.get(mask, ()))
+    return modifiers
+
+
+def _merge_modifiers(
+    first: tuple[str, ...], second: tuple[str, ...]
+) -> tuple[str, ...]:
+    return (*first, *(modifier for modifier in second if modifier not in first))
@@ -0,0 +1,70 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import json
+import logging
+from collections.abc import Callable
+from pathlib import Path
+
+from model.src.util import write_bytes_atomically
+
+logger = logging.getLogger(__name__)
+
+
+class LabelTableCache:
+    """Compiled keycode -> label tables, one file per digest of their sources.
+
+    A table whose sources hash the same as a previous build's is read back
+    as-is, without parsing or merging its label packs again. Each file is
+    named for its digest, so a changed pack can never hit a stale table, and
+    pruning removes every table the current build did not ask for.
+    """
+
+    def __init__(self, directory: Path | None) -> None:
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._used: set[Path] = set()
+
+    def table(
+        self, digest: str, compile_table: Callable[[], dict[str, str]]
+    ) -> dict[str, str]:
+        """Return the table compiled from sources hashing to digest."""
+        if self.directory is None:
+            return compile_table()
+        path = self.directory / f"{digest}.json"
+        self._used.add(path)
+        cached = self._load(path)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        table = compile_table()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        write_bytes_atomically(
+            path, json.dumps(table, ensure_ascii=False, separators=(",", ":")).encode()
+        )
+        return table
+
+    def prune(self) -> None:
+        """Delete the tables no lookup in this build asked for."""
+        if self.directory is None or not self.directory.is_dir():
+            return
+        for path in self.directory.glob("*.json"):
+            if path not in self._used:
+                path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _load(path: Path) -> dict[str, str] | None:
+        if not path.exists():
+            return None
+        # Like the layer cache, a damaged table costs a recompile, never the
+        # build.
+        try:
+            table = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable label table %s", path)
+            return None
+        if not isinstance(table, dict):
+            logger.warning("Ignoring malformed label table %s", path)
+            return None
+        return table
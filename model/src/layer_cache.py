@@ -0,0 +1,78 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from model.src.util import write_bytes_atomically
+
+logger = logging.getLogger(__name__)
+
+
+def content_digest(value: object) -> str:
+    """Hash a JSON-serializable value independently of dict insertion order."""
+    encoded = json.dumps(
+        value, ensure_ascii=False, separators=(",", ":"), sort_keys=True
+    ).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class LayerCache:
+    """Rendered layer models from the previous build, keyed by input digest.
+
+    The manifest maps platform -> layer -> {"digest", "model"}. A layer whose
+    digest is unchanged is reused as-is; saving keeps only the layers looked up
+    in this build for the platforms it rendered, so a shrunk layer count
+    cannot leave a stale entry behind.
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._previous = self._load(path)
+        self._current: dict[str, dict[str, dict]] = {}
+
+    def get(self, platform: str, layer: int, digest: str) -> dict | None:
+        """Return the cached model for this layer if its inputs are unchanged."""
+        entry = self._previous.get(platform, {}).get(str(layer))
+        if entry is None or entry.get("digest") != digest:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._current.setdefault(platform, {})[str(layer)] = entry
+        return entry["model"]
+
+    def put(self, platform: str, layer: int, digest: str, model: dict) -> None:
+        """Record a freshly rendered layer model for the next build."""
+        self._current.setdefault(platform, {})[str(layer)] = {
+            "digest": digest,
+            "model": model,
+        }
+
+    def save(self) -> None:
+        """Write the manifest, replacing each rendered platform's entries."""
+        if self.path is None:
+            return
+        manifest = {**self._previous, **self._current}
+        write_bytes_atomically(
+            self.path,
+            json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode(),
+        )
+
+    @staticmethod
+    def _load(path: Path | None) -> dict[str, dict[str, dict]]:
+        if path is None or not path.exists():
+            return {}
+        # The manifest is a disposable cache: an unreadable one costs a full
+        # render, never the build.
+        try:
+            manifest = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable layer cache %s", path)
+            return {}
+        if not isinstance(manifest, dict):
+            logger.warning("Ignoring malformed layer cache %s", path)
+            return {}
+        return manifest
@@ -0,0 +1,60 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+from collections import deque
+
+from model.src.keycodes import parse_keycode
+
+
+def layer_activation_graph(
+    layers: list[list[str]],
+    encoder_layers: list[list[list[str]]] | None = None,
+) -> dict[int, set[int | None]]:
+    """Map each layer to the layers its keys and encoder actions can activate.
+
+    A layer key whose layer is not a number, such as MO(_FN), maps to None.
+    """
+    encoder_layers = encoder_layers or []
+    graph: dict[int, set[int | None]] = {}
+    for layer_index, keycodes in enumerate(layers):
+        actions = [
+            *keycodes,
+            *(
+                keycode
+                for pair in (
+                    encoder_layers[layer_index]
+                    if layer_index < len(encoder_layers)
+                    else []
+                )
+                for keycode in pair
+            ),
+        ]
+        graph[layer_index] = {
+            parsed.layer
+            for parsed in map(parse_keycode, actions)
+            if parsed.layer_action is not None
+        }
+    return graph
+
+
+def reachable_layers(
+    layers: list[list[str]],
+    encoder_layers: list[list[list[str]]] | None = None,
+) -> list[int]:
+    """Return the layers reachable from layer 0 through layer keys, in order."""
+    # Transparent keys need no edges of their own: they only expose keys of
+    # layers that are already active, whose edges are already followed.
+    graph = layer_activation_graph(layers, encoder_layers)
+    if not graph:
+        return []
+    reached = {0}
+    queue = deque([0])
+    while queue:
+        for layer in graph[queue.popleft()]:
+            if layer is None:
+                # A reachable key names a layer this cannot resolve, which
+                # could be any of them, so prune nothing.
+                return list(graph)
+            if layer in graph and layer not in reached:
+                reached.add(layer)
+                queue.append(layer)
+    return sorted(reached)
@@ -0,0 +1,153 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+
+from model.src.util import write_bytes_atomically
+
+# Every keyboard's consolidated model in one file, so that a consumer with many
+# keyboard IDs opens and reads one file instead of one per keyboard.
+# Little-endian throughout:
+#
+#   header   BUNDLE_HEADER, at offset 0
+#   index    SLOT_COUNT BUNDLE_ENTRY records, one per keyboard ID in order,
+#            each the offset, length and SHA-256 of that keyboard's model, or
+#            all zero when the bundle has none
+#   models   each model's bytes, exactly as its <keyboard_id>.json
+#
+# The index has a slot for every possible keyboard ID, so it never moves: a
+# replaced model is appended and only its slot rewritten, leaving the others'
+# bytes untouched. The space it used is reclaimed the next time the whole
+# bundle is written, which replace_bundle_model does itself once that space
+# would outgrow the live models.
+MAGIC = b"KMOB"
+FORMAT_VERSION = 1
+SLOT_COUNT = 256
+# magic, format version.
+BUNDLE_HEADER = struct.Struct("<4sH2x")
+# offset, length and SHA-256 digest of one keyboard's model.
+BUNDLE_ENTRY = struct.Struct("<II32s")
+_MODELS_OFFSET = BUNDLE_HEADER.size + SLOT_COUNT * BUNDLE_ENTRY.size
+
+
+def write_model_bundle(path: Path, models: dict[int, bytes]) -> None:
+    """Replace path with a bundle of the given models, keyed by keyboard ID."""
+    slots = [BUNDLE_ENTRY.pack(0, 0, b"")] * SLOT_COUNT
+    offset = _MODELS_OFFSET
+    for keyboard_id, data in sorted(models.items()):
+        slots[_slot(keyboard_id)] = _entry(offset, data)
+        offset += len(data)
+    write_bytes_atomically(
+        path,
+        b"".join(
+            [
+                BUNDLE_HEADER.pack(MAGIC, FORMAT_VERSION),
+                *slots,
+                *(data for _, data in sorted(models.items())),
+            ]
+        ),
+    )
+
+
+def replace_bundle_model(path: Path, keyboard_id: int, data: bytes) -> None:
+    """Add or replace one keyboard's model without rewriting the others.
+
+    When the replaced models' dead space would exceed the live models, the
+    bundle is instead rewritten whole without it.
+    """
+    if not path.exists():
+        write_model_bundle(path, {keyboard_id: data})
+        return
+    slot = _slot(keyboard_id)
+    with path.open("r+b") as file:
+        head = file.read(_MODELS_OFFSET)
+        _check_header(path, head[: BUNDLE_HEADER.size])
+        live = len(data) + sum(
+            length
+            for other, (_, length, _) in _index(head).items()
+            if other != keyboard_id
+        )
+        offset = file.seek(0, os.SEEK_END)
+        if offset + len(data) - _MODELS_OFFSET <= 2 * live:
+            file.write(data)
+            # The model must be on disk before the slot names it: a crash in
+            # between leaves the previous model, never a slot past the end.
+            file.flush()
+            os.fsync(file.fileno())
+            file.seek(BUNDLE_HEADER.size + slot * BUNDLE_ENTRY.size)
+            file.write(_entry(offset, data))
+            return
+    bundle = ModelBundle(path)
+    models = {other: bundle.data(other) for other in bundle.keyboard_ids}
+    models[keyboard_id] = data
+    write_model_bundle(path, models)
+
+
+class ModelBundle:
+    """A bundle read in one go, whose models are parsed only when asked for.
+
+    Reading it checks only the header; verify compares a model against its
+    digest on demand.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._data = path.read_bytes()
+        _check_header(path, self._data[: BUNDLE_HEADER.size])
+        self._entries = _index(self._data)
+
+    @property
+    def keyboard_ids(self) -> list[int]:
+        """The keyboard IDs the bundle holds a model for, in ascending order."""
+        return list(self._entries)
+
+    def data(self, keyboard_id: int) -> bytes:
+        """Return one keyboard's model bytes, as its <keyboard_id>.json held."""
+        if keyboard_id not in self._entries:
+            raise KeyError(f"Keyboard {keyboard_id} is not in the bundle")
+        offset, length, _ = self._entries[keyboard_id]
+        if offset + length > len(self._data):
+            raise ValueError(f"Keyboard {keyboard_id}'s model is truncated")
+        return self._data[offset : offset + length]
+
+    def model(self, keyboard_id: int) -> dict:
+        """Parse one keyboard's consolidated model."""
+        return json.loads(self.data(keyboard_id))
+
+    def verify(self, keyboard_id: int) -> None:
+        """Raise ValueError unless one keyboard's model matches its digest."""
+        digest = self._entries.get(keyboard_id, (0, 0, b""))[2]
+        if hashlib.sha256(self.data(keyboard_id)).digest() != digest:
+            raise ValueError(f"Keyboard {keyboard_id}'s model fails its digest")
+
+
+def _slot(keyboard_id: int) -> int:
+    if not 0 <= keyboard_id < SLOT_COUNT:
+        raise ValueError(f"Keyboard ID {keyboard_id} is not between 0 and 255")
+    return keyboard_id
+
+
+def _index(head: bytes) -> dict[int, tuple[int, int, bytes]]:
+    return {
+        keyboard_id: (offset, length, digest)
+        for keyboard_id, (offset, length, digest) in enumerate(
+            BUNDLE_ENTRY.iter_unpack(head[BUNDLE_HEADER.size : _MODELS_OFFSET])
+        )
+        if length
+    }
+
+
+def _entry(offset: int, data: bytes) -> bytes:
+    if not data:
+        raise ValueError("A bundled model cannot be empty")
+    return BUNDLE_ENTRY.pack(offset, len(data), hashlib.sha256(data).digest())
+
+
+def _check_header(path: Path, header: bytes) -> None:
+    if len(header) < BUNDLE_HEADER.size or BUNDLE_HEADER.unpack(header) != (
+        MAGIC,
+        FORMAT_VERSION,
+    ):
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} model bundle")
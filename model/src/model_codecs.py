@@ -0,0 +1,62 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import gzip
+import lzma
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Literal
+
+ModelCodec = Literal["gzip", "lzma", "zlib"]
+
+
+@dataclass(frozen=True)
+class _Codec:
+    # Appended to <id>.json, so the file name says what it holds too.
+    suffix: str
+    # The bytes every stream of the format starts with.
+    magic: bytes
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+# Each codec's own stream header is the content-type marker: a reader tells
+# them, and uncompressed JSON, apart by the first bytes alone. gzip stores no
+# timestamp, so that rebuilding an unchanged model reproduces its file.
+MODEL_CODECS: dict[ModelCodec, _Codec] = {
+    "gzip": _Codec(
+        ".gz",
+        b"\x1f\x8b",
+        lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+        gzip.decompress,
+    ),
+    "lzma": _Codec(
+        ".xz",
+        b"\xfd7zXZ\x00",
+        lzma.compress,
+        lzma.decompress,
+    ),
+    # Deflate at its best compression, and the only header of the three that
+    # varies: 0x78 then a check byte, which JSON can never start with.
+    "zlib": _Codec(
+        ".zz", b"\x78", lambda data: zlib.compress(data, 9), zlib.decompress
+    ),
+}
+
+
+def compress_model(data: bytes, codec: ModelCodec) -> bytes:
+    """Compress a model's JSON bytes with one of MODEL_CODECS."""
+    return MODEL_CODECS[codec].compress(data)
+
+
+def decompress_model(data: bytes) -> bytes:
+    """Return a model's JSON bytes, whichever codec, if any, compressed them."""
+    for codec in MODEL_CODECS.values():
+        if data.startswith(codec.magic):
+            return codec.decompress(data)
+    return data
+
+
+def compressed_suffix(codec: ModelCodec) -> str:
+    """Return the suffix a model compressed with codec is written with."""
+    return MODEL_CODECS[codec].suffix
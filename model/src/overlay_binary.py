@@ -0,0 +1,277 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import mmap
+import struct
+from pathlib import Path
+from types import TracebackType
+
+# A keyboard's version 2 (pixel) layer models in one memory-mappable file, for
+# a consumer that decodes only the layer it shows. Little-endian throughout:
+#
+#   header        HEADER, at offset 0
+#   layer index   layer_count INDEX_ENTRY records, by ascending layer number,
+#                 each the offset of that layer's block
+#   layer blocks  LAYER, then key_count KEY and encoder_count ENCODER records;
+#                 layers whose blocks are identical share one
+#   strings       string_count + 1 u32 offsets into the UTF-8 text after them
+#
+# Every label is one string, its lines joined by "\n". Flags are bit fields,
+# in field order: a key's held and transparent, and an encoder's held and its
+# counter-clockwise, clockwise and press transparency. A momentary layer of
+# NO_LAYER means none.
+MAGIC = b"KMOV"
+FORMAT_VERSION = 1
+NO_LAYER = 0xFF
+# magic, format version, keyboard ID, layer count, key count, encoder count,
+# layer index offset, string table offset, string count.
+HEADER = struct.Struct("<4sHBxHHH2xIII4x")
+# Layer number and the offset of its block.
+INDEX_ENTRY = struct.Struct("<H2xI")
+# Model version, width, height, then header, key and encoder font sizes.
+LAYER = struct.Struct("<HHHBBB3x")
+# x, y, width, height, label, flags, momentary layer.
+KEY = struct.Struct("<HHHHIBB2x")
+# x, y, size, counter-clockwise, clockwise and press labels, flags, momentary
+# layer.
+ENCODER = struct.Struct("<HHH2xIIIBB2x")
+_OFFSET = struct.Struct("<I")
+
+
+def binary_model_bytes(keyboard_id: int, layers: dict[str, dict]) -> bytes:
+    """Encode a keyboard's version 2 layer models, keyed by layer number.
+
+    The models are the dicts of a consolidated model's "layers". Every layer
+    must have the same number of keys and of encoders.
+    """
+    if not layers:
+        raise ValueError(f"No layer models given for keyboard {keyboard_id}")
+    first = next(iter(layers.values()))
+    key_count, encoder_count = len(first["keys"]), len(first["encoders"])
+    strings: dict[str, int] = {}
+    index_offset = HEADER.size
+    block_offset = index_offset + len(layers) * INDEX_ENTRY.size
+    blocks: dict[bytes, int] = {}
+    index: list[bytes] = []
+    next_offset = block_offset
+    for key, model in sorted(layers.items(), key=lambda item: int(item[0])):
+        if model.get("version") != 2:
+            raise ValueError(f"Layer {key} is not a version 2 pixel model")
+        if len(model["keys"]) != key_count or len(model["encoders"]) != encoder_count:
+            raise ValueError(
+                f"Layer {key} does not match layer {first['layer']}'s shape"
+            )
+        block = _layer_block(model, strings)
+        if block not in blocks:
+            blocks[block] = next_offset
+            next_offset += len(block)
+        index.append(INDEX_ENTRY.pack(int(key), blocks[block]))
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        keyboard_id,
+        len(layers),
+        key_count,
+        encoder_count,
+        index_offset,
+        next_offset,
+        len(strings),
+    )
+    return b"".join([header, *index, *blocks, _string_table(strings)])
+
+
+def _layer_block(model: dict, strings: dict[str, int]) -> bytes:
+    def string(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    def label(lines: list[str]) -> int:
+        return string("\n".join(lines))
+
+    parts = [
+        LAYER.pack(
+            model["version"],
+            model["width"],
+            model["height"],
+            model["header_font_size"],
+            model["key_font_size"],
+            model["encoder_font_size"],
+        )
+    ]
+    for key in model["keys"]:
+        parts.append(
+            KEY.pack(
+                key["x"],
+                key["y"],
+                key["width"],
+                key["height"],
+                label(key["label"]),
+                _flags(key["held"], key["transparent"]),
+                _layer_byte(key["momentary_layer"]),
+            )
+        )
+    for encoder in model["encoders"]:
+        parts.append(
+            ENCODER.pack(
+                encoder["x"],
+                encoder["y"],
+                encoder["size"],
+                label(encoder["counter_clockwise"]),
+                label(encoder["clockwise"]),
+                string(encoder["press"]),
+                _flags(
+                    encoder["held"],
+                    encoder["counter_clockwise_transparent"],
+                    encoder["clockwise_transparent"],
+                    encoder["press_transparent"],
+                ),
+                _layer_byte(encoder["momentary_layer"]),
+            )
+        )
+    return b"".join(parts)
+
+
+def _flags(*values: bool) -> int:
+    return sum(1 << bit for bit, value in enumerate(values) if value)
+
+
+def _layer_byte(layer: int | None) -> int:
+    if layer is None:
+        return NO_LAYER
+    if not 0 <= layer < NO_LAYER:
+        raise ValueError(f"Layer {layer} does not fit the binary format")
+    return layer
+
+
+def _string_table(strings: dict[str, int]) -> bytes:
+    encoded = [text.encode() for text in strings]
+    offsets = [0]
+    for text in encoded:
+        offsets.append(offsets[-1] + len(text))
+    return b"".join([struct.pack(f"<{len(offsets)}I", *offsets), *encoded])
+
+
+class BinaryOverlayModel:
+    """A binary model file, mapped into memory and decoded a layer at a time.
+
+    Opening it reads only the header and the layer index; each layer's
+    records and the strings they name are decoded when that layer is asked
+    for.
+    """
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            self.keyboard_id,
+            layer_count,
+            self._key_count,
+            self._encoder_count,
+            index_offset,
+            self._strings_offset,
+            string_count,
+        ) = HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._data.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} binary model")
+        self._offsets = dict(
+            INDEX_ENTRY.iter_unpack(
+                self._data[index_offset : index_offset + layer_count * INDEX_ENTRY.size]
+            )
+        )
+        self._text_offset = self._strings_offset + (string_count + 1) * _OFFSET.size
+        self._strings: dict[int, str] = {}
+
+    @property
+    def layers(self) -> list[int]:
+        """The layer numbers the file holds, in ascending order."""
+        return list(self._offsets)
+
+    def layer(self, number: int) -> dict:
+        """Decode one layer into the dict its JSON model would parse to."""
+        if number not in self._offsets:
+            raise KeyError(f"Layer {number} is not in the model")
+        offset = self._offsets[number]
+        version, width, height, header_font, key_font, encoder_font = LAYER.unpack_from(
+            self._data, offset
+        )
+        offset += LAYER.size
+        keys = []
+        for _ in range(self._key_count):
+            keys.append(self._key(offset))
+            offset += KEY.size
+        encoders = []
+        for _ in range(self._encoder_count):
+            encoders.append(self._encoder(offset))
+            offset += ENCODER.size
+        return {
+            "version": version,
+            "layer": number,
+            "width": width,
+            "height": height,
+            "header_font_size": header_font,
+            "key_font_size": key_font,
+            "encoder_font_size": encoder_font,
+            "keys": keys,
+            "encoders": encoders,
+        }
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._data.close()
+
+    def __enter__(self) -> "BinaryOverlayModel":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _key(self, offset: int) -> dict:
+        x, y, width, height, label, flags, layer = KEY.unpack_from(self._data, offset)
+        return {
+            "x": x,
+            "y": y,
+            "width": width,
+            "height": height,
+            "label": self._label(label),
+            "held": bool(flags & 1),
+            "transparent": bool(flags & 2),
+            "momentary_layer": None if layer == NO_LAYER else layer,
+        }
+
+    def _encoder(self, offset: int) -> dict:
+        x, y, size, counter_clockwise, clockwise, press, flags, layer = (
+            ENCODER.unpack_from(self._data, offset)
+        )
+        return {
+            "x": x,
+            "y": y,
+            "size": size,
+            "counter_clockwise": self._label(counter_clockwise),
+            "clockwise": self._label(clockwise),
+            "press": self._string(press),
+            "held": bool(flags & 1),
+            "counter_clockwise_transparent": bool(flags & 2),
+            "clockwise_transparent": bool(flags & 4),
+            "press_transparent": bool(flags & 8),
+            "momentary_layer": None if layer == NO_LAYER else layer,
+        }
+
+    def _label(self, index: int) -> list[str]:
+        text = self._string(index)
+        return text.split("\n") if text else []
+
+    def _string(self, index: int) -> str:
+        if index not in self._strings:
+            start, end = struct.unpack_from(
+                "<2I", self._data, self._strings_offset + index * _OFFSET.size
+            )
+            self._strings[index] = self._data[
+                self._text_offset + start : self._text_offset + end
+            ].decode()
+        return self._strings[index]
@@ -0,0 +1,126 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import functools
+import re
+import unicodedata
+from collections.abc import Callable
+
+# East Asian Width classes a monospace-minded label font draws two columns wide.
+WIDE_CLASSES = frozenset({"W", "F"})
+
+
+@functools.cache
+def east_asian_columns(character: str) -> int:
+    """Return the columns one character takes: 0, 1, or 2 when wide."""
+    if unicodedata.combining(character):
+        return 0
+    return 2 if unicodedata.east_asian_width(character) in WIDE_CLASSES else 1
+
+
+class TextWidths:
+    """Measures and wraps label text in columns of the overlay's label font.
+
+    A column is one ASCII character's advance; wide and full-width characters
+    take two. An advance table, in columns, overrides that for glyphs the
+    font draws wider or narrower, such as arrows. Widths are cached per code
+    point and wrapped labels per label and box.
+    """
+
+    def __init__(
+        self, advances: dict[str, int] | None = None, maxsize: int = 4096
+    ) -> None:
+        self.advances = dict(advances or {})
+        self.character_width = functools.cache(self._character_width)
+        self.wrap = functools.lru_cache(maxsize=maxsize)(self._wrap)
+
+    def width(self, text: str) -> int:
+        """Return the columns a line of text takes."""
+        return sum(map(self.character_width, text))
+
+    def truncate(self, text: str, columns: int) -> str:
+        """Return the longest prefix of text that fits in columns."""
+        return _fitting_prefix(text, columns, self.character_width)
+
+    def _character_width(self, character: str) -> int:
+        if character in self.advances:
+            return self.advances[character]
+        return east_asian_columns(character)
+
+    def _wrap(self, label: str, max_lines: int, max_columns: int) -> tuple[str, ...]:
+        if not label:
+            return ()
+        lines = _wrap_columns(label, max_columns, self.width)
+        if len(lines) <= max_lines:
+            return tuple(lines)
+        last = self.truncate(lines[max_lines - 1], max_columns - 3)
+        return (*lines[: max_lines - 1], last + "...")
+
+
+# The whitespace textwrap breaks at; other spaces, such as U+3000, stay inside
+# words.
+_WHITESPACE = "\t\n\x0b\x0c\r "
+# A label's chunks, split exactly as textwrap splits them: runs of whitespace,
+# em-dashes between words, and words, broken after each hyphen that joins two.
+_CHUNK = re.compile(
+    r"""(
+    [{ws}]+
+    | (?<=[\w!"'&.,?]) -{{2,}} (?=\w)
+    | [^{ws}]+? (?:
+        -(?: (?<=[^\d\W]{{2}}-) | (?<=[^\d\W]-[^\d\W]-))
+        (?= [^\d\W] -? [^\d\W])
+      | (?=[{ws}]|\Z)
+      | (?<=[\w!"'&.,?]) (?=-{{2,}}\w)
+    )
+    )""".format(ws=re.escape(_WHITESPACE)),
+    re.VERBOSE,
+)
+
+
+def _wrap_columns(text: str, columns: int, measure: Callable[[str], int]) -> list[str]:
+    # Greedy, like textwrap.wrap with its defaults, but measuring in columns:
+    # whitespace between lines is dropped and a word too long for a line is
+    # broken, after its last hyphen that fits if it has one.
+    spaced = text.expandtabs().translate(dict.fromkeys(map(ord, _WHITESPACE), " "))
+    chunks = [chunk for chunk in _CHUNK.split(spaced) if chunk]
+    chunks.reverse()
+    lines: list[str] = []
+    while chunks:
+        if chunks[-1].strip() == "" and lines:
+            chunks.pop()
+        line: list[str] = []
+        used = 0
+        while chunks and used + measure(chunks[-1]) <= columns:
+            used += measure(chunks[-1])
+            line.append(chunks.pop())
+        if chunks and measure(chunks[-1]) > columns:
+            chunk = chunks[-1]
+            end = _break_at(chunk, columns - used, not line, measure)
+            line.append(chunk[:end])
+            chunks[-1] = chunk[end:]
+        if line and line[-1].strip() == "":
+            line.pop()
+        if line:
+            lines.append("".join(line))
+    return lines
+
+
+def _break_at(
+    chunk: str, space_left: int, line_empty: bool, measure: Callable[[str], int]
+) -> int:
+    end = len(_fitting_prefix(chunk, space_left, measure))
+    if end == 0 and line_empty:
+        # A glyph wider than the whole line still takes a line of its own.
+        end = 1
+    hyphen = chunk.rfind("-", 0, end)
+    if hyphen > 0 and any(character != "-" for character in chunk[:hyphen]):
+        end = hyphen + 1
+    return end
+
+
+def _fitting_prefix(text: str, columns: int, measure: Callable[[str], int]) -> str:
+    used = 0
+    for index, character in enumerate(text):
+        used += measure(character)
+        if used > columns:
+            return text[:index]
+    return text
@@ -3,7 +3,7 @@
 import re
 import sys
 from pathlib import Path
-from typing import Annotated, Type, TypeVar
+from typing import Annotated, Literal, Type, TypeVar
 
 from pydantic import (
     BaseModel,
@@ -225,6 +225,27 @@ class KeycodesJson(RootModel[dict[str, str]]):
         return v
 
 
+class GlyphWidthsJson(RootModel[dict[str, Annotated[int, Field(ge=0)]]]):
+    """Label-font advance widths, in columns, keyed by single character."""
+
+    @field_validator("root")
+    @classmethod
+    def _validate_characters(cls, v: dict[str, int]) -> dict[str, int]:
+        bad = [k for k in v if len(k) != 1]
+        if bad:
+            raise ValueError(f"keys must be single characters: {bad}")
+        return v
+
+
+class LabelPackJson(BaseModel):
+    """User-supplied keycode labels, such as a JIS layout's or macro names."""
+
+    # Labels for every platform.
+    labels: dict[str, str] = {}
+    # Labels for one platform, which take precedence over the shared ones.
+    platforms: dict[Literal["macos", "linux", "windows"], dict[str, str]] = {}
+
+
 class VialMatrix(BaseModelAllow):
     rows: int
     cols: int
@@ -35,6 +35,19 @@ def write_stdout_bytes(data: bytes) -> None:
     buffer.flush()
 
 
+def write_bytes_atomically(path: Path, data: bytes) -> None:
+    """Writes bytes beside path and moves them into place once complete."""
+    # The Python counterpart to the Makefile's WRITE_OUTPUT: a failed write
+    # leaves the previous file, never a truncated one.
+    temporary = path.with_name(f"{path.name}.tmp")
+    try:
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
 def initialize_logging() -> None:
     """Initialize logging to stderr for CLI scripts."""
     log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
@@ -0,0 +1,19 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+from model.scripts.benchmark_model_codecs import benchmark_model_codecs
+
+
+def test_measures_every_codec_over_all_models() -> None:
+    models = [
+        b'{"keyboard_id":%d,"layers":{%s}}'
+        % (keyboard_id, b",".join(b'"%d":{"keys":[]}' % layer for layer in range(32)))
+        for keyboard_id in (1, 2)
+    ]
+
+    results = benchmark_model_codecs(models, repeat=1)
+
+    assert set(results) == {"gzip", "lzma", "zlib"}
+    assert all(
+        result.compressed_bytes < sum(len(model) for model in models)
+        for result in results.values()
+    )
@@ -0,0 +1,22 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+from pathlib import Path
+
+from model.scripts.benchmark_model_formats import (
+    benchmark_model_formats,
+    synthetic_layers,
+)
+
+
+def test_measures_both_formats_of_the_same_model(tmp_path: Path) -> None:
+    results = benchmark_model_formats(
+        tmp_path, synthetic_layers(layers=4, keys=10, encoders=1), repeat=2
+    )
+
+    assert set(results) == {"json", "binary"}
+    assert results["binary"].file_bytes < results["json"].file_bytes
+    assert all(result.load_seconds > 0 for result in results.values())
+    assert all(
+        result.resident_bytes is None or result.resident_bytes >= 0
+        for result in results.values()
+    )
@@ -0,0 +1,183 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import json
+from pathlib import Path
+
+import pytest
+import typer
+
+from model.scripts.build_all import (
+    build_all,
+    bundle_platform_models,
+    discover_render_jobs,
+    main,
+)
+from model.scripts.generate_overlay_asset import (
+    ExportOptions,
+    build_overlay_models,
+    consolidate_overlay_models,
+)
+from model.src.model_bundle import ModelBundle
+
+
+def _write(path: Path, value: object) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(value), encoding="utf-8")
+    return path
+
+
+def _write_keyboard(keyboards: Path, build: Path, keyboard_id: int) -> None:
+    """Lay out one keyboard's sources and the build inputs make would produce."""
+    source = keyboards / str(keyboard_id)
+    _write(
+        source / "keyboard.json",
+        {
+            "keyboard_name": "Test",
+            "usb": {"vid": "0x0001", "pid": "0x0002", "device_version": "1.0.0"},
+            "matrix_pins": {"rows": ["A0"], "cols": ["A1"]},
+            "layouts": {"LAYOUT": {"layout": [{"matrix": [0, 0], "x": 0, "y": 0}]}},
+        },
+    )
+    _write(source / "config.json", {"qmk_keyboard": "test"})
+    (source / "keymap").mkdir()
+    (source / "keymap" / "keymap.c").write_text("", encoding="utf-8")
+    _write(
+        build / str(keyboard_id) / "qmk-keymap.json",
+        {"layers": [["MO(1)"], ["KC_TRNS"]]},
+    )
+    _write(build / str(keyboard_id) / "custom-keycodes.json", {})
+
+
+def test_renders_every_keyboard_and_platform(tmp_path: Path) -> None:
+    keyboards, build = tmp_path / "keyboards", tmp_path / "build"
+    for keyboard_id in (1, 2):
+        _write_keyboard(keyboards, build, keyboard_id)
+
+    jobs = discover_render_jobs(keyboards, build, ["macos", "linux"])
+    outputs = build_all(jobs, max_workers=2)
+
+    assert sorted(outputs) == sorted(
+        build / str(keyboard_id) / "assets" / platform / f"{keyboard_id}.json"
+        for keyboard_id in (1, 2)
+        for platform in ("macos", "linux")
+    )
+    job = jobs[0]
+    expected = consolidate_overlay_models(
+        job.keyboard_id,
+        build_overlay_models(
+            job.qmk_keymap_json,
+            job.keyboard_json,
+            job.keyboard_config,
+            job.custom_keycodes_json,
+            "LAYOUT",
+            keymap_c=job.keymap_c,
+            platform="linux",
+        ),
+    )
+    output = job.asset_dir / "linux" / "1.json"
+    assert json.loads(output.read_text(encoding="utf-8")) == expected
+
+
+def test_unreachable_layers_are_skipped_only_when_asked(tmp_path: Path) -> None:
+    keyboards, build = tmp_path / "keyboards", tmp_path / "build"
+    _write_keyboard(keyboards, build, 1)
+    # Layer 2 is only switched on from firmware code, e.g. by update_tri_layer.
+    _write(
+        build / "1" / "qmk-keymap.json",
+        {"layers": [["MO(1)"], ["KC_TRNS"], ["KC_B"]]},
+    )
+
+    layers = []
+    for jobs in (
+        discover_render_jobs(keyboards, build, ["linux"]),
+        discover_render_jobs(keyboards, build, ["linux"], skip_unreachable_layers=True),
+    ):
+        (output,) = build_all(jobs, max_workers=1)
+        layers.append(list(json.loads(output.read_bytes())["layers"]))
+
+    assert layers == [["0", "1", "2"], ["0", "1"]]
+
+
+def test_further_scales_are_written_beside_the_first(tmp_path: Path) -> None:
+    keyboards, build = tmp_path / "keyboards", tmp_path / "build"
+    _write_keyboard(keyboards, build, 1)
+
+    outputs = build_all(
+        discover_render_jobs(keyboards, build, ["linux"], scales=(64, 128)),
+        max_workers=1,
+    )
+
+    assert outputs == [
+        build / "1" / "assets" / "linux" / "1.json",
+        build / "1" / "assets" / "linux" / "1@128.json",
+    ]
+    first, second = (
+        json.loads(output.read_text(encoding="utf-8")) for output in outputs
+    )
+    assert second["layers"]["0"]["width"] > first["layers"]["0"]["width"]
+
+
+def test_change_masks_take_key_ids_from_the_render(tmp_path: Path) -> None:
+    keyboards, build = tmp_path / "keyboards", tmp_path / "build"
+    _write_keyboard(keyboards, build, 1)
+
+    (output,) = build_all(
+        discover_render_jobs(
+            keyboards, build, ["linux"], export=ExportOptions(change_masks=True)
+        ),
+        max_workers=1,
+    )
+
+    model = json.loads(output.read_bytes())
+    assert model["key_ids"] == [0]
+    assert model["change_masks"]["1"]["transparent"] == "1"
+
+
+def test_bundles_hold_every_keyboard_s_model(tmp_path: Path) -> None:
+    keyboards, build = tmp_path / "keyboards", tmp_path / "build"
+    for keyboard_id in (1, 2):
+        _write_keyboard(keyboards, build, keyboard_id)
+    jobs = discover_render_jobs(keyboards, build, ["linux", "macos"])
+    build_all(jobs, max_workers=1)
+
+    outputs = bundle_platform_models(jobs, build / "bundles")
+
+    assert outputs == [
+        build / "bundles" / "linux.bundle",
+        build / "bundles" / "macos.bundle",
+    ]
+    bundle = ModelBundle(outputs[1])
+    assert bundle.keyboard_ids == [1, 2]
+    assert bundle.data(2) == (build / "2" / "assets" / "macos" / "2.json").read_bytes()
+
+
+def test_a_failed_keyboard_fails_the_build_and_writes_no_partial_file(
+    tmp_path: Path,
+) -> None:
+    keyboards, build = tmp_path / "keyboards", tmp_path / "build"
+    _write_keyboard(keyboards, build, 1)
+    _write(build / "1" / "qmk-keymap.json", {"layers": [["KC_A", "KC_B"]]})
+
+    with pytest.raises(ValueError, match="Layer 0 has 2 keys"):
+        build_all(discover_render_jobs(keyboards, build, ["linux"]), max_workers=1)
+
+    assert not (build / "1" / "assets" / "linux").exists()
+
+
+def test_conflicting_export_options_fail_before_any_render(tmp_path: Path) -> None:
+    keyboards, build = tmp_path / "keyboards", tmp_path / "build"
+    _write_keyboard(keyboards, build, 1)
+
+    with pytest.raises(typer.Exit):
+        main(keyboards, build, "linux", delta_layers=True, shared_tables=True)
+
+    assert not (build / "1" / "label-tables").exists()
+
+
+def test_missing_build_inputs_name_the_make_target(tmp_path: Path) -> None:
+    keyboards, build = tmp_path / "keyboards", tmp_path / "build"
+    _write_keyboard(keyboards, build, 1)
+    (build / "1" / "qmk-keymap.json").unlink()
+
+    with pytest.raises(ValueError, match="VIAL=false KEYBOARD_ID=1"):
+        discover_render_jobs(keyboards, build, ["linux"])
@@ -1,11 +1,25 @@
 # Copyright 2026 sunaemon
 # SPDX-License-Identifier: MIT
 import json
+from collections.abc import Callable
 from pathlib import Path
 
 import pytest
 
-from model.scripts.consolidate_layer_models import consolidate_layer_models
+from model.scripts.consolidate_layer_models import (
+    consolidate_layer_models,
+    stream_layer_models,
+)
+
+
+def _stream(keyboard_id: int, paths: list[Path]) -> dict:
+    return json.loads(stream_layer_models(keyboard_id, paths))
+
+
+# Both consolidators must make the same checks and the same document.
+consolidators = pytest.mark.parametrize(
+    "consolidate", [consolidate_layer_models, _stream], ids=["validated", "streamed"]
+)
 
 
 def _write_layer(
@@ -25,54 +39,89 @@ def _write_layer(
     return path
 
 
-def test_combines_every_given_layer(tmp_path: Path) -> None:
+@consolidators
+def test_combines_every_given_layer(consolidate: Callable, tmp_path: Path) -> None:
     paths = [
         _write_layer(tmp_path, 1, 0),
         _write_layer(tmp_path, 1, 1),
         _write_layer(tmp_path, 1, 2),
     ]
 
-    combined = consolidate_layer_models(1, paths)
+    combined = consolidate(1, paths)
 
     assert combined["keyboard_id"] == 1
     assert set(combined["layers"]) == {"0", "1", "2"}
     assert combined["layers"]["1"]["layer"] == 1
 
 
-def test_ignores_a_stale_file_that_is_not_in_the_given_list(tmp_path: Path) -> None:
+@consolidators
+def test_ignores_a_stale_file_that_is_not_in_the_given_list(
+    consolidate: Callable, tmp_path: Path
+) -> None:
     """A leftover from a shrunk layer count must not sneak into the output."""
     current = [_write_layer(tmp_path, 1, 0), _write_layer(tmp_path, 1, 1)]
     _write_layer(tmp_path, 1, 2)  # stale on disk, but not passed in
 
-    combined = consolidate_layer_models(1, current)
+    combined = consolidate(1, current)
 
     assert set(combined["layers"]) == {"0", "1"}
 
 
-def test_rejects_a_layer_field_that_does_not_match_its_filename(tmp_path: Path) -> None:
+@consolidators
+def test_rejects_a_layer_field_that_does_not_match_its_filename(
+    consolidate: Callable, tmp_path: Path
+) -> None:
     path = _write_layer(tmp_path, 1, 0, extra={"layer": 5})
 
     with pytest.raises(ValueError, match="does not match its filename"):
-        consolidate_layer_models(1, [path])
+        consolidate(1, [path])
 
 
+@consolidators
 @pytest.mark.parametrize("invalid_layer", [True, 0.0, "0"])
 def test_rejects_a_non_integer_layer_identity(
-    tmp_path: Path, invalid_layer: object
+    consolidate: Callable, tmp_path: Path, invalid_layer: object
 ) -> None:
     path = _write_layer(tmp_path, 1, 0, extra={"layer": invalid_layer})
 
     with pytest.raises(ValueError, match="layer"):
-        consolidate_layer_models(1, [path])
+        consolidate(1, [path])
 
 
-def test_rejects_a_path_that_is_not_a_layer_for_this_keyboard(tmp_path: Path) -> None:
+@consolidators
+def test_rejects_a_path_that_is_not_a_layer_for_this_keyboard(
+    consolidate: Callable, tmp_path: Path
+) -> None:
     other_keyboard_path = _write_layer(tmp_path, 2, 0)
 
     with pytest.raises(ValueError, match="is not a rendered layer for keyboard 1"):
-        consolidate_layer_models(1, [other_keyboard_path])
+        consolidate(1, [other_keyboard_path])
 
 
-def test_rejects_an_empty_list(tmp_path: Path) -> None:
+@consolidators
+def test_rejects_an_empty_list(consolidate: Callable, tmp_path: Path) -> None:
     with pytest.raises(ValueError, match="No layer models given"):
-        consolidate_layer_models(1, [])
+        consolidate(1, [])
+
+
+def test_streaming_copies_each_layer_and_decodes_only_its_number(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "1_L0.json"
+    path.write_text(
+        '{"version":2,"keys":[{"label":["layer"]},{"layer":9}],"layer":0,"width":1.5}',
+        encoding="utf-8",
+    )
+
+    streamed = stream_layer_models(1, [path])
+
+    assert streamed == b'{"keyboard_id":1,"layers":{"0":%s}}' % path.read_bytes()
+    assert json.loads(streamed) == consolidate_layer_models(1, [path])
+
+
+@consolidators
+def test_rejects_a_layer_given_twice(consolidate: Callable, tmp_path: Path) -> None:
+    path = _write_layer(tmp_path, 1, 0)
+
+    with pytest.raises(ValueError, match="defined more than once"):
+        consolidate(1, [path, path])
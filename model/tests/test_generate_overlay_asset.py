@@ -1,13 +1,55 @@
 # Copyright 2026 sunaemon
 # SPDX-License-Identifier: MIT
 import json
+import math
+from dataclasses import asdict, replace
 from pathlib import Path
 
 import pytest
+import typer
 
+from model.scripts.consolidate_layer_models import consolidate_layer_models
 from model.scripts.encoder_map import parse_encoder_map
-from model.scripts.generate_overlay_asset import _resolve_layer, build_overlay_model
-from model.src.types import KeycodesJson, QmkKeymapJson
+from model.scripts.generate_overlay_asset import (
+    OVERLAY_PLATFORMS,
+    UNIT_MODEL_VERSION,
+    LabelEngine,
+    OverlayModel,
+    OverlayPlatform,
+    _pixel_geometry,
+    _resolve_layer,
+    build_overlay_model,
+    build_overlay_models,
+    build_platform_overlay_models,
+    build_scaled_overlay_models,
+    compile_label_table,
+    compose_overlay_model,
+    consolidate_overlay_models,
+    expand_layer_deltas,
+    expand_layer_references,
+    expand_shared_tables,
+    layer_change_masks,
+    layout_geometry,
+    main,
+    overlay_json_bytes,
+    overlay_sources,
+    pixel_overlay_model,
+    precompose_layer_combinations,
+    render_overlay_model,
+    render_overlay_models,
+)
+from model.src.layer_cache import LayerCache
+from model.src.model_codecs import decompress_model
+from model.src.overlay_binary import BinaryOverlayModel
+from model.src.types import (
+    KeyboardConfig,
+    KeyboardJson,
+    KeycodesJson,
+    LabelPackJson,
+    LayoutKey,
+    QmkKeymapJson,
+    parse_json,
+)
 
 
 def _write(path: Path, value: object) -> Path:
@@ -32,6 +74,31 @@ def _keyboard() -> dict:
     }
 
 
+def _write_two_layer_sources(tmp_path: Path) -> tuple[Path, Path, Path, Path, Path]:
+    """Write a two-layer keymap with an encoder; return the inputs and keymap.c."""
+    keymap = _write(
+        tmp_path / "keymap.json",
+        {"layout": "LAYOUT", "layers": [["KC_A", "KC_MUTE"], ["MO(1)", "KC_TRNS"]]},
+    )
+    keyboard = _write(tmp_path / "keyboard.json", _keyboard())
+    config = _write(
+        tmp_path / "config.json",
+        {"qmk_keyboard": "test", "encoders": [{"matrix": [0, 1]}]},
+    )
+    custom = _write(tmp_path / "custom.json", {})
+    keymap_c = tmp_path / "keymap.c"
+    keymap_c.write_text(
+        """
+        const uint16_t PROGMEM encoder_map[2][1][2] = {
+          [0] = {ENCODER_CCW_CW(KC_VOLD, KC_VOLU)},
+          [1] = {ENCODER_CCW_CW(KC_PGDN, KC_TRNS)},
+        };
+        """,
+        encoding="utf-8",
+    )
+    return keymap, keyboard, config, custom, keymap_c
+
+
 def test_builds_keys_and_an_encoder_into_the_shared_model(tmp_path: Path) -> None:
     """Builds keys and an encoder into the shared display model."""
     keymap = _write(
@@ -365,3 +432,763 @@ def test_encoder_placement_count_must_match_keyboard(tmp_path: Path) -> None:
             0,
             keymap_c=keymap_c,
         )
+
+
+def test_all_layers_match_rendering_each_layer_on_its_own(tmp_path: Path) -> None:
+    """One parse of the inputs renders exactly what N separate runs would."""
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    args = (keymap, keyboard, config, custom, "LAYOUT")
+
+    models = build_overlay_models(*args, 64, keymap_c=keymap_c)
+
+    assert models == [
+        build_overlay_model(*args, layer, 64, keymap_c=keymap_c) for layer in (0, 1)
+    ]
+
+
+def test_all_layers_cli_writes_one_file_per_layer(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    output = tmp_path / "assets"
+    output.mkdir()
+
+    main(
+        keymap,
+        keyboard,
+        config,
+        custom,
+        "LAYOUT",
+        all_layers=True,
+        output_prefix=output / "1_",
+        keymap_c=keymap_c,
+    )
+
+    assert sorted(path.name for path in output.iterdir()) == ["1_L0.json", "1_L1.json"]
+    layer = json.loads((output / "1_L1.json").read_text(encoding="utf-8"))
+    assert layer["layer"] == 1
+    assert layer["keys"][0]["label"] == ["L1"]
+
+
+def test_consolidated_model_matches_consolidating_the_layer_files(
+    tmp_path: Path,
+) -> None:
+    """The in-memory document equals what the file-based consolidator builds."""
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    args = (keymap, keyboard, config, custom, "LAYOUT")
+    main(
+        *args,
+        all_layers=True,
+        output_prefix=tmp_path / "1_",
+        keymap_c=keymap_c,
+    )
+
+    combined = consolidate_overlay_models(
+        1, build_overlay_models(*args, keymap_c=keymap_c)
+    )
+
+    assert combined == consolidate_layer_models(
+        1, [tmp_path / "1_L0.json", tmp_path / "1_L1.json"]
+    )
+
+
+def test_consolidated_model_rejects_no_layers() -> None:
+    with pytest.raises(ValueError, match="No layer models given"):
+        consolidate_overlay_models(1, [])
+
+
+def test_all_platforms_share_one_pass_and_differ_only_in_labels(
+    tmp_path: Path,
+) -> None:
+    """--platform all writes what three single-platform renders would."""
+    keymap = _write(
+        tmp_path / "keymap.json",
+        {"layout": "LAYOUT", "layers": [["KC_LGUI", "KC_MUTE"]]},
+    )
+    keyboard = _write(tmp_path / "keyboard.json", _keyboard())
+    config = _write(
+        tmp_path / "config.json",
+        {"qmk_keyboard": "test", "encoders": [{"matrix": [0, 1]}]},
+    )
+    custom = _write(tmp_path / "custom.json", {})
+    keymap_c = tmp_path / "keymap.c"
+    keymap_c.write_text("", encoding="utf-8")
+    args = (keymap, keyboard, config, custom, "LAYOUT")
+
+    main(
+        *args,
+        all_layers=True,
+        keyboard_id=1,
+        asset_dir=tmp_path / "assets",
+        keymap_c=keymap_c,
+        platform="all",
+    )
+
+    for platform, label in [("macos", "⌘"), ("linux", "Super"), ("windows", "⊞")]:
+        written = json.loads(
+            (tmp_path / "assets" / platform / "1.json").read_text(encoding="utf-8")
+        )
+        assert written == consolidate_overlay_models(
+            1, build_overlay_models(*args, keymap_c=keymap_c, platform=platform)
+        )
+        assert written["layers"]["0"]["keys"][0]["label"] == [label]
+
+
+def test_layer_cache_rerenders_only_layers_whose_inputs_changed(
+    tmp_path: Path,
+) -> None:
+    """A base edit re-renders the layers that show it, through transparency too."""
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    args = (keymap, keyboard, config, custom, "LAYOUT", 64)
+    cache_path = tmp_path / "layer-cache.json"
+
+    def render() -> tuple[list, LayerCache]:
+        cache = LayerCache(cache_path)
+        models = build_platform_overlay_models(
+            *args, keymap_c=keymap_c, platforms=["linux"], layer_cache=cache
+        )
+        cache.save()
+        return models["linux"], cache
+
+    render()
+    cached, cache = render()
+    assert (cache.hits, cache.misses) == (2, 0)
+    assert cached == build_overlay_models(*args, keymap_c=keymap_c, platform="linux")
+
+    _write(
+        keymap,
+        {"layout": "LAYOUT", "layers": [["KC_B", "KC_MUTE"], ["MO(1)", "KC_TRNS"]]},
+    )
+    models, cache = render()
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert models[0].keys[0].label == ["B"]
+
+    _write(
+        keymap,
+        {"layout": "LAYOUT", "layers": [["KC_B", "KC_VOLU"], ["MO(1)", "KC_TRNS"]]},
+    )
+    models, cache = render()
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert models == build_overlay_models(*args, keymap_c=keymap_c, platform="linux")
+
+
+def _write_three_layer_sources(tmp_path: Path) -> tuple[Path, ...]:
+    """Layer 1 is held from the base, and layer 2 only from layer 1."""
+    sources = _write_two_layer_sources(tmp_path)
+    _write(
+        sources[0],
+        {
+            "layout": "LAYOUT",
+            "layers": [["MO(1)", "KC_MUTE"], ["MO(2)", "KC_TRNS"], ["KC_B", "KC_MPLY"]],
+        },
+    )
+    return sources
+
+
+def test_composing_follows_precedence_and_transparency(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_three_layer_sources(tmp_path)
+    models = build_overlay_models(
+        keymap, keyboard, config, custom, "LAYOUT", keymap_c=keymap_c
+    )
+
+    composed = compose_overlay_model(models, [2, 1])
+
+    assert composed.layer == 2
+    assert composed.keys[0].label == ["B"]
+    assert composed.encoders[0].press == "PLAY"
+    # Layer 1's clockwise action is transparent, so the base one shows through.
+    assert compose_overlay_model(models, [1]).encoders[0].clockwise == ["VOL +"]
+    assert compose_overlay_model(models, [1]).keys[0].held is False
+    assert compose_overlay_model(models, []) == models[0]
+
+
+def test_composing_keeps_unit_space_and_rejects_mixed_models(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_three_layer_sources(tmp_path)
+    args = (keymap, keyboard, config, custom, "LAYOUT")
+    unit_models = build_overlay_models(*args, None, keymap_c=keymap_c)
+    pixel_models = build_overlay_models(*args, keymap_c=keymap_c)
+
+    assert compose_overlay_model(unit_models, [1]).version == UNIT_MODEL_VERSION
+    with pytest.raises(ValueError, match="mix unit-space and pixel models"):
+        compose_overlay_model([unit_models[0], *pixel_models[1:]], [1])
+
+
+def test_precomposes_reachable_combinations_within_the_budget(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_three_layer_sources(tmp_path)
+    models = build_overlay_models(
+        keymap, keyboard, config, custom, "LAYOUT", keymap_c=keymap_c
+    )
+
+    combinations = precompose_layer_combinations(models, 8)
+
+    # Layer 2 alone is reachable by releasing MO(1) while MO(2) stays held.
+    assert list(combinations) == ["1", "1+2", "2"]
+    assert combinations["1+2"] == compose_overlay_model(models, [1, 2])
+    assert not caplog.records
+
+    assert list(precompose_layer_combinations(models, 2)) == ["1", "1+2"]
+    assert "More than 2 held-layer combinations" in caplog.text
+
+
+def test_cli_stores_combinations_in_the_consolidated_model(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_three_layer_sources(tmp_path)
+
+    main(
+        keymap,
+        keyboard,
+        config,
+        custom,
+        "LAYOUT",
+        all_layers=True,
+        keyboard_id=1,
+        asset_dir=tmp_path / "assets",
+        precompose_budget=8,
+        keymap_c=keymap_c,
+    )
+
+    model = json.loads((tmp_path / "assets/macos/1.json").read_text(encoding="utf-8"))
+    assert sorted(model["layers"]) == ["0", "1", "2"]
+    assert sorted(model["combinations"]) == ["1", "1+2", "2"]
+    assert model["combinations"]["1+2"]["keys"][0]["label"] == ["B"]
+
+
+def test_label_engine_formats_each_keycode_once() -> None:
+    labels = LabelEngine({"KC_LGUI": "Super"})
+
+    assert labels.wrapped("KC_LGUI", 3, 10) == ("Super",)
+    assert labels.wrapped("KC_LGUI", 3, 10) == ("Super",)
+    assert labels.wrapped("KC_PRINT_SCREEN", 2, 5) == ("PRINT", "SC...")
+    assert labels.text("MO(2)") == "L2"
+    # Wrapping formatted the label once already.
+    assert labels.text("KC_PRINT_SCREEN") == "PRINT SCREEN"
+
+    assert (labels.hits, labels.misses) == (2, 3)
+
+
+def test_label_engine_cache_is_bounded() -> None:
+    labels = LabelEngine({}, maxsize=2)
+
+    for keycode in ("KC_A", "KC_B", "KC_C", "KC_A"):
+        labels.wrapped(keycode, 3, 10)
+
+    assert labels.misses == 4
+    assert labels.wrapped.cache_info().currsize == 2
+
+
+def test_layer_tap_and_one_shot_layer_keys_hold_their_layer(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    _write(
+        keymap,
+        {
+            "layout": "LAYOUT",
+            "layers": [["LT(1, KC_SPC)", "KC_MUTE"], ["KC_A", "OSL(1)"]],
+        },
+    )
+    args = (keymap, keyboard, config, custom, "LAYOUT")
+
+    base, layer = build_overlay_models(*args, keymap_c=keymap_c)
+
+    assert base.keys[0].momentary_layer == 1
+    assert base.keys[0].held is False
+    assert layer.encoders[0].momentary_layer == 1
+    assert layer.encoders[0].held is True
+
+
+def test_all_layers_cli_skips_layers_no_layer_key_reaches_when_asked(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    caplog.set_level("INFO")
+
+    layers = []
+    for skip in (False, True):
+        main(
+            keymap,
+            keyboard,
+            config,
+            custom,
+            "LAYOUT",
+            all_layers=True,
+            keyboard_id=1,
+            asset_dir=tmp_path / "assets",
+            keymap_c=keymap_c,
+            skip_unreachable_layers=skip,
+        )
+        model = (tmp_path / "assets/macos/1.json").read_text(encoding="utf-8")
+        layers.append(list(json.loads(model)["layers"]))
+
+    assert layers == [["0", "1"], ["0"]]
+    assert "Skipping layers no layer key reaches: 1" in caplog.text
+
+
+def test_identical_layers_render_once_and_can_be_stored_as_references(
+    tmp_path: Path,
+) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    padding = ["KC_TRNS", "KC_TRNS"]
+    _write(
+        keymap,
+        {
+            "layout": "LAYOUT",
+            "layers": [["MO(1)", "KC_MUTE"], padding, padding, padding],
+        },
+    )
+    args = (keymap, keyboard, config, custom, "LAYOUT")
+
+    models = build_overlay_models(*args, keymap_c=keymap_c)
+    document = consolidate_overlay_models(1, models, deduplicate_layers=True)
+
+    # Layer 1 differs from the padding after it: its MO(1) shows as held.
+    assert models[3].keys is models[2].keys
+    assert models[1].keys is not models[2].keys
+    assert sorted(document["layers"]) == ["0", "1", "2"]
+    assert document["layer_references"] == {"3": 2}
+    assert expand_layer_references(document) == consolidate_overlay_models(1, models)
+
+
+@pytest.mark.parametrize("pixels_per_unit", [64, None])
+def test_delta_layers_round_trip_to_the_full_format(
+    tmp_path: Path, pixels_per_unit: int | None
+) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    padding = ["KC_TRNS", "KC_TRNS"]
+    _write(
+        keymap,
+        {
+            "layout": "LAYOUT",
+            "layers": [["KC_A", "KC_MUTE"], ["KC_B", "KC_TRNS"], padding, padding],
+        },
+    )
+    models = build_overlay_models(
+        keymap, keyboard, config, custom, "LAYOUT", pixels_per_unit, keymap_c=keymap_c
+    )
+    full = consolidate_overlay_models(1, models)
+
+    document = consolidate_overlay_models(1, models, delta_layers=True)
+
+    assert list(document["layers"]) == ["0"]
+    # Layer 1 changes its key and its encoder's counter-clockwise action.
+    assert list(document["layer_deltas"]["1"]["keys"]) == ["0"]
+    assert list(document["layer_deltas"]["1"]["encoders"]) == ["0"]
+    assert document["layer_deltas"]["1"]["layer"] == 1
+    assert "width" not in document["layer_deltas"]["1"]
+    # A padding layer's key falls through unchanged: only its flag is stored.
+    assert document["layer_deltas"]["2"]["keys"] == {}
+    assert document["layer_deltas"]["2"]["transparent"] == "1"
+    assert expand_layer_deltas(document) == full
+    assert expand_layer_deltas(json.loads(overlay_json_bytes(document))) == full
+
+    # References may name a delta-encoded layer, so deltas expand first.
+    both = consolidate_overlay_models(
+        1, models, deduplicate_layers=True, delta_layers=True
+    )
+    assert both["layer_references"] == {"3": 2}
+    assert expand_layer_references(expand_layer_deltas(both)) == full
+
+
+@pytest.mark.parametrize("pixels_per_unit", [64, None])
+def test_shared_tables_round_trip_to_the_full_format(
+    tmp_path: Path, pixels_per_unit: int | None
+) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    models = build_overlay_models(
+        keymap, keyboard, config, custom, "LAYOUT", pixels_per_unit, keymap_c=keymap_c
+    )
+    combinations = precompose_layer_combinations(models, 4)
+    full = consolidate_overlay_models(1, models, combinations)
+
+    document = consolidate_overlay_models(1, models, combinations, shared_tables=True)
+
+    assert list(document["geometry"]["keys"])[:2] == ["x", "y"]
+    assert len(document["strings"]) == len(set(document["strings"]))
+    assert "x" not in document["layers"]["1"]["keys"]
+    assert document["layers"]["1"]["keys"]["transparent"] == "0"
+    assert expand_shared_tables(document) == full
+    assert expand_shared_tables(json.loads(overlay_json_bytes(document))) == full
+
+
+def test_delta_layers_need_the_base_layer() -> None:
+    model = OverlayModel(2, 1, 1, 1, 14, 10, 10, keys=[], encoders=[])
+
+    with pytest.raises(ValueError, match="need layer 0"):
+        consolidate_overlay_models(1, [model], delta_layers=True)
+
+
+@pytest.mark.parametrize("pixels_per_unit", [32, 64, 100])
+def test_unit_space_models_scale_to_the_pixel_models(
+    tmp_path: Path, pixels_per_unit: int
+) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    args = (keymap, keyboard, config, custom, "LAYOUT")
+
+    unit_models = build_overlay_models(*args, None, keymap_c=keymap_c)
+
+    assert unit_models[0].version == 3
+    assert unit_models[0].keys[0].width == 1
+    assert [
+        pixel_overlay_model(model, pixels_per_unit) for model in unit_models
+    ] == build_overlay_models(*args, pixels_per_unit, keymap_c=keymap_c)
+
+
+def test_unit_space_cli_writes_version_3_models(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    cache = tmp_path / "layer-cache.json"
+    for _ in range(2):
+        main(
+            keymap,
+            keyboard,
+            config,
+            custom,
+            "LAYOUT",
+            all_layers=True,
+            keyboard_id=1,
+            asset_dir=tmp_path / "assets",
+            cache=cache,
+            unit_space=True,
+            keymap_c=keymap_c,
+        )
+
+    model = json.loads((tmp_path / "assets/macos/1.json").read_text(encoding="utf-8"))
+    layer = model["layers"]["0"]
+    assert layer["version"] == 3
+    assert layer["key_font"] == {"divisor": 5, "minimum": 10}
+
+
+def test_one_pass_renders_every_scale(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    args = (keymap, keyboard, config, custom, "LAYOUT")
+
+    models = build_scaled_overlay_models(
+        *args, [64, 128, None], keymap_c=keymap_c, platforms=["linux", "macos"]
+    )
+
+    for scale in (64, 128, None):
+        assert models[scale] == build_platform_overlay_models(
+            *args, scale, keymap_c=keymap_c, platforms=["linux", "macos"]
+        )
+
+
+@pytest.mark.parametrize("pixels_per_unit", [64, None])
+def test_direct_serializer_matches_json_dumps_of_asdict(
+    tmp_path: Path, pixels_per_unit: int | None
+) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    models = build_overlay_models(
+        keymap, keyboard, config, custom, "LAYOUT", pixels_per_unit, keymap_c=keymap_c
+    )
+    model = replace(models[0], keys=[replace(models[0].keys[0], label=["α", '"'])])
+    document = {"keyboard_id": 1, "layers": {"0": model}, "layer_references": {3: 0}}
+
+    assert (
+        overlay_json_bytes(document)
+        == (
+            json.dumps(
+                {**document, "layers": {"0": asdict(model)}},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            + "\n"
+        ).encode()
+    )
+
+
+def test_layout_geometry_measures_from_the_top_left_of_everything_drawn() -> None:
+    layout = [
+        LayoutKey(matrix=(0, 0), x=2, y=1),
+        LayoutKey(matrix=(0, 1), x=3, y=1, w=2),
+        LayoutKey(matrix=(0, 2), x=5, y=1.5),
+    ]
+
+    geometry = layout_geometry(layout, [(2, 5, 1.5, 1, 1), (None, 1, 1, 1, 1)])
+
+    assert geometry.key_indices == (0, 1)
+    assert list(geometry.keys.x) == [1, 2]
+    assert list(geometry.keys.width) == [1, 2]
+    assert list(geometry.encoders.x) == [4, 0]
+    assert list(geometry.encoders.y) == [0.5, 0]
+    assert (geometry.width, geometry.height) == (5, 1.5)
+
+
+def test_rotated_keys_are_drawn_upright_around_their_turned_centre() -> None:
+    layout = [
+        LayoutKey(matrix=(0, 0), x=0, y=0, w=2, r=90, rx=0, ry=0),
+        LayoutKey(matrix=(0, 1), x=0, y=0),
+    ]
+
+    geometry = layout_geometry(layout, [])
+
+    # The 2u key turns about the origin to stand from (-1, 0) to (0, 2).
+    assert list(geometry.keys.x) == pytest.approx([0, 1.5])
+    assert list(geometry.keys.y) == pytest.approx([0.5, 0])
+    assert list(geometry.keys.width) == [2, 1]
+    assert list(geometry.key_rotations) == [90, 0]
+    assert (geometry.width, geometry.height) == pytest.approx((2.5, 2))
+
+
+def test_layers_of_one_layout_share_its_pixel_boxes(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    _pixel_geometry.cache_clear()
+
+    build_scaled_overlay_models(
+        keymap,
+        keyboard,
+        config,
+        custom,
+        "LAYOUT",
+        [64, 128],
+        keymap_c=keymap_c,
+        platforms=["linux", "macos"],
+    )
+
+    assert _pixel_geometry.cache_info().misses == 2
+
+
+def test_glyph_widths_wrap_labels_by_their_advance(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    glyph_widths = _write(tmp_path / "glyph-widths.json", {"V": 3})
+    args = (keymap, keyboard, config, custom, "LAYOUT", 0)
+
+    plain = build_overlay_model(*args, keymap_c=keymap_c)
+    wide = build_overlay_model(*args, keymap_c=keymap_c, glyph_widths_json=glyph_widths)
+
+    assert plain.encoders[0].counter_clockwise == ["VOL -"]
+    assert wide.encoders[0].counter_clockwise == ["VOL", "-"]
+
+
+def test_rotated_layouts_render(tmp_path: Path) -> None:
+    keymap, _, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    definition = _keyboard()
+    definition["layouts"]["LAYOUT"]["layout"][0].update(r=15, rx=0.5, ry=0.5)
+    keyboard = _write(tmp_path / "rotated.json", definition)
+
+    model = build_overlay_models(
+        keymap, keyboard, config, custom, "LAYOUT", None, keymap_c=keymap_c
+    )[0]
+
+    # Turned about its own centre, the key stays put; its corners widen the
+    # canvas by half a diagonal's reach past its box.
+    margin = 0.5 * (math.cos(math.radians(15)) + math.sin(math.radians(15))) - 0.5
+    assert model.keys[0].rotation == 15
+    assert (model.keys[0].x, model.keys[0].y) == pytest.approx((margin, margin))
+
+
+def test_change_masks_mark_keys_that_differ_from_the_base_layer(
+    tmp_path: Path,
+) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    _write(
+        keymap,
+        {"layout": "LAYOUT", "layers": [["MO(1)", "KC_MUTE"], ["KC_TRNS", "KC_TRNS"]]},
+    )
+
+    main(
+        keymap,
+        keyboard,
+        config,
+        custom,
+        "LAYOUT",
+        all_layers=True,
+        keyboard_id=1,
+        asset_dir=tmp_path / "assets",
+        change_masks=True,
+        keymap_c=keymap_c,
+    )
+
+    model = json.loads((tmp_path / "assets/macos/1.json").read_text(encoding="utf-8"))
+    # The encoder sits on layout position 1, so the only key is position 0.
+    assert (model["key_ids"], model["encoder_ids"]) == ([0], [0])
+    # On layer 1 the key falls through to MO(1), now held; the encoder's
+    # counter-clockwise action still differs from layer 0's.
+    assert model["change_masks"] == {
+        "0": {"changed": "0", "transparent": "0"},
+        "1": {"changed": "3", "transparent": "1"},
+    }
+    models = build_overlay_models(
+        keymap, keyboard, config, custom, "LAYOUT", keymap_c=keymap_c
+    )
+    assert layer_change_masks(models[0], models[0]) == {
+        "changed": "0",
+        "transparent": "0",
+    }
+
+
+def test_delta_layers_with_shared_tables_fail_before_rendering(
+    tmp_path: Path,
+) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+
+    with pytest.raises(typer.Exit):
+        main(
+            keymap,
+            keyboard,
+            config,
+            custom,
+            "LAYOUT",
+            all_layers=True,
+            keyboard_id=1,
+            asset_dir=tmp_path / "assets",
+            label_table_cache=tmp_path / "label-tables",
+            delta_layers=True,
+            shared_tables=True,
+            keymap_c=keymap_c,
+        )
+
+    # Nothing was even labelled, let alone rendered.
+    assert not (tmp_path / "label-tables").exists()
+
+
+def test_fall_through_alone_does_not_count_as_a_change(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    _write(
+        keymap,
+        {
+            "layout": "LAYOUT",
+            "layers": [
+                ["MO(1)", "KC_MUTE"],
+                ["KC_TRNS", "KC_TRNS"],
+                ["KC_TRNS", "KC_TRNS"],
+            ],
+        },
+    )
+    keymap_c.write_text(
+        """
+        const uint16_t PROGMEM encoder_map[3][1][2] = {
+          [0] = {ENCODER_CCW_CW(KC_VOLD, KC_VOLU)},
+          [1] = {ENCODER_CCW_CW(KC_PGDN, KC_TRNS)},
+          [2] = {ENCODER_CCW_CW(KC_TRNS, KC_TRNS)},
+        };
+        """,
+        encoding="utf-8",
+    )
+
+    base, partial, see_through = build_overlay_models(
+        keymap, keyboard, config, custom, "LAYOUT", keymap_c=keymap_c
+    )
+
+    # On layer 1 the key falls through to MO(1), now held, and the encoder's
+    # counter-clockwise action differs; layer 2 shows exactly what layer 0 does.
+    assert layer_change_masks(base, partial) == {"changed": "3", "transparent": "1"}
+    assert layer_change_masks(base, see_through) == {
+        "changed": "0",
+        "transparent": "3",
+    }
+
+
+def test_label_packs_compile_to_cached_per_platform_tables(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    _write(keymap, {"layout": "LAYOUT", "layers": [["KC_LGUI", "KC_MUTE"]]})
+    pack = _write(
+        tmp_path / "pack.json",
+        {"labels": {"KC_LGUI": "Meta", "KC_VOLD": "Soft"}},
+    )
+    macos_pack = _write(
+        tmp_path / "macos.json", {"platforms": {"macos": {"KC_LGUI": "Command"}}}
+    )
+    tables = tmp_path / "label-tables"
+    args = (keymap, keyboard, config, custom, "LAYOUT", 0)
+
+    def render(platform: OverlayPlatform, *packs: Path) -> OverlayModel:
+        return build_overlay_model(
+            *args,
+            keymap_c=keymap_c,
+            label_packs=list(packs),
+            label_table_cache=tables,
+            platform=platform,
+        )
+
+    linux = render("linux", pack, macos_pack)
+    macos = render("macos", pack, macos_pack)
+    assert linux.keys[0].label == ["Meta"]
+    assert macos.keys[0].label == ["Command"]
+    assert macos.encoders[0].counter_clockwise == ["Soft"]
+
+    # Unchanged sources read each platform's compiled table back as it is.
+    (cached,) = [
+        path
+        for path in tables.glob("*.json")
+        if json.loads(path.read_text(encoding="utf-8"))["KC_LGUI"] == "Command"
+    ]
+    _write(cached, {"KC_LGUI": "From disk"})
+    assert render("macos", pack, macos_pack).keys[0].label == ["From disk"]
+
+    # A changed pack set compiles new tables and prunes the stale ones.
+    assert render("macos", pack).keys[0].label == ["Meta"]
+    assert not cached.exists()
+    assert len(list(tables.glob("*.json"))) == len(OVERLAY_PLATFORMS)
+
+
+def test_keyboard_labels_override_label_packs() -> None:
+    pack = LabelPackJson(labels={"KC_A": "Pack", "KC_B": "Pack"})
+
+    table = compile_label_table("linux", [pack], {"KC_A": "Keyboard"})
+
+    assert (table["KC_A"], table["KC_B"], table["KC_TRNS"]) == ("Keyboard", "Pack", "")
+    assert table["KC_LGUI"] == "Super"
+
+
+def test_parsed_inputs_render_as_the_files_they_came_from(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+    sources = overlay_sources(
+        parse_json(QmkKeymapJson, keymap),
+        parse_json(KeyboardJson, keyboard),
+        parse_json(KeyboardConfig, config),
+        parse_json(KeycodesJson, custom),
+        "LAYOUT",
+        encoder_layers=parse_encoder_map(keymap_c),
+    )
+
+    rendered = render_overlay_models(sources, [64], platforms=["linux"])
+    loaded = build_overlay_models(
+        keymap, keyboard, config, custom, "LAYOUT", keymap_c=keymap_c, platform="linux"
+    )
+
+    assert rendered[64]["linux"] == loaded
+
+    # Swapping in another keymap reuses everything else already in memory.
+    synthetic = replace(sources, keymap=QmkKeymapJson(layers=[["KC_B", "KC_MUTE"]]))
+    assert render_overlay_model(synthetic, 0, None).keys[0].label == ["B"]
+
+
+def test_binary_models_are_written_beside_the_json_ones(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+
+    main(
+        keymap,
+        keyboard,
+        config,
+        custom,
+        "LAYOUT",
+        all_layers=True,
+        keyboard_id=1,
+        asset_dir=tmp_path / "assets",
+        binary_model=True,
+        keymap_c=keymap_c,
+    )
+
+    document = json.loads((tmp_path / "assets/macos/1.json").read_bytes())
+    with BinaryOverlayModel(tmp_path / "assets/macos/1.bin") as model:
+        assert {str(layer): model.layer(layer) for layer in model.layers} == document[
+            "layers"
+        ]
+
+
+def test_compressed_models_are_written_beside_the_json_ones(tmp_path: Path) -> None:
+    keymap, keyboard, config, custom, keymap_c = _write_two_layer_sources(tmp_path)
+
+    main(
+        keymap,
+        keyboard,
+        config,
+        custom,
+        "LAYOUT",
+        all_layers=True,
+        keyboard_id=1,
+        asset_dir=tmp_path / "assets",
+        compression="lzma",
+        keymap_c=keymap_c,
+    )
+
+    compressed = (tmp_path / "assets/macos/1.json.xz").read_bytes()
+    assert (
+        decompress_model(compressed) == (tmp_path / "assets/macos/1.json").read_bytes()
+    )
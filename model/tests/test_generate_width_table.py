@@ -0,0 +1,37 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import unicodedata
+from pathlib import Path
+
+import pytest
+
+from model.scripts.generate_width_table import (
+    DEFAULT_OUTPUT,
+    generate_width_table,
+    width_ranges,
+)
+from model.src.text_width import east_asian_columns
+
+REPOSITORY = Path(__file__).resolve().parents[2]
+
+
+def test_ranges_hold_every_character_not_one_column_wide() -> None:
+    ranges = width_ranges()
+
+    assert all(
+        previous[1] < start for previous, (start, _, _) in zip(ranges, ranges[1:])
+    )
+    for start, end, columns in ranges:
+        assert {east_asian_columns(chr(start)), east_asian_columns(chr(end))} == {
+            columns
+        }
+    assert any(start <= ord("漢") <= end for start, end, _ in ranges)
+    assert not any(start <= ord("A") <= end for start, end, _ in ranges)
+
+
+def test_checked_in_table_is_current() -> None:
+    table = (REPOSITORY / DEFAULT_OUTPUT).read_text(encoding="utf-8")
+    if f"// {unicodedata.unidata_version} data" not in table:
+        pytest.skip("the table was generated from another Unicode version")
+
+    assert table == generate_width_table()
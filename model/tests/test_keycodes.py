@@ -0,0 +1,83 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import pytest
+
+from model.src.keycodes import parse_keycode
+
+
+@pytest.mark.parametrize(
+    ("text", "action", "layer", "momentary"),
+    [
+        ("MO(1)", "MO", 1, 1),
+        ("LT(2, KC_SPC)", "LT", 2, 2),
+        ("TT(3)", "TT", 3, 3),
+        ("OSL(4)", "OSL", 4, 4),
+        ("LM(1, MOD_LSFT)", "LM", 1, 1),
+        ("TG(1)", "TG", 1, None),
+        ("TO(0)", "TO", 0, None),
+        ("DF(2)", "DF", 2, None),
+        ("MO(01)", "MO", 1, 1),
+        ("MO(0x0A)", "MO", 10, 10),
+    ],
+)
+def test_classifies_layer_keys(
+    text: str, action: str, layer: int, momentary: int | None
+) -> None:
+    keycode = parse_keycode(text)
+
+    assert keycode.kind == "layer"
+    assert keycode.layer_action == action
+    assert keycode.layer == layer
+    assert keycode.momentary_layer == momentary
+
+
+@pytest.mark.parametrize("text", ["MO(-1)", "MO(0x-1)", "MO(256)", "LT(-2, KC_A)"])
+def test_layers_outside_a_byte_are_unresolved(text: str) -> None:
+    keycode = parse_keycode(text)
+
+    assert keycode.kind == "layer"
+    assert keycode.layer is None
+    assert keycode.momentary_layer is None
+
+
+def test_layer_tap_keeps_its_nested_tap_key() -> None:
+    keycode = parse_keycode("LT(1, LCTL(KC_A))")
+
+    assert keycode.tap is not None
+    assert keycode.tap.kind == "modified"
+    assert keycode.tap.modifiers == ("LCTL",)
+    assert keycode.tap.tap == parse_keycode("KC_A")
+
+
+@pytest.mark.parametrize(
+    ("text", "modifiers"),
+    [
+        ("LCTL_T(KC_A)", ("LCTL",)),
+        ("SFT_T(KC_A)", ("LSFT",)),
+        ("MEH_T(KC_A)", ("LCTL", "LSFT", "LALT")),
+        ("MT(MOD_LCTL | MOD_RALT, KC_A)", ("LCTL", "RALT")),
+    ],
+)
+def test_parses_mod_taps(text: str, modifiers: tuple[str, ...]) -> None:
+    keycode = parse_keycode(text)
+
+    assert keycode.kind == "mod_tap"
+    assert keycode.modifiers == modifiers
+    assert keycode.tap == parse_keycode("KC_A")
+
+
+def test_nested_modifier_wrappers_collect_every_modifier() -> None:
+    keycode = parse_keycode("C(S(KC_TAB))")
+
+    assert keycode.modifiers == ("LCTL", "LSFT")
+    assert keycode.tap == parse_keycode("KC_TAB")
+
+
+def test_leaves_unknown_and_symbolic_keycodes_unclassified() -> None:
+    assert parse_keycode("KC_A").kind == "basic"
+    assert parse_keycode("RGB_MODE(1)").kind == "other"
+    assert parse_keycode("MO(_FN)").momentary_layer is None
+
+
+def test_results_are_interned() -> None:
+    assert parse_keycode("LT(1, KC_SPC)") is parse_keycode("LT(1, KC_SPC)")
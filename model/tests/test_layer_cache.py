@@ -0,0 +1,51 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+from pathlib import Path
+
+from model.src.layer_cache import LayerCache, content_digest
+
+
+def test_content_digest_ignores_key_order() -> None:
+    assert content_digest({"a": 1, "b": [2]}) == content_digest({"b": [2], "a": 1})
+
+
+def test_saved_entries_are_reused_only_for_the_same_digest(tmp_path: Path) -> None:
+    path = tmp_path / "layer-cache.json"
+    cache = LayerCache(path)
+    cache.put("linux", 0, "same", {"layer": 0})
+    cache.save()
+
+    cache = LayerCache(path)
+
+    assert cache.get("linux", 0, "same") == {"layer": 0}
+    assert cache.get("linux", 0, "changed") is None
+    assert cache.get("macos", 0, "same") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_saving_drops_layers_this_build_no_longer_has(tmp_path: Path) -> None:
+    """A shrunk layer count must not leave the removed layer in the manifest."""
+    path = tmp_path / "layer-cache.json"
+    cache = LayerCache(path)
+    cache.put("linux", 0, "zero", {"layer": 0})
+    cache.put("linux", 1, "one", {"layer": 1})
+    cache.put("macos", 0, "zero", {"layer": 0})
+    cache.save()
+
+    cache = LayerCache(path)
+    cache.get("linux", 0, "zero")
+    cache.save()
+
+    cache = LayerCache(path)
+    assert cache.get("linux", 1, "one") is None
+    assert cache.get("macos", 0, "zero") == {"layer": 0}
+
+
+def test_an_unreadable_manifest_costs_a_full_render(tmp_path: Path) -> None:
+    path = tmp_path / "layer-cache.json"
+    path.write_text("{", encoding="utf-8")
+
+    cache = LayerCache(path)
+
+    assert cache.get("linux", 0, "digest") is None
+    assert cache.misses == 1
@@ -0,0 +1,26 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+from model.src.layer_graph import layer_activation_graph, reachable_layers
+
+
+def test_graph_follows_layer_keys_and_encoder_actions() -> None:
+    layers = [["MO(1)", "KC_A"], ["LT(2, KC_SPC)", "TO(0)"], ["KC_B", "KC_C"]]
+    encoder_layers = [[["KC_VOLD", "TG(3)"]]]
+
+    graph = layer_activation_graph([*layers, ["KC_D", "KC_E"]], encoder_layers)
+
+    assert graph == {0: {1, 3}, 1: {0, 2}, 2: set(), 3: set()}
+
+
+def test_only_layers_reachable_from_the_base_layer_are_kept() -> None:
+    """Vial pads keymaps with empty layers that nothing switches to."""
+    layers = [["MO(1)"], ["OSL(3)"], ["KC_TRNS"], ["KC_TRNS"], ["MO(2)"]]
+
+    assert reachable_layers(layers) == [0, 1, 3]
+
+
+def test_an_unresolved_reachable_layer_prunes_nothing() -> None:
+    layers = [["MO(_FN)"], ["KC_TRNS"], ["KC_TRNS"]]
+
+    assert reachable_layers(layers) == [0, 1, 2]
+    assert reachable_layers([["KC_A"], ["MO(_FN)"]]) == [0]
@@ -132,6 +132,9 @@ def test_install_assets_prunes_removed_layers(tmp_path: Path) -> None:
     # KEYBOARD_ID must name a real firmware/examples/<id> directory (an
     # unconditional Makefile guard reads its config.json), so this reuses
     # bundled keyboard 1 rather than an arbitrary id.
+    # The consolidated model is already current, as the renderer would have
+    # left it; the per-layer files stand in for DEBUG_LAYER_MODELS output.
+    (build / "1.json").write_text('{"keyboard_id": 1}', encoding="utf-8")
     current = [build / "1_L0.json", build / "1_L1.json"]
     current[0].write_text('{"layer": 0}', encoding="utf-8")
     current[1].write_text('{"layer": 1}', encoding="utf-8")
@@ -163,6 +166,48 @@ def test_install_assets_prunes_removed_layers(tmp_path: Path) -> None:
 
     assert sorted(path.name for path in installed.iterdir()) == ["1.json"]
     assert not stale_build.exists()
+    assert all(path.exists() for path in current)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Makefile paths use POSIX syntax")
+def test_source_render_writes_the_consolidated_model_in_one_run() -> None:
+    """VIAL=false renders every layer and consolidates them in one process."""
+    result = subprocess.run(
+        [
+            MAKE,
+            "-n",
+            "-B",
+            "build/1/assets/linux/1.json",
+            "VIAL=false",
+            "KEYBOARD_ID=1",
+            "OVERLAY_PLATFORM=linux",
+            "RENDER_ASSET_DEPS=",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parents[2],
+    )
+
+    assert result.stdout.count("model.scripts.generate_overlay_asset") == 1
+    assert '--all-layers --keyboard-id "1"' in result.stdout
+    assert "consolidate_layer_models" not in result.stdout
+    assert "--output-prefix" not in result.stdout
+
+
+def test_drawing_every_keyboard_renders_them_on_one_process_pool() -> None:
+    """Prepare inputs per keyboard, then render all of them in one orchestrator."""
+    result = subprocess.run(
+        [MAKE, "-n", "draw-layers", "VIAL=false", "MAKE=echo make"],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parents[2],
+    )
+
+    assert "make _render_inputs KEYBOARD_ID=1" in result.stdout
+    assert result.stdout.count("model.scripts.build_all") == 1
+    assert "model.scripts.generate_overlay_asset" not in result.stdout
 
 
 @pytest.mark.skipif(sys.platform == "win32", reason="Makefile paths use POSIX syntax")
@@ -0,0 +1,81 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+from pathlib import Path
+
+import pytest
+
+from model.src.model_bundle import (
+    BUNDLE_ENTRY,
+    BUNDLE_HEADER,
+    SLOT_COUNT,
+    ModelBundle,
+    replace_bundle_model,
+    write_model_bundle,
+)
+
+
+def test_models_read_back_by_keyboard_id(tmp_path: Path) -> None:
+    path = tmp_path / "models.bundle"
+    write_model_bundle(path, {7: b'{"keyboard_id":7}', 1: b'{"keyboard_id":1}'})
+
+    bundle = ModelBundle(path)
+
+    assert bundle.keyboard_ids == [1, 7]
+    assert bundle.model(7) == {"keyboard_id": 7}
+    bundle.verify(1)
+    with pytest.raises(KeyError, match="Keyboard 2"):
+        bundle.data(2)
+
+
+def test_replacing_one_model_leaves_the_others_bytes_in_place(tmp_path: Path) -> None:
+    path = tmp_path / "models.bundle"
+    write_model_bundle(path, {1: b'{"a":1}', 2: b'{"b":2}'})
+    before = path.read_bytes()
+
+    replace_bundle_model(path, 1, b'{"a":"new"}')
+    replace_bundle_model(path, 3, b'{"c":3}')
+
+    models_offset = BUNDLE_HEADER.size + SLOT_COUNT * BUNDLE_ENTRY.size
+    assert path.read_bytes()[models_offset : len(before)] == before[models_offset:]
+    bundle = ModelBundle(path)
+    assert bundle.keyboard_ids == [1, 2, 3]
+    assert [bundle.model(keyboard_id) for keyboard_id in (1, 2, 3)] == [
+        {"a": "new"},
+        {"b": 2},
+        {"c": 3},
+    ]
+
+
+def test_replacing_rewrites_the_bundle_once_dead_space_outgrows_it(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "models.bundle"
+    write_model_bundle(path, {1: b'{"a":1}', 2: b'{"b":2}'})
+    models_offset = BUNDLE_HEADER.size + SLOT_COUNT * BUNDLE_ENTRY.size
+
+    sizes = []
+    for round_ in range(10):
+        replace_bundle_model(path, 1, b'{"a":%d}' % round_)
+        sizes.append(path.stat().st_size - models_offset)
+
+    assert max(sizes) <= 2 * 14
+    assert min(sizes) == 14
+    bundle = ModelBundle(path)
+    assert bundle.model(1) == {"a": 9}
+    assert bundle.model(2) == {"b": 2}
+    bundle.verify(1)
+
+
+def test_damage_is_found_when_verified(tmp_path: Path) -> None:
+    path = tmp_path / "models.bundle"
+    write_model_bundle(path, {1: b'{"a":1}'})
+    path.write_bytes(path.read_bytes()[:-2] + b"2}")
+
+    bundle = ModelBundle(path)
+
+    assert bundle.model(1) == {"a": 2}
+    with pytest.raises(ValueError, match="fails its digest"):
+        bundle.verify(1)
+    (tmp_path / "1.json").write_bytes(b"{}")
+    with pytest.raises(ValueError, match="not a version 1 model bundle"):
+        ModelBundle(tmp_path / "1.json")
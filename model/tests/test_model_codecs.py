@@ -0,0 +1,25 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+import pytest
+
+from model.src.model_codecs import (
+    MODEL_CODECS,
+    ModelCodec,
+    compress_model,
+    decompress_model,
+)
+
+_MODEL = b'{"keyboard_id":1,"layers":{"0":{"keys":[]}}}\n' * 20
+
+
+@pytest.mark.parametrize("codec", list(MODEL_CODECS))
+def test_each_codec_is_recognized_by_its_header(codec: ModelCodec) -> None:
+    compressed = compress_model(_MODEL, codec)
+
+    assert len(compressed) < len(_MODEL)
+    assert compressed == compress_model(_MODEL, codec)
+    assert decompress_model(compressed) == _MODEL
+
+
+def test_uncompressed_json_passes_through() -> None:
+    assert decompress_model(_MODEL) == _MODEL
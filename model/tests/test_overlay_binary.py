@@ -0,0 +1,96 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+from pathlib import Path
+
+import pytest
+
+from model.src.overlay_binary import (
+    HEADER,
+    INDEX_ENTRY,
+    BinaryOverlayModel,
+    binary_model_bytes,
+)
+
+
+def _layer(layer: int, label: list[str], transparent: bool = False) -> dict:
+    return {
+        "version": 2,
+        "layer": layer,
+        "width": 400,
+        "height": 200,
+        "header_font_size": 14,
+        "key_font_size": 10,
+        "encoder_font_size": 10,
+        "keys": [
+            {
+                "x": 10,
+                "y": 40,
+                "width": 58,
+                "height": 58,
+                "label": label,
+                "held": layer > 0,
+                "transparent": transparent,
+                "momentary_layer": None,
+            },
+            {
+                "x": 74,
+                "y": 40,
+                "width": 58,
+                "height": 58,
+                "label": [],
+                "held": False,
+                "transparent": False,
+                "momentary_layer": 1,
+            },
+        ],
+        "encoders": [
+            {
+                "x": 140,
+                "y": 40,
+                "size": 58,
+                "counter_clockwise": ["VOL", "-"],
+                "clockwise": ["VOL +"],
+                "press": "MUTE",
+                "held": False,
+                "counter_clockwise_transparent": False,
+                "clockwise_transparent": transparent,
+                "press_transparent": False,
+                "momentary_layer": None,
+            }
+        ],
+    }
+
+
+def test_each_layer_decodes_to_its_json_model(tmp_path: Path) -> None:
+    layers = {
+        "0": _layer(0, ["⎋"]),
+        "1": _layer(1, ["L1"], transparent=True),
+        "3": _layer(3, ["Ctrl", "Esc"]),
+    }
+    path = tmp_path / "1.bin"
+    path.write_bytes(binary_model_bytes(1, layers))
+
+    with BinaryOverlayModel(path) as model:
+        assert (model.keyboard_id, model.layers) == (1, [0, 1, 3])
+        assert {str(layer): model.layer(layer) for layer in model.layers} == layers
+        with pytest.raises(KeyError, match="Layer 2"):
+            model.layer(2)
+
+
+def test_identical_layers_share_one_block() -> None:
+    data = binary_model_bytes(1, {"0": _layer(0, ["A"]), "1": _layer(0, ["A"])})
+
+    entries = list(
+        INDEX_ENTRY.iter_unpack(data[HEADER.size : HEADER.size + 2 * INDEX_ENTRY.size])
+    )
+
+    assert entries[0][1] == entries[1][1]
+
+
+def test_rejects_unit_space_models_and_foreign_files(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="not a version 2 pixel model"):
+        binary_model_bytes(1, {"0": {**_layer(0, ["A"]), "version": 3}})
+    path = tmp_path / "1.json"
+    path.write_bytes(b"{" + b" " * HEADER.size + b"}")
+    with pytest.raises(ValueError, match="not a version 1 binary model"):
+        BinaryOverlayModel(path)
@@ -0,0 +1,43 @@
+# Copyright 2026 sunaemon
+# SPDX-License-Identifier: MIT
+from textwrap import wrap
+
+import pytest
+
+from model.src.text_width import TextWidths, east_asian_columns
+
+
+def test_wide_characters_take_two_columns() -> None:
+    assert [east_asian_columns(character) for character in "Aあ＠⇞"] == [1, 2, 2, 1]
+    assert east_asian_columns("́") == 0
+
+
+@pytest.mark.parametrize(
+    "label",
+    [
+        "PRINT SCREEN",
+        "RGB-MODE-FORWARD",
+        "A  B",
+        "SOMETHING VERY LONG INDEED",
+        "UP--DOWN\tNEXT",
+        "a-b-c-d x--",
+    ],
+)
+def test_one_column_text_wraps_as_textwrap_does(label: str) -> None:
+    assert TextWidths().wrap(label, 9, 5) == tuple(
+        wrap(label, width=5, break_long_words=True)
+    )
+
+
+def test_wide_text_wraps_and_truncates_by_columns() -> None:
+    widths = TextWidths()
+
+    assert widths.wrap("日本語入力切替", 3, 10) == ("日本語入力", "切替")
+    assert widths.wrap("かな カナ 英数", 2, 5) == ("かな", "カ...")
+
+
+def test_advance_table_overrides_the_east_asian_width() -> None:
+    widths = TextWidths({"⇞": 2})
+
+    assert widths.width("⇞ PgUp") == 7
+    assert widths.wrap("⇞⇞⇞", 3, 5) == ("⇞⇞", "⇞")
@@ -11,6 +11,7 @@ from model.src.util import (
     parse_keycode_value,
     parse_qk_kb_keycode,
     strip_c_comments,
+    write_bytes_atomically,
 )
 
 DATA_DIR = Path(__file__).parent / "data"
@@ -109,3 +110,25 @@ def test_parse_custom_keycode_short_names_uses_single_token_comments(
         "KC_BETA": "β",
         "EIZO_USB_C": "USB-C",
     }
+
+
+def test_write_bytes_atomically_replaces_the_file(tmp_path: Path) -> None:
+    path = tmp_path / "model.json"
+    path.write_bytes(b"old")
+
+    write_bytes_atomically(path, b"new")
+
+    assert path.read_bytes() == b"new"
+    assert sorted(tmp_path.iterdir()) == [path]
+
+
+def test_write_bytes_atomically_leaves_nothing_behind_on_failure(
+    tmp_path: Path,
+) -> None:
+    """A failed write must leave neither a truncated file nor its temporary."""
+    path = tmp_path / "missing" / "model.json"
+
+    with pytest.raises(OSError):
+        write_bytes_atomically(path, b"new")
+
+    assert not path.parent.exists()
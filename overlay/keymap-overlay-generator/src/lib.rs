@@ -4,8 +4,10 @@ pub mod keymap_c;
 pub mod labels;
 pub mod model;
 pub mod qmk_keymap;
+pub mod text_width;
 pub mod types;
 pub mod vial;
+mod width_table;
 
 use anyhow::{Context, Result};
 use hidapi::HidApi;
@@ -1,4 +1,5 @@
 use crate::labels::{Platform, keycode_labels, platform_keycode_labels};
+use crate::text_width::wrap_label;
 use crate::types::{
     DisplayEncoder, DisplayKey, EncoderPlacement, KeyboardConfig, KeyboardJson, LayoutKey,
     OverlayModel,
@@ -414,59 +415,6 @@ fn display_value(value: i64, description: &str) -> Result<u32> {
     u32::try_from(value).with_context(|| format!("{description} exceeds the supported range"))
 }
 
-fn wrap_label(label: &str, max_lines: usize, max_chars: usize) -> Vec<String> {
-    if label.is_empty() {
-        return Vec::new();
-    }
-    let lines = wrap_text(label, max_chars);
-    if lines.len() <= max_lines {
-        return lines;
-    }
-    let mut truncated: Vec<String> = lines[..max_lines - 1].to_vec();
-    let last = &lines[max_lines - 1];
-    let cut = last
-        .chars()
-        .take(max_chars.saturating_sub(3))
-        .collect::<String>();
-    truncated.push(format!("{cut}..."));
-    truncated
-}
-
-/// A simplified greedy word-wrap that breaks on whitespace and hard-breaks
-/// words longer than the full line width.
-fn wrap_text(text: &str, width: usize) -> Vec<String> {
-    let mut lines = Vec::new();
-    let mut current = String::new();
-    for word in text.split_whitespace() {
-        for chunk in break_long_word(word, width) {
-            if current.is_empty() {
-                current = chunk;
-            } else if current.chars().count() + 1 + chunk.chars().count() <= width {
-                current.push(' ');
-                current.push_str(&chunk);
-            } else {
-                lines.push(std::mem::take(&mut current));
-                current = chunk;
-            }
-        }
-    }
-    if !current.is_empty() {
-        lines.push(current);
-    }
-    lines
-}
-
-fn break_long_word(word: &str, width: usize) -> Vec<String> {
-    if width == 0 || word.chars().count() <= width {
-        return vec![word.to_string()];
-    }
-    word.chars()
-        .collect::<Vec<_>>()
-        .chunks(width)
-        .map(|chunk| chunk.iter().collect())
-        .collect()
-}
-
 fn format_keycode(
     keycode: &str,
     display_labels: &HashMap<String, String>,
@@ -482,7 +430,7 @@ fn format_keycode(
     if let Some(label) = generic_labels.get(keycode) {
         return (*label).to_string();
     }
-    if let Some(layer) = momentary_layer(keycode) {
+    if let Some(("MO", layer)) = layer_key(keycode) {
         return format!("L{layer}");
     }
     let stripped = keycode
@@ -492,10 +440,67 @@ fn format_keycode(
     stripped.replace('_', " ")
 }
 
+/// Layer actions that switch a layer on only while the key is held, as
+/// `MOMENTARY_LAYER_ACTIONS` in `model/src/keycodes.py`.
+const MOMENTARY_LAYER_ACTIONS: [&str; 5] = ["MO", "LT", "TT", "OSL", "LM"];
+
 fn momentary_layer(keycode: &str) -> Option<u8> {
-    let compact = keycode.replace(' ', "");
-    let inner = compact.strip_prefix("MO(")?.strip_suffix(")")?;
-    inner.parse().ok()
+    let (action, layer) = layer_key(keycode)?;
+    MOMENTARY_LAYER_ACTIONS.contains(&action).then_some(layer)
+}
+
+/// Returns a layer key's action and numeric layer, parsed as
+/// `parse_keycode` in `model/src/keycodes.py` does.
+fn layer_key(keycode: &str) -> Option<(&'static str, u8)> {
+    let compact: String = keycode.chars().filter(|c| !c.is_whitespace()).collect();
+    let (name, arguments) = compact.strip_suffix(')')?.split_once('(')?;
+    let (action, expected) = match name {
+        "MO" => ("MO", 1),
+        "TG" => ("TG", 1),
+        "TT" => ("TT", 1),
+        "OSL" => ("OSL", 1),
+        "TO" => ("TO", 1),
+        "DF" => ("DF", 1),
+        "LT" => ("LT", 2),
+        "LM" => ("LM", 2),
+        _ => return None,
+    };
+    let arguments = split_arguments(arguments);
+    if arguments.len() != expected {
+        return None;
+    }
+    Some((action, layer_number(arguments[0])?))
+}
+
+fn split_arguments(arguments: &str) -> Vec<&str> {
+    // Arguments may nest, as in LT(1, LCTL(KC_A)), so split on top-level commas.
+    let mut parts = Vec::new();
+    let mut depth = 0usize;
+    let mut start = 0;
+    for (index, character) in arguments.char_indices() {
+        match character {
+            '(' => depth += 1,
+            ')' => depth = depth.saturating_sub(1),
+            ',' if depth == 0 => {
+                parts.push(&arguments[start..index]);
+                start = index + 1;
+            }
+            _ => {}
+        }
+    }
+    parts.push(&arguments[start..]);
+    parts
+}
+
+fn layer_number(argument: &str) -> Option<u8> {
+    // Symbolic layers such as _FN are left unresolved, like the Python model.
+    match argument
+        .strip_prefix("0x")
+        .or_else(|| argument.strip_prefix("0X"))
+    {
+        Some(hex) => u8::from_str_radix(hex, 16).ok(),
+        None => argument.parse().ok(),
+    }
 }
 
 fn inset_box(box_: (i64, i64, i64, i64), inset: i64) -> Result<(i64, i64, i64, i64)> {
@@ -935,6 +940,26 @@ mod tests {
         assert_eq!(momentary_layer("MO(2)"), Some(2));
         assert_eq!(momentary_layer("MO( 2 )"), Some(2));
         assert_eq!(momentary_layer("KC_A"), None);
+        assert_eq!(momentary_layer("MO(01)"), Some(1));
+        assert_eq!(momentary_layer("MO(0x2)"), Some(2));
+        assert_eq!(momentary_layer("MO(_FN)"), None);
+        assert_eq!(momentary_layer("MO(-1)"), None);
+        assert_eq!(momentary_layer("MO(256)"), None);
+    }
+
+    #[test]
+    fn every_momentary_layer_action_marks_its_layer() {
+        assert_eq!(momentary_layer("LT(1, LCTL(KC_A))"), Some(1));
+        assert_eq!(momentary_layer("TT(3)"), Some(3));
+        assert_eq!(momentary_layer("OSL(2)"), Some(2));
+        assert_eq!(momentary_layer("LM(1, MOD_LSFT)"), Some(1));
+        assert_eq!(momentary_layer("LT(1)"), None);
+        assert_eq!(momentary_layer("TG(1)"), None);
+        assert_eq!(momentary_layer("TO(1)"), None);
+        assert_eq!(
+            format_keycode("TG(1)", &HashMap::new(), &keycode_labels()),
+            "TG(1)"
+        );
         assert_eq!(
             format_keycode("MO(2)", &HashMap::new(), &keycode_labels()),
             "L2"
@@ -950,13 +975,4 @@ mod tests {
         assert_eq!(format_keycode("KC_NO", &none, &generic), "");
         assert_eq!(format_keycode("KC_TRNS", &none, &generic), "");
     }
-
-    #[test]
-    fn wrap_label_truncates_with_an_ellipsis() {
-        assert_eq!(wrap_label("", 3, 10), Vec::<String>::new());
-        assert_eq!(wrap_label("BRIGHT -", 3, 10), vec!["BRIGHT -".to_string()]);
-        let wrapped = wrap_label("SOMETHING VERY LONG INDEED", 2, 5);
-        assert_eq!(wrapped.len(), 2);
-        assert!(wrapped[1].ends_with("..."));
-    }
 }
@@ -0,0 +1,136 @@
+//! Label measuring and wrapping in columns of the overlay's label font, as
+//! `model/src/text_width.py` does for the Python generator.
+//!
+//! A column is one ASCII character's advance; wide and full-width characters
+//! take two and combining marks none. The widths come from `width_table.rs`,
+//! which is generated from the Python module, so both generators measure a
+//! label the same way.
+
+use crate::width_table::WIDTH_RANGES;
+
+/// Returns the columns one character takes: 0, 1, or 2 when wide.
+pub fn character_columns(character: char) -> usize {
+    let code_point = u32::from(character);
+    let index = WIDTH_RANGES.partition_point(|&(_, end, _)| end < code_point);
+    match WIDTH_RANGES.get(index) {
+        Some(&(start, _, columns)) if start <= code_point => usize::from(columns),
+        _ => 1,
+    }
+}
+
+/// Returns the columns a line of text takes.
+pub fn text_columns(text: &str) -> usize {
+    text.chars().map(character_columns).sum()
+}
+
+/// Wraps a label to at most `max_lines` lines of `max_columns` columns,
+/// ending the last line with an ellipsis when the label does not fit.
+pub fn wrap_label(label: &str, max_lines: usize, max_columns: usize) -> Vec<String> {
+    if label.is_empty() {
+        return Vec::new();
+    }
+    let lines = wrap_text(label, max_columns);
+    if lines.len() <= max_lines {
+        return lines;
+    }
+    let mut truncated: Vec<String> = lines[..max_lines - 1].to_vec();
+    let cut = fitting_prefix(&lines[max_lines - 1], max_columns.saturating_sub(3));
+    truncated.push(format!("{cut}..."));
+    truncated
+}
+
+/// A simplified greedy word-wrap that breaks on whitespace and hard-breaks
+/// words wider than the full line.
+fn wrap_text(text: &str, width: usize) -> Vec<String> {
+    let mut lines = Vec::new();
+    let mut current = String::new();
+    for word in text.split_whitespace() {
+        for chunk in break_long_word(word, width) {
+            if current.is_empty() {
+                current = chunk;
+            } else if text_columns(&current) + 1 + text_columns(&chunk) <= width {
+                current.push(' ');
+                current.push_str(&chunk);
+            } else {
+                lines.push(std::mem::take(&mut current));
+                current = chunk;
+            }
+        }
+    }
+    if !current.is_empty() {
+        lines.push(current);
+    }
+    lines
+}
+
+fn break_long_word(word: &str, width: usize) -> Vec<String> {
+    if width == 0 || text_columns(word) <= width {
+        return vec![word.to_string()];
+    }
+    let mut chunks = Vec::new();
+    let mut rest = word;
+    while let Some(first) = rest.chars().next() {
+        let mut end = fitting_prefix(rest, width).len();
+        if end == 0 {
+            // A glyph wider than the whole line still takes a line of its own.
+            end = first.len_utf8();
+        }
+        chunks.push(rest[..end].to_string());
+        rest = &rest[end..];
+    }
+    chunks
+}
+
+/// Returns the longest prefix of text that fits in `columns`.
+fn fitting_prefix(text: &str, columns: usize) -> &str {
+    let mut used = 0;
+    for (index, character) in text.char_indices() {
+        used += character_columns(character);
+        if used > columns {
+            return &text[..index];
+        }
+    }
+    text
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn wide_characters_take_two_columns_and_combining_marks_none() {
+        assert_eq!(character_columns('A'), 1);
+        assert_eq!(character_columns('→'), 1);
+        assert_eq!(character_columns('漢'), 2);
+        assert_eq!(character_columns('Ａ'), 2);
+        assert_eq!(character_columns('\u{301}'), 0);
+        assert_eq!(text_columns("かな A"), 6);
+    }
+
+    #[test]
+    fn wrap_label_truncates_with_an_ellipsis() {
+        assert_eq!(wrap_label("", 3, 10), Vec::<String>::new());
+        assert_eq!(wrap_label("BRIGHT -", 3, 10), vec!["BRIGHT -".to_string()]);
+        let wrapped = wrap_label("SOMETHING VERY LONG INDEED", 2, 5);
+        assert_eq!(wrapped.len(), 2);
+        assert!(wrapped[1].ends_with("..."));
+    }
+
+    #[test]
+    fn wide_labels_wrap_by_columns() {
+        assert_eq!(wrap_label("変換", 3, 10), vec!["変換".to_string()]);
+        assert_eq!(
+            wrap_label("全角英数字入力", 3, 10),
+            vec!["全角英数字".to_string(), "入力".to_string()]
+        );
+        assert_eq!(
+            wrap_label("ひらがなカタカナ漢字", 2, 5),
+            vec!["ひら".to_string(), "が...".to_string()]
+        );
+        // A glyph wider than the line still takes a line of its own.
+        assert_eq!(
+            wrap_label("漢字", 3, 1),
+            vec!["漢".to_string(), "字".to_string()]
+        );
+    }
+}
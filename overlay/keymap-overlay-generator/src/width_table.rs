@@ -0,0 +1,320 @@
+// Generated by model/scripts/generate_width_table.py from the Unicode
+// 15.1.0 data in model/src/text_width.py; run
+// make width-table rather than editing it.
+
+/// Sorted, disjoint inclusive code point ranges and the columns each
+/// character in them takes. Every other character takes one column.
+pub const WIDTH_RANGES: &[(u32, u32, u8)] = &[
+    (0x300, 0x34E, 0),
+    (0x350, 0x36F, 0),
+    (0x483, 0x487, 0),
+    (0x591, 0x5BD, 0),
+    (0x5BF, 0x5BF, 0),
+    (0x5C1, 0x5C2, 0),
+    (0x5C4, 0x5C5, 0),
+    (0x5C7, 0x5C7, 0),
+    (0x610, 0x61A, 0),
+    (0x64B, 0x65F, 0),
+    (0x670, 0x670, 0),
+    (0x6D6, 0x6DC, 0),
+    (0x6DF, 0x6E4, 0),
+    (0x6E7, 0x6E8, 0),
+    (0x6EA, 0x6ED, 0),
+    (0x711, 0x711, 0),
+    (0x730, 0x74A, 0),
+    (0x7EB, 0x7F3, 0),
+    (0x7FD, 0x7FD, 0),
+    (0x816, 0x819, 0),
+    (0x81B, 0x823, 0),
+    (0x825, 0x827, 0),
+    (0x829, 0x82D, 0),
+    (0x859, 0x85B, 0),
+    (0x898, 0x89F, 0),
+    (0x8CA, 0x8E1, 0),
+    (0x8E3, 0x8FF, 0),
+    (0x93C, 0x93C, 0),
+    (0x94D, 0x94D, 0),
+    (0x951, 0x954, 0),
+    (0x9BC, 0x9BC, 0),
+    (0x9CD, 0x9CD, 0),
+    (0x9FE, 0x9FE, 0),
+    (0xA3C, 0xA3C, 0),
+    (0xA4D, 0xA4D, 0),
+    (0xABC, 0xABC, 0),
+    (0xACD, 0xACD, 0),
+    (0xB3C, 0xB3C, 0),
+    (0xB4D, 0xB4D, 0),
+    (0xBCD, 0xBCD, 0),
+    (0xC3C, 0xC3C, 0),
+    (0xC4D, 0xC4D, 0),
+    (0xC55, 0xC56, 0),
+    (0xCBC, 0xCBC, 0),
+    (0xCCD, 0xCCD, 0),
+    (0xD3B, 0xD3C, 0),
+    (0xD4D, 0xD4D, 0),
+    (0xDCA, 0xDCA, 0),
+    (0xE38, 0xE3A, 0),
+    (0xE48, 0xE4B, 0),
+    (0xEB8, 0xEBA, 0),
+    (0xEC8, 0xECB, 0),
+    (0xF18, 0xF19, 0),
+    (0xF35, 0xF35, 0),
+    (0xF37, 0xF37, 0),
+    (0xF39, 0xF39, 0),
+    (0xF71, 0xF72, 0),
+    (0xF74, 0xF74, 0),
+    (0xF7A, 0xF7D, 0),
+    (0xF80, 0xF80, 0),
+    (0xF82, 0xF84, 0),
+    (0xF86, 0xF87, 0),
+    (0xFC6, 0xFC6, 0),
+    (0x1037, 0x1037, 0),
+    (0x1039, 0x103A, 0),
+    (0x108D, 0x108D, 0),
+    (0x1100, 0x115F, 2),
+    (0x135D, 0x135F, 0),
+    (0x1714, 0x1715, 0),
+    (0x1734, 0x1734, 0),
+    (0x17D2, 0x17D2, 0),
+    (0x17DD, 0x17DD, 0),
+    (0x18A9, 0x18A9, 0),
+    (0x1939, 0x193B, 0),
+    (0x1A17, 0x1A18, 0),
+    (0x1A60, 0x1A60, 0),
+    (0x1A75, 0x1A7C, 0),
+    (0x1A7F, 0x1A7F, 0),
+    (0x1AB0, 0x1ABD, 0),
+    (0x1ABF, 0x1ACE, 0),
+    (0x1B34, 0x1B34, 0),
+    (0x1B44, 0x1B44, 0),
+    (0x1B6B, 0x1B73, 0),
+    (0x1BAA, 0x1BAB, 0),
+    (0x1BE6, 0x1BE6, 0),
+    (0x1BF2, 0x1BF3, 0),
+    (0x1C37, 0x1C37, 0),
+    (0x1CD0, 0x1CD2, 0),
+    (0x1CD4, 0x1CE0, 0),
+    (0x1CE2, 0x1CE8, 0),
+    (0x1CED, 0x1CED, 0),
+    (0x1CF4, 0x1CF4, 0),
+    (0x1CF8, 0x1CF9, 0),
+    (0x1DC0, 0x1DFF, 0),
+    (0x20D0, 0x20DC, 0),
+    (0x20E1, 0x20E1, 0),
+    (0x20E5, 0x20F0, 0),
+    (0x231A, 0x231B, 2),
+    (0x2329, 0x232A, 2),
+    (0x23E9, 0x23EC, 2),
+    (0x23F0, 0x23F0, 2),
+    (0x23F3, 0x23F3, 2),
+    (0x25FD, 0x25FE, 2),
+    (0x2614, 0x2615, 2),
+    (0x2648, 0x2653, 2),
+    (0x267F, 0x267F, 2),
+    (0x2693, 0x2693, 2),
+    (0x26A1, 0x26A1, 2),
+    (0x26AA, 0x26AB, 2),
+    (0x26BD, 0x26BE, 2),
+    (0x26C4, 0x26C5, 2),
+    (0x26CE, 0x26CE, 2),
+    (0x26D4, 0x26D4, 2),
+    (0x26EA, 0x26EA, 2),
+    (0x26F2, 0x26F3, 2),
+    (0x26F5, 0x26F5, 2),
+    (0x26FA, 0x26FA, 2),
+    (0x26FD, 0x26FD, 2),
+    (0x2705, 0x2705, 2),
+    (0x270A, 0x270B, 2),
+    (0x2728, 0x2728, 2),
+    (0x274C, 0x274C, 2),
+    (0x274E, 0x274E, 2),
+    (0x2753, 0x2755, 2),
+    (0x2757, 0x2757, 2),
+    (0x2795, 0x2797, 2),
+    (0x27B0, 0x27B0, 2),
+    (0x27BF, 0x27BF, 2),
+    (0x2B1B, 0x2B1C, 2),
+    (0x2B50, 0x2B50, 2),
+    (0x2B55, 0x2B55, 2),
+    (0x2CEF, 0x2CF1, 0),
+    (0x2D7F, 0x2D7F, 0),
+    (0x2DE0, 0x2DFF, 0),
+    (0x2E80, 0x2E99, 2),
+    (0x2E9B, 0x2EF3, 2),
+    (0x2F00, 0x2FD5, 2),
+    (0x2FF0, 0x3029, 2),
+    (0x302A, 0x302F, 0),
+    (0x3030, 0x303E, 2),
+    (0x3041, 0x3096, 2),
+    (0x3099, 0x309A, 0),
+    (0x309B, 0x30FF, 2),
+    (0x3105, 0x312F, 2),
+    (0x3131, 0x318E, 2),
+    (0x3190, 0x31E3, 2),
+    (0x31EF, 0x321E, 2),
+    (0x3220, 0x3247, 2),
+    (0x3250, 0x4DBF, 2),
+    (0x4E00, 0xA48C, 2),
+    (0xA490, 0xA4C6, 2),
+    (0xA66F, 0xA66F, 0),
+    (0xA674, 0xA67D, 0),
+    (0xA69E, 0xA69F, 0),
+    (0xA6F0, 0xA6F1, 0),
+    (0xA806, 0xA806, 0),
+    (0xA82C, 0xA82C, 0),
+    (0xA8C4, 0xA8C4, 0),
+    (0xA8E0, 0xA8F1, 0),
+    (0xA92B, 0xA92D, 0),
+    (0xA953, 0xA953, 0),
+    (0xA960, 0xA97C, 2),
+    (0xA9B3, 0xA9B3, 0),
+    (0xA9C0, 0xA9C0, 0),
+    (0xAAB0, 0xAAB0, 0),
+    (0xAAB2, 0xAAB4, 0),
+    (0xAAB7, 0xAAB8, 0),
+    (0xAABE, 0xAABF, 0),
+    (0xAAC1, 0xAAC1, 0),
+    (0xAAF6, 0xAAF6, 0),
+    (0xABED, 0xABED, 0),
+    (0xAC00, 0xD7A3, 2),
+    (0xF900, 0xFAFF, 2),
+    (0xFB1E, 0xFB1E, 0),
+    (0xFE10, 0xFE19, 2),
+    (0xFE20, 0xFE2F, 0),
+    (0xFE30, 0xFE52, 2),
+    (0xFE54, 0xFE66, 2),
+    (0xFE68, 0xFE6B, 2),
+    (0xFF01, 0xFF60, 2),
+    (0xFFE0, 0xFFE6, 2),
+    (0x101FD, 0x101FD, 0),
+    (0x102E0, 0x102E0, 0),
+    (0x10376, 0x1037A, 0),
+    (0x10A0D, 0x10A0D, 0),
+    (0x10A0F, 0x10A0F, 0),
+    (0x10A38, 0x10A3A, 0),
+    (0x10A3F, 0x10A3F, 0),
+    (0x10AE5, 0x10AE6, 0),
+    (0x10D24, 0x10D27, 0),
+    (0x10EAB, 0x10EAC, 0),
+    (0x10EFD, 0x10EFF, 0),
+    (0x10F46, 0x10F50, 0),
+    (0x10F82, 0x10F85, 0),
+    (0x11046, 0x11046, 0),
+    (0x11070, 0x11070, 0),
+    (0x1107F, 0x1107F, 0),
+    (0x110B9, 0x110BA, 0),
+    (0x11100, 0x11102, 0),
+    (0x11133, 0x11134, 0),
+    (0x11173, 0x11173, 0),
+    (0x111C0, 0x111C0, 0),
+    (0x111CA, 0x111CA, 0),
+    (0x11235, 0x11236, 0),
+    (0x112E9, 0x112EA, 0),
+    (0x1133B, 0x1133C, 0),
+    (0x1134D, 0x1134D, 0),
+    (0x11366, 0x1136C, 0),
+    (0x11370, 0x11374, 0),
+    (0x11442, 0x11442, 0),
+    (0x11446, 0x11446, 0),
+    (0x1145E, 0x1145E, 0),
+    (0x114C2, 0x114C3, 0),
+    (0x115BF, 0x115C0, 0),
+    (0x1163F, 0x1163F, 0),
+    (0x116B6, 0x116B7, 0),
+    (0x1172B, 0x1172B, 0),
+    (0x11839, 0x1183A, 0),
+    (0x1193D, 0x1193E, 0),
+    (0x11943, 0x11943, 0),
+    (0x119E0, 0x119E0, 0),
+    (0x11A34, 0x11A34, 0),
+    (0x11A47, 0x11A47, 0),
+    (0x11A99, 0x11A99, 0),
+    (0x11C3F, 0x11C3F, 0),
+    (0x11D42, 0x11D42, 0),
+    (0x11D44, 0x11D45, 0),
+    (0x11D97, 0x11D97, 0),
+    (0x11F41, 0x11F42, 0),
+    (0x16AF0, 0x16AF4, 0),
+    (0x16B30, 0x16B36, 0),
+    (0x16FE0, 0x16FE4, 2),
+    (0x16FF0, 0x16FF1, 0),
+    (0x17000, 0x187F7, 2),
+    (0x18800, 0x18CD5, 2),
+    (0x18D00, 0x18D08, 2),
+    (0x1AFF0, 0x1AFF3, 2),
+    (0x1AFF5, 0x1AFFB, 2),
+    (0x1AFFD, 0x1AFFE, 2),
+    (0x1B000, 0x1B122, 2),
+    (0x1B132, 0x1B132, 2),
+    (0x1B150, 0x1B152, 2),
+    (0x1B155, 0x1B155, 2),
+    (0x1B164, 0x1B167, 2),
+    (0x1B170, 0x1B2FB, 2),
+    (0x1BC9E, 0x1BC9E, 0),
+    (0x1D165, 0x1D169, 0),
+    (0x1D16D, 0x1D172, 0),
+    (0x1D17B, 0x1D182, 0),
+    (0x1D185, 0x1D18B, 0),
+    (0x1D1AA, 0x1D1AD, 0),
+    (0x1D242, 0x1D244, 0),
+    (0x1E000, 0x1E006, 0),
+    (0x1E008, 0x1E018, 0),
+    (0x1E01B, 0x1E021, 0),
+    (0x1E023, 0x1E024, 0),
+    (0x1E026, 0x1E02A, 0),
+    (0x1E08F, 0x1E08F, 0),
+    (0x1E130, 0x1E136, 0),
+    (0x1E2AE, 0x1E2AE, 0),
+    (0x1E2EC, 0x1E2EF, 0),
+    (0x1E4EC, 0x1E4EF, 0),
+    (0x1E8D0, 0x1E8D6, 0),
+    (0x1E944, 0x1E94A, 0),
+    (0x1F004, 0x1F004, 2),
+    (0x1F0CF, 0x1F0CF, 2),
+    (0x1F18E, 0x1F18E, 2),
+    (0x1F191, 0x1F19A, 2),
+    (0x1F200, 0x1F202, 2),
+    (0x1F210, 0x1F23B, 2),
+    (0x1F240, 0x1F248, 2),
+    (0x1F250, 0x1F251, 2),
+    (0x1F260, 0x1F265, 2),
+    (0x1F300, 0x1F320, 2),
+    (0x1F32D, 0x1F335, 2),
+    (0x1F337, 0x1F37C, 2),
+    (0x1F37E, 0x1F393, 2),
+    (0x1F3A0, 0x1F3CA, 2),
+    (0x1F3CF, 0x1F3D3, 2),
+    (0x1F3E0, 0x1F3F0, 2),
+    (0x1F3F4, 0x1F3F4, 2),
+    (0x1F3F8, 0x1F43E, 2),
+    (0x1F440, 0x1F440, 2),
+    (0x1F442, 0x1F4FC, 2),
+    (0x1F4FF, 0x1F53D, 2),
+    (0x1F54B, 0x1F54E, 2),
+    (0x1F550, 0x1F567, 2),
+    (0x1F57A, 0x1F57A, 2),
+    (0x1F595, 0x1F596, 2),
+    (0x1F5A4, 0x1F5A4, 2),
+    (0x1F5FB, 0x1F64F, 2),
+    (0x1F680, 0x1F6C5, 2),
+    (0x1F6CC, 0x1F6CC, 2),
+    (0x1F6D0, 0x1F6D2, 2),
+    (0x1F6D5, 0x1F6D7, 2),
+    (0x1F6DC, 0x1F6DF, 2),
+    (0x1F6EB, 0x1F6EC, 2),
+    (0x1F6F4, 0x1F6FC, 2),
+    (0x1F7E0, 0x1F7EB, 2),
+    (0x1F7F0, 0x1F7F0, 2),
+    (0x1F90C, 0x1F93A, 2),
+    (0x1F93C, 0x1F945, 2),
+    (0x1F947, 0x1F9FF, 2),
+    (0x1FA70, 0x1FA7C, 2),
+    (0x1FA80, 0x1FA88, 2),
+    (0x1FA90, 0x1FABD, 2),
+    (0x1FABF, 0x1FAC5, 2),
+    (0x1FACE, 0x1FADB, 2),
+    (0x1FAE0, 0x1FAE8, 2),
+    (0x1FAF0, 0x1FAF8, 2),
+    (0x20000, 0x2FFFD, 2),
+    (0x30000, 0x3FFFD, 2),
+];